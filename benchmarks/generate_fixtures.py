@@ -0,0 +1,100 @@
+"""Fixture generator: synthetic org and calendar history for load tests.
+
+Writes into --output-dir:
+
+- org.json: divisions, projects, regions and users (USERS schema)
+- calendars.ndjson: a bulk export of every user's calendar for every year,
+  in the app's bulk export layout (NDJSON, gzip compressed with --gzip;
+  --format bulk, the default), or calendars/calendar_<user>_<year>.json, one
+  import file per calendar (--format files, never compressed: the import
+  reads plain JSON)
+
+Calendars are generated and written one at a time, so a 50k users x 5 years
+fixture (tens of millions of days) does not need to fit in memory. The
+history distributions (flags, hours, comments, statuses, fill rate) and the
+org shape come from rxcalendar/services/synthetic_org.py and can be
+overridden with a JSON profile, e.g. {"fill_rate": 0.5, "comment_rate": 0.2}.
+
+Usage:
+    python benchmarks/generate_fixtures.py --users 50000 --years 2022-2026
+        [--format bulk|files] [--gzip] [--seed 0] [--profile profile.json]
+        [--output-dir fixtures]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rxcalendar.services.date_table import DEFAULT_YEAR  # noqa: E402
+from rxcalendar.services.synthetic_org import (  # noqa: E402
+    SyntheticProfile,
+    generate_org,
+    iter_calendars,
+    write_bulk_export,
+    write_calendar_files,
+    write_org,
+)
+
+
+def _years(text: str) -> list[int]:
+    """Years of "2024-2026" or "2024,2026"."""
+    if "-" in text:
+        first, last = text.split("-", 1)
+        return list(range(int(first), int(last) + 1))
+    return [int(year) for year in text.split(",") if year]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--years", default=str(DEFAULT_YEAR), help='Years of history, "2022-2026" or "2024,2026"')
+    parser.add_argument("--format", choices=["bulk", "files"], default="bulk")
+    parser.add_argument("--gzip", action="store_true", help="Compress the bulk export (--format bulk only)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile", default="", help="JSON file overriding the default profile")
+    parser.add_argument("--output-dir", default="fixtures")
+    args = parser.parse_args()
+
+    profile = SyntheticProfile()
+    if args.profile:
+        with open(args.profile, encoding="utf-8") as f:
+            try:
+                profile = SyntheticProfile.from_dict(json.load(f))
+            except ValueError as e:
+                parser.error(str(e))
+    years = _years(args.years)
+    if args.gzip and args.format == "files":
+        parser.error("--gzip only applies to --format bulk (import files must be plain JSON)")
+
+    started = time.perf_counter()
+    os.makedirs(args.output_dir, exist_ok=True)
+    divisions, projects, regions, users = generate_org(args.users, profile)
+    write_org(os.path.join(args.output_dir, "org.json"), divisions, projects, regions, users)
+
+    calendars = iter_calendars(users, projects, years, profile, seed=args.seed)
+    if args.format == "bulk":
+        path = os.path.join(args.output_dir, "calendars.ndjson.gz" if args.gzip else "calendars.ndjson")
+        count = write_bulk_export(path, calendars, len(users) * len(years), compress=args.gzip)
+        if count != len(users) * len(years):
+            print(f"Warning: the bulk export announces {len(users) * len(years)} calendars, {count} written", file=sys.stderr)
+    else:
+        path = os.path.join(args.output_dir, "calendars")
+        count = write_calendar_files(path, calendars)
+
+    print(json.dumps({
+        "users": len(users),
+        "projects": len(projects),
+        "divisions": len(divisions),
+        "years": years,
+        "calendars": count,
+        "output": path,
+        "seconds": round(time.perf_counter() - started, 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
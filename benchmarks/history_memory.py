@@ -0,0 +1,89 @@
+"""Memory benchmark: history entries as dicts vs slotted HistoryEntry records.
+
+Builds one million history entries the way a bulk-hours run does (same
+actor, action and flag, one entry per user and date) and measures the
+memory held by each representation with tracemalloc.
+
+Usage:
+    python benchmarks/history_memory.py [--entries 1000000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rxcalendar.services.history_entry import HistoryEntry, format_timestamp, now_timestamp  # noqa: E402
+
+
+def _build_dicts(count: int, timestamp: int) -> list[dict]:
+    """Entries as the previous 8-key dicts (formatted timestamp, repeated strings)."""
+    entries = []
+    for i in range(count):
+        entries.append({
+            "timestamp": format_timestamp(timestamp),
+            "action": "hours added (bulk set)",
+            "comment": "",
+            "flag": "",
+            "hours": 8.0 + (i % 4) / 4,
+            "user": "Michael Scott (HR)",
+            "user_role": "hr",
+            "propagated_by": "Michael Scott (HR)",
+        })
+    return entries
+
+
+def _build_records(count: int, timestamp: int) -> list[HistoryEntry]:
+    """Entries as slotted records (epoch timestamp, interned strings)."""
+    entries = []
+    for i in range(count):
+        entries.append(HistoryEntry(
+            timestamp,
+            "hours added (bulk set)",
+            "",
+            "",
+            8.0 + (i % 4) / 4,
+            "Michael Scott (HR)",
+            "hr",
+            "Michael Scott (HR)",
+        ))
+    return entries
+
+
+def _measure(builder, count: int, timestamp: int) -> int:
+    """Bytes allocated (and still held) by building `count` entries."""
+    gc.collect()
+    tracemalloc.start()
+    entries = builder(count, timestamp)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entries
+    gc.collect()
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    timestamp = now_timestamp()
+    dict_bytes = _measure(_build_dicts, args.entries, timestamp)
+    record_bytes = _measure(_build_records, args.entries, timestamp)
+
+    print(json.dumps({
+        "entries": args.entries,
+        "dict_bytes": dict_bytes,
+        "record_bytes": record_bytes,
+        "dict_bytes_per_entry": round(dict_bytes / args.entries, 1),
+        "record_bytes_per_entry": round(record_bytes / args.entries, 1),
+        "reduction": round(1 - record_bytes / dict_bytes, 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
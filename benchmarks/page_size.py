@@ -0,0 +1,51 @@
+"""Page benchmark: compile time and size of the index page.
+
+Compiles the index page the way `reflex run` does (component tree, then
+React page code) and reports the time taken, the size of the generated page
+code (raw and gzipped) and the number of components in the month grid.
+
+Usage:
+    python benchmarks/page_size.py
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reflex.compiler import compiler  # noqa: E402
+
+from rxcalendar.components import calendar_grid  # noqa: E402
+from rxcalendar.rxcalendar import index  # noqa: E402
+
+
+def _count_components(component) -> int:
+    """Number of components in a component tree."""
+    return 1 + sum(_count_components(child) for child in getattr(component, "children", []))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+
+    started = time.perf_counter()
+    page = index()
+    built = time.perf_counter()
+    _path, code = compiler.compile_page("index", page)
+    compiled = time.perf_counter()
+
+    print(json.dumps({
+        "build_seconds": round(built - started, 3),
+        "compile_seconds": round(compiled - built, 3),
+        "page_bytes": len(code.encode()),
+        "page_gzip_bytes": len(gzip.compress(code.encode())),
+        "grid_components": _count_components(calendar_grid()),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
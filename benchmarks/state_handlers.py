@@ -0,0 +1,292 @@
+"""Handler benchmark: CalendarState event handlers on synthetic orgs.
+
+Creates CalendarState headless (no browser, no websocket) on synthetic orgs
+of increasing size, each with its own temporary SQLite calendar store, and
+times the handlers that scale with the org:
+
+- save_comment on a single day, on a month range and as a company-wide
+  holiday (propagated to every user)
+- preview_bulk_hours / apply_bulk_hours for one month and for all months
+- export_calendar in bulk mode (every visible user)
+- _execute_import of a new user with a year of days
+- the visible_users and users_grouped_by_project vars (org scope cache cold)
+
+An event is timed like the server runs it: the handler, then building and
+clearing the state delta (where dirty computed vars are re-evaluated). The
+viewer is an HR user, who sees the whole org.
+
+Results are written as JSON; with --baseline the run is compared against a
+previous results file (--save-baseline stores this run as that baseline).
+
+The 50k users org writes millions of days in the all-months bulk cases and
+takes minutes; use --sizes 100,5000 for a quick run.
+
+Usage:
+    python benchmarks/state_handlers.py [--sizes 100,5000,50000] [--repeat 3]
+        [--cases save_comment_single,...] [--output results.json]
+        [--baseline benchmarks/baseline.json] [--save-baseline]
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rxcalendar.services import org_directory  # noqa: E402
+from rxcalendar.services.artifact_store import ArtifactStore, set_artifact_store  # noqa: E402
+from rxcalendar.services.calendar_store import SQLiteCalendarStore, set_calendar_store  # noqa: E402
+from rxcalendar.services.date_table import DEFAULT_YEAR, year_dates  # noqa: E402
+from rxcalendar.services.org_directory import OrgDirectory  # noqa: E402
+from rxcalendar.services.synthetic_org import generate_org  # noqa: E402
+from rxcalendar.state import CalendarState  # noqa: E402
+
+
+DEFAULT_SIZES = "100,5000,50000"
+
+
+def synthetic_org(user_count: int) -> OrgDirectory:
+    """Org of user_count users: one manager per project, one HR per 500 users."""
+    return OrgDirectory(*generate_org(user_count))
+
+
+def _flush(state: CalendarState):
+    """Build and clear the delta, as the server does after each event."""
+    state.get_delta()
+    state._clean()
+
+
+def _new_state(org: OrgDirectory) -> CalendarState:
+    """Headless state viewing the HR user's calendar of an org."""
+    state = CalendarState(_reflex_internal_init=True)
+    state._org = org
+    hr_id = org.users_by_role["hr"][0]["id"]
+    state.current_user_id = hr_id
+    state.viewed_user_id = hr_id
+    state.load_calendar_data()
+    _flush(state)
+    return state
+
+
+# ----- Cases: each prepares the state (untimed) and returns the timed call -----
+
+def _weekdays(month: int) -> list[str]:
+    return [date_iso for date_iso, _ in year_dates(DEFAULT_YEAR).month_weekdays(month)]
+
+
+def case_save_comment_single(state, i):
+    date_iso = _weekdays(1 + i % 12)[i % 15]
+    state.select_date_range(date_iso, date_iso)
+    state.current_comment = f"benchmark {i}"
+    state.current_flag = ""
+    state.current_hours = 8.0
+    _flush(state)
+    return state.save_comment
+
+
+def case_save_comment_range(state, i):
+    weekdays = _weekdays(1 + i % 12)
+    state.select_date_range(weekdays[0], weekdays[-1])
+    state.current_comment = f"benchmark range {i}"
+    state.current_flag = ""
+    state.current_hours = 7.5
+    _flush(state)
+    return state.save_comment
+
+
+def case_save_comment_company_wide(state, i):
+    date_iso = _weekdays(1 + i % 12)[-1]
+    state.select_date_range(date_iso, date_iso)
+    state.current_comment = f"benchmark holiday {i}"
+    state.current_flag = "national day off"
+    state.current_hours = 0.0
+    _flush(state)
+    return state.save_comment
+
+
+def _prepare_bulk(state, i, all_months: bool):
+    state.open_bulk_hours_dialog(1 + i % 12)
+    state.set_bulk_apply_to_all_months(all_months)
+    # Alternate the hours so every run has days to overwrite
+    state.set_bulk_hours_mon_thu("7.5" if i % 2 else "8.0")
+    state.set_bulk_hours_fri("6.0" if i % 2 else "7.0")
+    _flush(state)
+
+
+def _bulk_apply(state, i, all_months: bool):
+    _prepare_bulk(state, i, all_months)
+    state.preview_bulk_hours()  # Builds the plan (applies right away without overwrites)
+    _flush(state)
+    return state.apply_bulk_hours
+
+
+def case_bulk_preview_month(state, i):
+    _prepare_bulk(state, i, False)
+    return state.preview_bulk_hours
+
+
+def case_bulk_apply_month(state, i):
+    return _bulk_apply(state, i, False)
+
+
+def case_bulk_preview_all_months(state, i):
+    _prepare_bulk(state, i, True)
+    return state.preview_bulk_hours
+
+
+def case_bulk_apply_all_months(state, i):
+    return _bulk_apply(state, i, True)
+
+
+def case_export_bulk(state, i):
+    state.open_export_dialog()
+    state.set_export_target("bulk")
+    _flush(state)
+    return state.export_calendar
+
+
+def case_execute_import(state, i):
+    org = state._org
+    project = org.projects[i % len(org.projects)]
+    import_data = {
+        "calendar_owner": {"id": f"imp{i:06d}", "name": f"Imported {i}", "role": "employee"},
+        "project": {"id": project["id"], "name": project["name"], "description": ""},
+        "region": org.regions[i % len(org.regions)],
+        "days": [
+            {"date": date_iso, "flag": "", "comment": "imported", "hours": 8.0}
+            for month in range(1, 13)
+            for date_iso in _weekdays(month)
+        ],
+    }
+    return lambda: state._execute_import(import_data)
+
+
+def _cold_var(name: str):
+    def case(state, i):
+        def read():
+            org_directory._scope_cache.clear()
+            CalendarState.computed_vars[name].mark_dirty(instance=state)
+            return getattr(state, name)
+        return read
+    return case
+
+
+CASES = {
+    "save_comment_single": case_save_comment_single,
+    "save_comment_range": case_save_comment_range,
+    "save_comment_company_wide": case_save_comment_company_wide,
+    "bulk_preview_month": case_bulk_preview_month,
+    "bulk_apply_month": case_bulk_apply_month,
+    "bulk_preview_all_months": case_bulk_preview_all_months,
+    "bulk_apply_all_months": case_bulk_apply_all_months,
+    "export_bulk": case_export_bulk,
+    "execute_import": case_execute_import,
+    "visible_users": _cold_var("visible_users"),
+    "users_grouped_by_project": _cold_var("users_grouped_by_project"),
+}
+
+# Cases that are only events of their own (no handler delta to build)
+VAR_CASES = {"visible_users", "users_grouped_by_project"}
+
+
+def run_size(size: int, cases: list[str], repeat: int, directory: str) -> dict:
+    """Timings (ms) of the cases on an org of `size` users."""
+    store = SQLiteCalendarStore(os.path.join(directory, f"calendar_{size}.db"))
+    set_calendar_store(store)
+    org = synthetic_org(size)
+    state = _new_state(org)
+    results = {}
+    try:
+        for name in cases:
+            samples = []
+            for i in range(repeat):
+                call = CASES[name](state, i)
+                started = time.perf_counter()
+                result = call()
+                if inspect.isawaitable(result):
+                    asyncio.run(result)
+                if name not in VAR_CASES:
+                    _flush(state)
+                samples.append((time.perf_counter() - started) * 1000)
+            results[name] = {
+                "min_ms": round(min(samples), 3),
+                "median_ms": round(statistics.median(samples), 3),
+                "max_ms": round(max(samples), 3),
+            }
+            print(f"  {size:>6} users  {name:<28} {results[name]['median_ms']:>10.1f} ms", file=sys.stderr)
+    finally:
+        store.close()
+        set_calendar_store(None)
+    return results
+
+
+def compare(results: dict, baseline: dict):
+    """Print median times against a baseline run (ratio > 1 is slower)."""
+    print(f"{'users':>6}  {'case':<28} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+    for size, cases in results["results"].items():
+        for name, timings in cases.items():
+            before = baseline.get("results", {}).get(size, {}).get(name)
+            if before is None:
+                print(f"{size:>6}  {name:<28} {'-':>12} {timings['median_ms']:>12.1f} {'new':>7}")
+                continue
+            ratio = timings["median_ms"] / before["median_ms"] if before["median_ms"] else float("inf")
+            print(f"{size:>6}  {name:<28} {before['median_ms']:>12.1f} {timings['median_ms']:>12.1f} {ratio:>7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma separated org sizes (users)")
+    parser.add_argument("--cases", default=",".join(CASES), help="Comma separated case names")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", default="", help="Compare against this results file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as --baseline")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    cases = [name for name in args.cases.split(",") if name]
+    unknown = [name for name in cases if name not in CASES]
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(unknown)} (available: {', '.join(CASES)})")
+
+    directory = tempfile.mkdtemp(prefix="rxcalendar-bench-")
+    # Exports are written to the artifact store
+    set_artifact_store(ArtifactStore(os.path.join(directory, "artifacts")))
+    try:
+        results = {
+            "meta": {
+                "date": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+            },
+            "results": {str(size): run_size(size, cases, args.repeat, directory) for size in sizes},
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            f.write(text)
+    elif args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(results, json.load(f))
+        return
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Backend HTTP routes added to the Reflex backend (App(api_transformer=...)).
+
+- GET /artifacts/<token>/<filename>: a generated export from the artifact
+  store, streamed from disk with its Content-Length, 404 once expired
+- GET /metrics: per-handler metrics (RXCALENDAR_METRICS=1, handler_metrics.py),
+  bearer token (RXCALENDAR_METRICS_TOKEN) or loopback clients only
+
+Exports hand the browser a short-lived ``artifact_url`` instead of sending
+the file through the websocket.
+"""
+
+import asyncio
+import json
+from urllib.parse import quote
+
+from reflex.vars import Var
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import FileResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+from rxcalendar.handler_metrics import METRICS_ENABLED, metrics_endpoint
+from rxcalendar.services.artifact_store import get_artifact_store
+
+
+ARTIFACTS_ROUTE = "/artifacts"
+
+# Seconds between two removals of the expired artifacts
+ARTIFACT_CLEANUP_INTERVAL = 60
+
+
+def artifact_url(token: str, filename: str) -> Var:
+    """Backend URL of an artifact, for rx.download.
+    
+    Like upload URLs, it is resolved in the browser against
+    getBackendURL(env.UPLOAD), so the backend host seen by the browser is used.
+    """
+    path = f"{ARTIFACTS_ROUTE}/{token}/{quote(filename)}"
+    return Var(_js_expr=f"new URL({json.dumps(path)}, getBackendURL(env.UPLOAD)).href", _var_type=str)
+
+
+async def artifact_endpoint(request: Request) -> Response:
+    """GET /artifacts/<token>/<filename>."""
+    token = request.path_params["token"]
+    filename = request.path_params["filename"]
+    path = get_artifact_store().get(token, filename)
+    if path is None:
+        return PlainTextResponse("Not found or expired\n", status_code=404)
+    # FileResponse streams the file in chunks and sets Content-Length
+    return FileResponse(
+        path,
+        filename=filename,
+        content_disposition_type="attachment",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+async def cleanup_artifacts():
+    """Remove the expired artifacts periodically (lifespan task)."""
+    while True:
+        removed = await asyncio.to_thread(get_artifact_store().cleanup)
+        if removed:
+            print(f"Artifact store: removed {removed} expired artifact(s)")
+        await asyncio.sleep(ARTIFACT_CLEANUP_INTERVAL)
+
+
+def backend_api() -> Starlette:
+    """Routes mounted in front of the Reflex backend."""
+    routes = [Route(ARTIFACTS_ROUTE + "/{token}/{filename}", artifact_endpoint, methods=["GET", "HEAD"])]
+    if METRICS_ENABLED:
+        routes.append(Route("/metrics", metrics_endpoint, methods=["GET"]))
+    return Starlette(routes=routes)
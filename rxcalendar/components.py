@@ -6,7 +6,27 @@ from .state import CalendarState
 from .custom_calendar import custom_month_calendar
 
 
-def month_calendar(month: int, year: int = 2026) -> rx.Component:
+# Pause after the last keystroke before a typed value is sent to the backend
+INPUT_DEBOUNCE_MS = 400
+
+
+def coalesced_input(field: rx.Component, commit_on_blur: bool = False) -> rx.Component:
+    """Controlled input that sends its value once per edit instead of per keystroke.
+    
+    Keystrokes stay in the browser and the on_change event fires after a
+    pause of INPUT_DEBOUNCE_MS, on Enter or when the field loses focus (so a
+    button clicked right after typing still sees the value). With
+    commit_on_blur the value is only sent on blur/Enter.
+    """
+    return rx.debounce_input(
+        field,
+        debounce_timeout=-1 if commit_on_blur else INPUT_DEBOUNCE_MS,
+        force_notify_by_enter=field.tag != "textarea",
+        force_notify_on_blur=True,
+    )
+
+
+def month_calendar(month: int) -> rx.Component:
     """Create a calendar component for a specific month."""
     # Create a date string for the first day of the month
     month_names = [
@@ -38,9 +58,8 @@ def month_calendar(month: int, year: int = 2026) -> rx.Component:
             align="center",
         ),
         custom_month_calendar(
-            year=year,
             month=month,
-            on_click_day=CalendarState.handle_day_click,
+            on_select_range=CalendarState.select_date_range,
         ),
         spacing="2",
         align="center",
@@ -241,13 +260,16 @@ def comment_dialog() -> rx.Component:
                 ),
                 margin_bottom="16px",
             ),
-            rx.el.textarea(
-                value=CalendarState.current_comment,
-                on_change=CalendarState.set_current_comment,
-                placeholder="Enter your comment here...",
-                width="100%",
-                height="120px",
-                padding="8px",
+            coalesced_input(
+                rx.el.textarea(
+                    value=CalendarState.current_comment,
+                    on_change=CalendarState.set_current_comment,
+                    placeholder="Enter your comment here...",
+                    width="100%",
+                    height="120px",
+                    padding="8px",
+                ),
+                commit_on_blur=True,
             ),
             # Flag selector - dynamically filtered by role
             rx.box(
@@ -288,16 +310,18 @@ def comment_dialog() -> rx.Component:
                 # Project special worktime: 5.0 to 19.0 in 0.25 increments
                 rx.box(
                     rx.text("Hours (5.0 - 19.0, step 0.25):", size="2", weight="bold"),
-                    rx.el.input(
-                        type="number",
-                        step="0.25",
-                        min="5.0",
-                        max="19.0",
-                        value=CalendarState.current_hours.to(str),
-                        on_change=CalendarState.set_current_hours,
-                        width="100%",
-                        margin_top="8px",
-                        padding="6px",
+                    coalesced_input(
+                        rx.el.input(
+                            type="number",
+                            step="0.25",
+                            min="5.0",
+                            max="19.0",
+                            value=CalendarState.current_hours.to(str),
+                            on_change=CalendarState.set_current_hours,
+                            width="100%",
+                            margin_top="8px",
+                            padding="6px",
+                        ),
                     ),
                     rx.text(
                         "⚠️ This will set special project worktime and propagate to all employees in the project.",
@@ -309,17 +333,19 @@ def comment_dialog() -> rx.Component:
                 # Blank flag or other: 0-12 hours in 0.5 increments (only for blank)
                 rx.box(
                     rx.text("Hours (0 - 12, step 0.25):", size="2", weight="bold"),
-                    rx.el.input(
-                        type="number",
-                        step="0.25",
-                        min="0",
-                        max="12",
-                        value=CalendarState.current_hours.to(str),
-                        on_change=CalendarState.set_current_hours,
-                        width="100%",
-                        margin_top="8px",
-                        padding="6px",
-                        disabled=rx.cond(CalendarState.current_flag != "", True, False),
+                    coalesced_input(
+                        rx.el.input(
+                            type="number",
+                            step="0.25",
+                            min="0",
+                            max="12",
+                            value=CalendarState.current_hours.to(str),
+                            on_change=CalendarState.set_current_hours,
+                            width="100%",
+                            margin_top="8px",
+                            padding="6px",
+                            disabled=rx.cond(CalendarState.current_flag != "", True, False),
+                        ),
                     ),
                 ),
             ),
@@ -333,7 +359,7 @@ def comment_dialog() -> rx.Component:
                     disabled=rx.cond(
                         CalendarState.selected_date != "",
                         rx.cond(
-                            CalendarState.history_entries_for_selected.length() == 0,
+                            CalendarState.history_count_for_selected == 0,
                             True,
                             False
                         ),
@@ -452,6 +478,38 @@ def history_dialog() -> rx.Component:
                 width="100%",
             ),
             rx.flex(
+                rx.cond(
+                    CalendarState.history_page_count > 1,
+                    rx.hstack(
+                        rx.button(
+                            rx.icon("chevron-left"),
+                            "Newer",
+                            size="1",
+                            variant="soft",
+                            on_click=CalendarState.previous_history_page,
+                            disabled=CalendarState.history_page == 0,
+                        ),
+                        rx.text(
+                            "Page ",
+                            (CalendarState.history_page + 1).to(str),
+                            " / ",
+                            CalendarState.history_page_count.to(str),
+                            size="2",
+                        ),
+                        rx.button(
+                            "Older",
+                            rx.icon("chevron-right"),
+                            size="1",
+                            variant="soft",
+                            on_click=CalendarState.next_history_page,
+                            disabled=CalendarState.history_page + 1 >= CalendarState.history_page_count,
+                        ),
+                        spacing="2",
+                        align="center",
+                    ),
+                    rx.box(),
+                ),
+                rx.spacer(),
                 rx.dialog.close(
                     rx.button(
                         "Close",
@@ -462,7 +520,8 @@ def history_dialog() -> rx.Component:
                 ),
                 spacing="3",
                 margin_top="16px",
-                justify="end",
+                justify="between",
+                align="center",
             ),
             max_width="600px",
         ),
@@ -508,7 +567,7 @@ def company_holidays_dialog() -> rx.Component:
         )
     return rx.dialog.root(
         rx.dialog.content(
-            rx.dialog.title("Company Holidays (2026)"),
+            rx.dialog.title(f"Company Holidays ({CalendarState.viewed_year})"),
             rx.dialog.description(
                 "Company-wide holidays applied to all calendars by HR.",
                 size="2",
@@ -802,7 +861,8 @@ def bulk_hours_dialog() -> rx.Component:
                     CalendarState.get_month_name,
                     "Unknown"
                 ),
-                " 2026"
+                " ",
+                CalendarState.viewed_year,
             ),
             rx.dialog.description(
                 "Set standard work hours for all weekdays in this month. This will apply to all users in your visible scope.",
@@ -968,15 +1028,17 @@ def quota_manager_dialog() -> rx.Component:
                     ),
                     rx.hstack(
                         rx.text("Maximum Days:", size="2", weight="bold", width="120px"),
-                        rx.el.input(
-                            type="number",
-                            value=CalendarState.temp_vacation_quota.to(str),
-                            on_change=CalendarState.set_temp_vacation_quota,
-                            min="0",
-                            max="365",
-                            step="0.5",
-                            width="100px",
-                            padding="6px",
+                        coalesced_input(
+                            rx.el.input(
+                                type="number",
+                                value=CalendarState.temp_vacation_quota.to(str),
+                                on_change=CalendarState.set_temp_vacation_quota,
+                                min="0",
+                                max="365",
+                                step="0.5",
+                                width="100px",
+                                padding="6px",
+                            ),
                         ),
                         rx.text("days", size="2", color="var(--gray-11)"),
                         spacing="2",
@@ -1001,15 +1063,17 @@ def quota_manager_dialog() -> rx.Component:
                         ),
                         rx.hstack(
                             rx.text("Maximum Days:", size="2", weight="bold", width="120px"),
-                            rx.el.input(
-                                type="number",
-                                value=CalendarState.temp_extra_days_quota.to(str),
-                                on_change=CalendarState.set_temp_extra_days_quota,
-                                min="0",
-                                max="100",
-                                step="0.5",
-                                width="100px",
-                                padding="6px",
+                            coalesced_input(
+                                rx.el.input(
+                                    type="number",
+                                    value=CalendarState.temp_extra_days_quota.to(str),
+                                    on_change=CalendarState.set_temp_extra_days_quota,
+                                    min="0",
+                                    max="100",
+                                    step="0.5",
+                                    width="100px",
+                                    padding="6px",
+                                ),
                             ),
                             rx.text("days", size="2", color="var(--gray-11)"),
                             spacing="2",
@@ -1358,7 +1422,7 @@ def header() -> rx.Component:
                 # Left: Title and instructions
                 rx.vstack(
                     rx.heading(
-                        "2026 Calendar",
+                        f"{CalendarState.viewed_year} Calendar",
                         size="9",
                     ),
                     rx.text(
@@ -1458,14 +1522,25 @@ def header() -> rx.Component:
             rx.cond(
                 CalendarState.viewed_user_id == CalendarState.current_user_id,
                 rx.cond(
-                    CalendarState.notifications_for_viewed.length() > 0,
+                    CalendarState.unread_notification_count > 0,
                     rx.card(
                         rx.hstack(
                             rx.icon("megaphone", color="var(--orange-9)"),
                             rx.text(
-                                CalendarState.notifications_for_viewed[0].to(str),
+                                CalendarState.first_notification_for_viewed,
                                 size="2",
                             ),
+                            rx.cond(
+                                CalendarState.unread_notification_count > 1,
+                                rx.badge(
+                                    "+",
+                                    (CalendarState.unread_notification_count - 1).to(str),
+                                    " more",
+                                    color_scheme="orange",
+                                    size="1",
+                                ),
+                                rx.box(),
+                            ),
                             rx.spacer(),
                             rx.button(
                                 "Dismiss",
@@ -1496,8 +1571,32 @@ def header() -> rx.Component:
     )
 
 
+def year_selector() -> rx.Component:
+    """Previous/next year navigation (other years are loaded on demand)."""
+    return rx.hstack(
+        rx.icon_button(
+            rx.icon("chevron-left", size=16),
+            on_click=CalendarState.previous_year,
+            variant="soft",
+            size="2",
+        ),
+        rx.heading(CalendarState.viewed_year, size="6"),
+        rx.icon_button(
+            rx.icon("chevron-right", size=16),
+            on_click=CalendarState.next_year,
+            variant="soft",
+            size="2",
+        ),
+        spacing="3",
+        align="center",
+        justify="center",
+        width="100%",
+        margin_bottom="4",
+    )
+
+
 def calendar_grid() -> rx.Component:
-    """Grid layout displaying all 12 months of 2026."""
+    """Grid layout displaying the 12 months of the viewed year."""
     return rx.box(
         # Warning banner for non-validated calendars (employees only)
         rx.cond(
@@ -1515,6 +1614,7 @@ def calendar_grid() -> rx.Component:
         ),
         # Calendar grid (always shown, but disabled for non-validated employees)
         rx.box(
+            year_selector(),
             rx.grid(
                 *[month_calendar(month) for month in range(1, 13)],
                 columns="4",
@@ -1678,6 +1778,18 @@ def export_dialog() -> rx.Component:
                             max_height="300px",
                             width="100%",
                         ),
+                        rx.checkbox(
+                            rx.text("Compress (gzip)", size="2"),
+                            checked=CalendarState.export_gzip,
+                            on_change=CalendarState.set_export_gzip,
+                            margin_top="12px",
+                        ),
+                        rx.text(
+                            "Bulk exports are NDJSON files: one calendar per line.",
+                            size="1",
+                            color="gray",
+                            margin_top="4px",
+                        ),
                     ),
                     rx.box(),
                 ),
@@ -1976,15 +2088,17 @@ def summary_panel() -> rx.Component:
             # Conversion ratio setting
             rx.hstack(
                 rx.text("Hours/Day Ratio:", size="2", weight="bold"),
-                rx.el.input(
-                    type="number",
-                    value=CalendarState.hours_to_days_ratio.to(str),
-                    on_change=CalendarState.set_hours_to_days_ratio,
-                    min="1",
-                    max="24",
-                    step="0.5",
-                    width="80px",
-                    padding="4px",
+                coalesced_input(
+                    rx.el.input(
+                        type="number",
+                        value=CalendarState.hours_to_days_ratio.to(str),
+                        on_change=CalendarState.set_hours_to_days_ratio,
+                        min="1",
+                        max="24",
+                        step="0.5",
+                        width="80px",
+                        padding="4px",
+                    ),
                 ),
                 spacing="2",
                 align="center",
@@ -1,80 +1,110 @@
 """Custom calendar component built with pure Reflex components."""
 
-from datetime import datetime, timedelta
-from calendar import monthrange
 import reflex as rx
 from typing import Callable
 
+from reflex.event import EventChain
+from reflex.experimental.client_state import ClientStateVar
+from reflex.utils.imports import ImportVar
+from reflex.vars import FunctionVar, LiteralVar, Var, VarData
+
+from rxcalendar.services.date_table import year_dates
+
+
+# Range selection lives in the browser: the first end of the range (ISO date,
+# "" when nothing is selected) and the day under the pointer. Hovering and
+# dragging only update these, the backend gets one event per finished range.
+range_anchor = ClientStateVar.create("range_anchor", "")
+range_hover = ClientStateVar.create("range_hover", "")
+
 
 def get_month_data(year: int, month: int) -> list[list[dict]]:
     """Get calendar data for a month organized by weeks.
     
     Returns a list of weeks, where each week is a list of day dictionaries.
-    Each day dict contains: day number, is_current_month, date_str, is_weekday
+    Each day dict contains: day number, is_current_month, date_str, date_iso, is_weekday
+    (day is 0 for the cells outside the month)
     """
-    # Get first day of month and number of days
-    first_day_weekday, num_days = monthrange(year, month)
-    
-    # Create list to hold weeks
-    weeks = []
-    current_week = []
-    
-    # Add empty cells for days before month starts
-    # Monday is 0, Sunday is 6 in calendar module
-    for _ in range(first_day_weekday):
-        current_week.append({
-            "day": 0,
-            "is_current_month": False,
-            "date_str": "",
-            "is_weekday": False
-        })
-    
-    # Add all days of the month
-    for day in range(1, num_days + 1):
-        date = datetime(year, month, day)
-        date_str = date.strftime("%a %b %d %Y")
-        weekday = date.weekday()  # 0 = Monday, 6 = Sunday
-        is_weekday = weekday < 5  # Monday-Friday
-        
-        current_week.append({
-            "day": day,
-            "is_current_month": True,
-            "date_str": date_str,
-            "date_iso": date.strftime("%Y-%m-%d"),
-            "is_weekday": is_weekday
-        })
-        
-        # If week is complete (7 days) or it's the last day, add to weeks
-        if len(current_week) == 7:
-            weeks.append(current_week)
-            current_week = []
-    
-    # Fill remaining days in last week
-    if current_week:
-        while len(current_week) < 7:
-            current_week.append({
-                "day": 0,
-                "is_current_month": False,
-                "date_str": "",
-                "is_weekday": False
-            })
-        weeks.append(current_week)
+    dates = year_dates(year)
+    empty = {
+        "day": 0,
+        "is_current_month": False,
+        "date_str": "",
+        "date_iso": "",
+        "is_weekday": False
+    }
     
-    return weeks
+    # Weeks of day indexes from the year's date table (Monday first)
+    return [
+        [
+            empty if index is None else {
+                "day": dates.day[index],
+                "is_current_month": True,
+                "date_str": dates.display[index],
+                "date_iso": dates.iso[index],
+                "is_weekday": dates.weekday[index] < 5  # Monday-Friday
+            }
+            for index in week
+        ]
+        for week in dates.month_weeks(month)
+    ]
 
 
-def calendar_day_cell_func(day_data: dict, on_click_handler: Callable, state_ref) -> rx.Component:
-    """Create a single day cell in the calendar."""
-    if not day_data["is_current_month"]:
-        # Empty cell for days outside current month
-        return rx.box(
-            width="100%",
-            height="50px",
-            background="var(--gray-2)",
-        )
+def _client_ref(name: str) -> Var:
+    """Global ref of a client state var or setter (always current, also inside handlers)."""
+    return Var(
+        _js_expr=f"refs['_client_state_{name}']",
+        _var_data=VarData(imports={"$/utils/state": [ImportVar(tag="refs")]}),
+    )
+
+
+def _client_handler(js_expr: str, *vars: Var) -> Var:
+    """Frontend-only event trigger running js_expr (with the hooks of the vars it uses)."""
+    var_data = VarData.merge(range_anchor._var_data, range_hover._var_data, *(var._get_all_var_data() for var in vars))
+    return Var(_js_expr=f"(() => ({js_expr}))", _var_data=var_data).to(FunctionVar, EventChain)
+
+
+def range_selection_handlers(date_iso: rx.Var, on_select_range: Callable, can_edit: rx.Var) -> dict:
+    """Mouse triggers of a weekday cell for client-side range selection.
     
-    date_iso = day_data.get("date_iso", "")
+    - mouse down on a day starts a selection (the START day),
+    - dragging previews the range and releasing on another day commits it,
+    - releasing on the START day keeps it, the next click (any day, the same
+      day for a single date) commits it.
     
+    Only a commit reaches the backend: on_select_range(start_iso, end_iso).
+    Read-only calendars commit on the first press so the backend reports why.
+    """
+    anchor = _client_ref("range_anchor")
+    set_anchor = _client_ref(range_anchor._setter_name)
+    set_hover = _client_ref(range_hover._setter_name)
+    commit = LiteralVar.create(
+        EventChain(events=[on_select_range(anchor, date_iso)], args_spec=lambda: [])
+    )
+    commit_single = LiteralVar.create(
+        EventChain(events=[on_select_range(date_iso, date_iso)], args_spec=lambda: [])
+    )
+    clear = f'{set_anchor}(""), {set_hover}("")'
+    return {
+        "on_mouse_down": _client_handler(
+            f'{anchor} === "" '
+            f"? ({can_edit} ? ({set_anchor}({date_iso}), {set_hover}({date_iso})) : {commit_single}()) "
+            f": ({commit}(), {clear})",
+            anchor, date_iso, can_edit, commit, commit_single,
+        ),
+        "on_mouse_enter": _client_handler(
+            f'{anchor} !== "" ? {set_hover}({date_iso}) : null',
+            anchor, date_iso,
+        ),
+        "on_mouse_up": _client_handler(
+            f'{anchor} !== "" && {anchor} !== {date_iso} ? ({commit}(), {clear}) : null',
+            anchor, date_iso, commit,
+        ),
+    }
+
+
+def calendar_day_cell_func(cell: rx.Var, month: int, on_select_range: Callable, state_ref) -> rx.Component:
+    """Create a single day cell of the month grid from a DayCell var."""
     # Style based on whether it's a weekday or weekend
     base_style = {
         "width": "100%",
@@ -87,63 +117,87 @@ def calendar_day_cell_func(day_data: dict, on_click_handler: Callable, state_ref
         "align_items": "center",
         "justify_content": "center",
     }
+    date_iso = cell["date_iso"].to(str)
     
-    if day_data["is_weekday"]:
-        # Weekday - clickable. Use state to get flag color
-        flag_color = state_ref.flag_colors_by_date.get(date_iso, "var(--accent-2)")
-        hours_val = state_ref.hours.get(date_iso, 0.0)
-        
-        return rx.box(
-            # Day number
-            rx.text(str(day_data["day"]), size="3", weight="medium"),
-            # Hours (if > 0 and no flag)
-            rx.cond(
-                hours_val > 0.0,
-                rx.text(f"{hours_val}h", size="1", color="var(--gray-11)"),
-                rx.box(),
-            ),
-            # Range start indicator
-            rx.cond(
-                state_ref.range_start_date == date_iso,
-                rx.badge("START", size="1", color_scheme="blue", position="absolute", top="2px", right="2px"),
-                rx.box(),
-            ),
-            on_click=lambda: on_click_handler(day_data["date_str"]),
-            on_mouse_enter=lambda: state_ref.set_hovered_date(day_data["date_str"]),
-            on_mouse_leave=lambda: state_ref.set_hovered_date(""),
-            cursor="pointer",
-            background=flag_color,
-            border=rx.cond(
-                state_ref.range_start_date == date_iso,
-                "2px solid var(--accent-9)",
-                "1px solid var(--gray-6)"
-            ),
-            _hover={
-                "transform": "scale(1.05)",
-                "box_shadow": "0 2px 8px rgba(0,0,0,0.15)",
-            },
-            transition="all 0.15s",
-            **base_style
-        )
-    else:
-        # Weekend - not clickable
-        return rx.box(
-            rx.text(str(day_data["day"])),
-            background="var(--gray-3)",
-            color="var(--gray-9)",
-            cursor="not-allowed",
-            border="1px solid var(--gray-6)",
-            **base_style
-        )
-
-
-def custom_month_calendar(year: int, month: int, on_click_day: Callable, state_ref=None) -> rx.Component:
-    """Create a custom calendar for a specific month."""
+    # Selection state from the browser (no backend round-trip while selecting)
+    anchor = range_anchor.value.to(str)
+    hover = range_hover.value.to(str)
+    is_range_start = anchor == date_iso
+    in_preview = (anchor != "") & (
+        ((anchor <= date_iso) & (date_iso <= hover)) | ((hover <= date_iso) & (date_iso <= anchor))
+    )
+    
+    # Read from the month's shard so a save only re-renders the edited month
+    flag_color = getattr(state_ref, f"month_{month:02d}_flag_colors").get(date_iso, "var(--accent-2)")
+    hours_val = getattr(state_ref, f"month_{month:02d}_hours").get(date_iso, 0.0)
+    
+    # Weekday - clickable, colored by its flag
+    weekday_cell = rx.box(
+        # Day number
+        rx.text(cell["day"], size="3", weight="medium"),
+        # Hours (if > 0 and no flag)
+        rx.cond(
+            hours_val > 0.0,
+            rx.text(f"{hours_val}h", size="1", color="var(--gray-11)"),
+            rx.box(),
+        ),
+        # Range start indicator
+        rx.cond(
+            is_range_start,
+            rx.badge("START", size="1", color_scheme="blue", position="absolute", top="2px", right="2px"),
+            rx.box(),
+        ),
+        **range_selection_handlers(date_iso, on_select_range, state_ref.can_edit_viewed_calendar),
+        cursor="pointer",
+        user_select="none",
+        background=flag_color,
+        border=rx.cond(
+            is_range_start,
+            "2px solid var(--accent-9)",
+            rx.cond(in_preview, "2px dashed var(--accent-8)", "1px solid var(--gray-6)"),
+        ),
+        _hover={
+            "transform": "scale(1.05)",
+            "box_shadow": "0 2px 8px rgba(0,0,0,0.15)",
+        },
+        transition="all 0.15s",
+        **base_style
+    )
+    
+    # Weekend - not clickable
+    weekend_cell = rx.box(
+        rx.text(cell["day"]),
+        background="var(--gray-3)",
+        color="var(--gray-9)",
+        cursor="not-allowed",
+        border="1px solid var(--gray-6)",
+        **base_style
+    )
+    
+    return rx.cond(
+        cell["day"] == 0,
+        # Empty cell for days outside current month
+        rx.box(
+            width="100%",
+            height="50px",
+            background="var(--gray-2)",
+        ),
+        rx.cond(cell["is_weekday"], weekday_cell, weekend_cell),
+    )
+
+
+def custom_month_calendar(month: int, on_select_range: Callable, state_ref=None) -> rx.Component:
+    """Create a custom calendar for a month of the viewed year.
+    
+    The grid is a single component rendered with rx.foreach over the
+    month's week matrix (month_MM_weeks), so changing the viewed year or
+    editing days only changes data, never the component tree.
+    """
     from .state import CalendarState
     if state_ref is None:
         state_ref = CalendarState
     
-    weeks = get_month_data(year, month)
+    weeks = getattr(state_ref, f"month_{month:02d}_weeks")
     
     # Day headers
     day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
@@ -170,15 +224,15 @@ def custom_month_calendar(year: int, month: int, on_click_day: Callable, state_r
         ),
         # Calendar grid
         rx.box(
-            *[
-                rx.grid(
-                    *[calendar_day_cell_func(day, on_click_day, state_ref) for day in week],
+            rx.foreach(
+                weeks,
+                lambda week: rx.grid(
+                    rx.foreach(week, lambda cell: calendar_day_cell_func(cell, month, on_select_range, state_ref)),
                     columns="7",
                     spacing="1",
                     margin_bottom="2px",
-                )
-                for week in weeks
-            ],
+                ),
+            ),
         ),
         width="100%",
         padding="8px",
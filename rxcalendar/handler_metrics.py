@@ -0,0 +1,146 @@
+"""Opt-in per-handler metrics served in the Prometheus text format.
+
+Set RXCALENDAR_METRICS=1 to record, for every CalendarState event handler
+(labelled by handler name):
+
+- rxcalendar_handler_duration_seconds: time spent in the handler
+- rxcalendar_handler_delta_seconds: time spent building its state delta
+  (where dirty computed vars are re-evaluated)
+- rxcalendar_handler_delta_bytes: size of the serialized delta sent to the browser
+- rxcalendar_handler_recomputed_vars: computed vars re-evaluated for the event
+- rxcalendar_handler_exceptions_total: exceptions raised, by exception type
+
+The first four are histograms. Handlers are tracked by ``instrument_handlers``
+(computed_vars.py) and the metrics are exposed on ``/metrics`` of the backend
+(backend_api.py):
+
+- with RXCALENDAR_METRICS_TOKEN set, to requests sending
+  ``Authorization: Bearer <token>`` (from any host)
+- otherwise to loopback clients only (e.g. a Prometheus agent on the same
+  host). A reverse proxy on the same host is a loopback client too, so it
+  must not forward ``/metrics`` (or set a token).
+
+Metrics are kept per backend process, like the rest of the in-memory state.
+"""
+
+import hmac
+import os
+import threading
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+
+# Record handler metrics and serve them on /metrics
+METRICS_ENABLED = os.environ.get("RXCALENDAR_METRICS", "") not in ("", "0")
+
+# Bearer token required to read /metrics (unset: loopback clients only)
+METRICS_TOKEN = os.environ.get("RXCALENDAR_METRICS_TOKEN", "")
+
+# Clients allowed to read /metrics when no token is set
+LOCAL_HOSTS = {"127.0.0.1", "::1", "localhost"}
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Prometheus histogram with one series per handler."""
+
+    __slots__ = ("name", "help", "buckets", "series")
+
+    def __init__(self, name: str, help: str, buckets: tuple):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        # handler -> [count per bucket (last one is +Inf), sum, count]
+        self.series: dict[str, list] = {}
+
+    def observe(self, handler: str, value: float):
+        series = self.series.get(handler)
+        if series is None:
+            series = self.series[handler] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        bucket = 0
+        while bucket < len(self.buckets) and value > self.buckets[bucket]:
+            bucket += 1
+        series[0][bucket] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for handler, (counts, total, count) in sorted(self.series.items()):
+            label = f'handler="{_escape(handler)}"'
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label}}} {total}")
+            lines.append(f"{self.name}_count{{{label}}} {count}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_lock = threading.Lock()
+_duration = Histogram("rxcalendar_handler_duration_seconds", "Time spent in the event handler.", SECONDS_BUCKETS)
+_delta_duration = Histogram(
+    "rxcalendar_handler_delta_seconds", "Time spent building the state delta of the event.", SECONDS_BUCKETS
+)
+_delta_bytes = Histogram("rxcalendar_handler_delta_bytes", "Size of the serialized state delta.", BYTES_BUCKETS)
+_recomputed = Histogram(
+    "rxcalendar_handler_recomputed_vars", "Computed vars re-evaluated for the event.", COUNT_BUCKETS
+)
+# (handler, exception type) -> count
+_exceptions: dict[tuple[str, str], int] = {}
+
+
+def observe_handler(handler: str, seconds: float, error: BaseException | None = None):
+    """Record a handler run (and the exception it raised, if any)."""
+    with _lock:
+        _duration.observe(handler, seconds)
+        if error is not None:
+            key = (handler, type(error).__name__)
+            _exceptions[key] = _exceptions.get(key, 0) + 1
+
+
+def observe_delta(handler: str, seconds: float, size: int, recomputed: int):
+    """Record the delta built for a handler's event."""
+    with _lock:
+        _delta_duration.observe(handler, seconds)
+        _delta_bytes.observe(handler, size)
+        _recomputed.observe(handler, recomputed)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        lines = []
+        for histogram in (_duration, _delta_duration, _delta_bytes, _recomputed):
+            lines += histogram.render()
+        lines.append("# HELP rxcalendar_handler_exceptions_total Exceptions raised by the event handler.")
+        lines.append("# TYPE rxcalendar_handler_exceptions_total counter")
+        for (handler, exception), count in sorted(_exceptions.items()):
+            lines.append(
+                f'rxcalendar_handler_exceptions_total{{handler="{_escape(handler)}",exception="{_escape(exception)}"}} {count}'
+            )
+    return "\n".join(lines) + "\n"
+
+
+def _allowed(request: Request) -> bool:
+    """Whether a request may read the metrics (token, or loopback client without one)."""
+    if METRICS_TOKEN:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        return scheme.lower() == "bearer" and hmac.compare_digest(token.strip().encode(), METRICS_TOKEN.encode())
+    return request.client is not None and request.client.host in LOCAL_HOSTS
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """GET /metrics (bearer token, or local clients only)."""
+    if not _allowed(request):
+        return PlainTextResponse("Forbidden\n", status_code=403)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -1,9 +1,13 @@
 """Welcome to Reflex! This file outlines the steps to create a basic app."""
 
+import asyncio
+
 import reflex as rx
 
 from rxconfig import config
 from .state import CalendarState
+from .backend_api import backend_api, cleanup_artifacts
+from .services.calendar_store import get_calendar_store
 from .components import (
     header,
     calendar_grid,
@@ -62,5 +66,17 @@ def index() -> rx.Component:
     )
 
 
-app = rx.App()
-app.add_page(index, title="2026 Calendar - Add Comments to Your Days")
+async def open_calendar_store():
+    """Open the calendar store at startup (off the event loop)."""
+    await asyncio.to_thread(get_calendar_store().open)
+
+
+# Export downloads (/artifacts) and per-handler metrics (/metrics)
+app = rx.App(api_transformer=backend_api())
+app.register_lifespan_task(open_calendar_store)
+app.register_lifespan_task(cleanup_artifacts)
+app.add_page(
+    index,
+    title="2026 Calendar - Add Comments to Your Days",
+    on_load=CalendarState.load_calendar_data,
+)
@@ -2,5 +2,18 @@
 
 from rxcalendar.services.png_export_service import generate_calendar_png
 from rxcalendar.services.pdf_export_service import generate_calendar_pdf
+from rxcalendar.services.calendar_year import CalendarYear, DayValue
+from rxcalendar.services.history_entry import HistoryEntry
+from rxcalendar.services.org_directory import OrgDirectory
+from rxcalendar.services.journal_service import CalendarJournal, JournalSnapshotError, SnapshotInfo, get_journal
+from rxcalendar.services.calendar_store import (
+    CalendarStore,
+    JournalCalendarStore,
+    SQLiteCalendarStore,
+    get_calendar_store,
+    set_calendar_store,
+)
 
-__all__ = ['generate_calendar_png', 'generate_calendar_pdf']
+__all__ = ['generate_calendar_png', 'generate_calendar_pdf', 'CalendarYear', 'DayValue', 'HistoryEntry', 'OrgDirectory', 'CalendarJournal', 'JournalSnapshotError', 'SnapshotInfo', 'get_journal',
+           'CalendarStore', 'JournalCalendarStore', 'SQLiteCalendarStore',
+           'get_calendar_store', 'set_calendar_store']
@@ -0,0 +1,117 @@
+"""Temporary store of generated downloads (PNG, PDF and JSON exports).
+
+Exports are written here instead of being sent through the websocket as
+``rx.download(data=...)`` payloads, and the browser downloads them from the
+backend (``/artifacts/<token>/<filename>``, see backend_api.py). Each
+artifact lives in its own directory named by a random token::
+
+    <directory>/<token>/<filename>
+
+The token is the only way to reach the file, and an artifact expires
+``ttl_seconds`` after it was written. The store keeps no index in memory:
+the token directory and the file's modification time are all there is, so
+any backend worker can serve an artifact written by another one. Expired
+artifacts are removed by ``cleanup`` (run periodically by the backend).
+"""
+
+import os
+import re
+import secrets
+import shutil
+import tempfile
+import time
+
+
+# Store location and lifetime of an artifact (override with environment variables)
+DEFAULT_ARTIFACT_DIR = os.environ.get(
+    "RXCALENDAR_ARTIFACT_DIR",
+    os.path.join(tempfile.gettempdir(), "rxcalendar-artifacts"),
+)
+DEFAULT_ARTIFACT_TTL = int(os.environ.get("RXCALENDAR_ARTIFACT_TTL", "600"))
+
+_TOKEN = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+
+def _safe_filename(filename: str) -> str:
+    """Filename without any directory part (never empty)."""
+    name = os.path.basename(filename.replace("\\", "/")).strip()
+    return name if name not in ("", ".", "..") else "download"
+
+
+class ArtifactStore:
+    """Directory of expiring, token-addressed download files."""
+
+    __slots__ = ("directory", "ttl_seconds")
+
+    def __init__(self, directory: str = DEFAULT_ARTIFACT_DIR, ttl_seconds: int = DEFAULT_ARTIFACT_TTL):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+
+    def new_path(self, filename: str) -> tuple[str, str]:
+        """(token, path) of a new artifact, for the caller to write to."""
+        token = secrets.token_urlsafe(16)
+        artifact_dir = os.path.join(self.directory, token)
+        os.makedirs(artifact_dir)
+        return token, os.path.join(artifact_dir, _safe_filename(filename))
+
+    def put(self, filename: str, data: bytes | str) -> str:
+        """Store data as a new artifact; returns its token."""
+        token, path = self.new_path(filename)
+        with open(path, "wb") as f:
+            f.write(data.encode("utf-8") if isinstance(data, str) else data)
+        return token
+
+    def discard(self, token: str):
+        """Remove an artifact (e.g. after a failed write)."""
+        if _TOKEN.match(token):
+            shutil.rmtree(os.path.join(self.directory, token), ignore_errors=True)
+
+    def get(self, token: str, filename: str) -> str | None:
+        """Path of an artifact if it exists under that name and has not expired."""
+        if not _TOKEN.match(token) or _safe_filename(filename) != filename:
+            return None
+        path = os.path.join(self.directory, token, filename)
+        try:
+            written = os.stat(path).st_mtime
+        except OSError:
+            return None
+        if time.time() - written > self.ttl_seconds:
+            return None
+        return path
+
+    def cleanup(self) -> int:
+        """Remove the expired artifacts; returns how many were removed."""
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return 0
+        expires_before = time.time() - self.ttl_seconds
+        removed = 0
+        for entry in entries:
+            try:
+                expired = entry.is_dir() and entry.stat().st_mtime < expires_before and all(
+                    child.stat().st_mtime < expires_before for child in os.scandir(entry.path)
+                )
+            except OSError:
+                continue
+            if expired:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+        return removed
+
+
+_store: ArtifactStore | None = None
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Get the process-wide artifact store."""
+    global _store
+    if _store is None:
+        _store = ArtifactStore()
+    return _store
+
+
+def set_artifact_store(store: ArtifactStore | None):
+    """Replace the process-wide artifact store (e.g. another directory)."""
+    global _store
+    _store = store
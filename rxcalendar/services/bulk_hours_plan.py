@@ -0,0 +1,138 @@
+"""Reusable bulk-hours plan shared by the preview and the apply step.
+
+Setting bulk hours is a two step interaction: the preview counts the days
+that would be affected and overwritten (to ask for confirmation), then apply
+writes them. Both need the same scan over every visible user and weekday, so
+the preview builds a BulkHoursPlan once and apply executes it, as long as its
+inputs (org version, viewer scope, months and hours) did not change.
+
+A plan holds, per user, the writes it would make::
+
+    (date_iso, prev_comment, prev_hours, new_hours)
+
+Flagged days and days already holding the target hours are not part of the
+writes. Conflicts (days with other hours already set) are kept in the plan
+and only filtered out when the plan is executed with skip_conflicts.
+"""
+
+from typing import Callable, Iterable
+
+from rxcalendar.services.calendar_year import DayValue
+from rxcalendar.services.date_table import year_dates
+from rxcalendar.services.history_entry import HistoryEntry
+
+
+# (date_iso, prev_comment, prev_hours, new_hours)
+PlannedWrite = tuple[str, str, float, float]
+
+
+def month_weekdays(year: int, months: Iterable[int]) -> list[tuple[str, int]]:
+    """(date_iso, weekday) of the Monday-Friday days of the given months, in date order."""
+    dates = year_dates(year)
+    return [weekday for month in months for weekday in dates.month_weekdays(month)]
+
+
+class BulkHoursPlan:
+    """Writes of a bulk-hours run, computed once for preview and apply."""
+
+    __slots__ = (
+        "key",
+        "user_ids",
+        "dates",
+        "writes",
+        "affected_count",
+        "overwrite_count",
+        "conflict_count",
+    )
+
+    def __init__(
+        self,
+        key: tuple,
+        user_ids: list[str],
+        dates: list[str],
+        writes: dict[str, list[PlannedWrite]],
+        affected_count: int,
+        overwrite_count: int,
+        conflict_count: int,
+    ):
+        self.key = key
+        self.user_ids = user_ids
+        self.dates = dates
+        self.writes = writes
+        self.affected_count = affected_count  # Unflagged days (what the confirmation reports)
+        self.overwrite_count = overwrite_count  # Unflagged days that already have hours
+        self.conflict_count = conflict_count  # Writes replacing other hours (skippable)
+
+    @classmethod
+    def build(
+        cls,
+        key: tuple,
+        user_ids: list[str],
+        weekdays: list[tuple[str, int]],
+        existing_days: dict[str, dict[str, DayValue]],
+        hours_mon_thu: float,
+        hours_fri: float,
+    ) -> "BulkHoursPlan":
+        """Scan the current values of user_ids on weekdays (one pass per user)."""
+        empty: DayValue = {}
+        writes: dict[str, list[PlannedWrite]] = {}
+        affected_count = 0
+        overwrite_count = 0
+        conflict_count = 0
+
+        for user_id in user_ids:
+            user_days = existing_days.get(user_id, {})
+            user_writes = []
+            for date_iso, weekday in weekdays:
+                day = user_days.get(date_iso, empty)
+                if day.get("flag", ""):
+                    continue  # Flagged days are never touched
+
+                affected_count += 1
+                prev_hours = day.get("hours", 0.0)
+                if prev_hours > 0:
+                    overwrite_count += 1
+
+                # weekday: 0=Monday ... 3=Thursday, 4=Friday
+                hours = hours_mon_thu if weekday < 4 else hours_fri
+                if prev_hours == hours:
+                    continue  # No change
+                if prev_hours > 0:
+                    conflict_count += 1
+                user_writes.append((date_iso, day.get("comment", ""), prev_hours, hours))
+            if user_writes:
+                writes[user_id] = user_writes
+
+        return cls(
+            key,
+            user_ids,
+            [date_iso for date_iso, _ in weekdays],
+            writes,
+            affected_count,
+            overwrite_count,
+            conflict_count,
+        )
+
+    def history_records(
+        self,
+        skip_conflicts: bool,
+        new_entry: Callable[[str, str, float], HistoryEntry],
+    ) -> tuple[list[tuple[str, str, HistoryEntry]], int]:
+        """(user_id, date_iso, entry) records of the plan and the number of skipped conflicts.
+
+        new_entry(action, prev_comment, hours) creates the entries, so a whole
+        run shares one author and timestamp.
+        """
+        records = []
+        skipped = 0
+        for user_id, user_writes in self.writes.items():
+            for date_iso, prev_comment, prev_hours, hours in user_writes:
+                if prev_hours > 0:
+                    if skip_conflicts:
+                        skipped += 1
+                        continue
+                    action = "hours changed (bulk set)"
+                else:
+                    action = "hours added (bulk set)"
+                records.append((user_id, date_iso, new_entry(action, prev_comment, hours)))
+        return records, skipped
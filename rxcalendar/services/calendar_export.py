@@ -0,0 +1,86 @@
+"""JSON calendar exports (single calendar and streaming bulk export).
+
+A calendar export is the document the import accepts::
+
+    {"export_metadata": {...}, "calendar_owner": {"id", "name", "role"},
+     "project": {...}, "region": "...", "year": 2026,
+     "calendar_status": "...", "days": [{"date", "flag", "comment", "hours"}]}
+
+The bulk export is NDJSON: a first line holding the export metadata
+(``{"export_metadata": {..., "export_count": n}}``), then one calendar per
+line. Its lines are generated one calendar at a time and written to a file
+as they come (gzip compressed if asked), so memory stays flat whatever the
+number of users. Everything here only reads the calendar store and an org
+snapshot, so the bulk export can run in a worker thread.
+"""
+
+import gzip
+import json
+from typing import Iterable, Iterator
+
+from rxcalendar.services import holiday_overlay
+from rxcalendar.services.calendar_store import CalendarStore
+from rxcalendar.services.date_table import year_dates
+from rxcalendar.services.org_directory import OrgDirectory
+
+
+# Status of a calendar that was never submitted (CalendarState.STATUS_DRAFT)
+STATUS_DRAFT = "draft"
+
+
+def calendar_export(store: CalendarStore, org: OrgDirectory, user_id: str, year: int, metadata: dict) -> dict:
+    """Export document of a user's calendar for a year ({} if the user is unknown)."""
+    user = org.user(user_id)
+    if not user:
+        return {}
+
+    project = org.project(user.get("project_id"))
+
+    # Only days with data, in date order
+    calendar = holiday_overlay.load_calendar(store, user, year)
+    days = []
+    for date_iso in year_dates(year).iso:
+        value = calendar.get(date_iso)
+        if value is None:
+            continue
+        flag = value.get("flag", "")
+        comment = value.get("comment", "")
+        hours = value.get("hours", 0.0)
+        if flag or comment or hours > 0:
+            days.append({"date": date_iso, "flag": flag, "comment": comment, "hours": hours})
+
+    return {
+        "export_metadata": metadata,
+        "calendar_owner": {"id": user["id"], "name": user["name"], "role": user["role"]},
+        "project": project if project else {"id": "", "name": "", "description": ""},
+        "region": user.get("region", ""),
+        "year": year,
+        "calendar_status": store.get_status(user_id) or STATUS_DRAFT,
+        "days": days,
+    }
+
+
+def iter_bulk_export_lines(
+    store: CalendarStore,
+    org: OrgDirectory,
+    user_ids: Iterable[str],
+    year: int,
+    metadata: dict,
+) -> Iterator[str]:
+    """NDJSON lines of a bulk export: the metadata, then one calendar per user."""
+    user_ids = list(user_ids)
+    yield json.dumps({"export_metadata": {**metadata, "export_count": len(user_ids)}}, ensure_ascii=False) + "\n"
+    for user_id in user_ids:
+        export = calendar_export(store, org, user_id, year, metadata)
+        if export:
+            yield json.dumps(export, ensure_ascii=False) + "\n"
+
+
+def write_lines(path: str, lines: Iterable[str], compress: bool = False) -> int:
+    """Write lines to path as they are generated (gzip if compress); returns the line count."""
+    count = 0
+    with gzip.open(path, "wt", encoding="utf-8") if compress else open(path, "w", encoding="utf-8") as f:
+        for line in lines:
+            f.write(line)
+            count += 1
+    return count
@@ -0,0 +1,534 @@
+"""Pluggable storage engines for per-user calendars.
+
+CalendarState reads and writes calendar data through a CalendarStore, so only
+the calendar being viewed has to be pulled into session memory:
+
+- SQLiteCalendarStore (default): on-disk SQLite database in WAL mode, with
+  tables indexed by (user_id, date) for current day values and history entries,
+  plus calendar status, status history and quotas.
+- JournalCalendarStore (alternative, RXCALENDAR_STORE=journal): in-memory
+  calendars made durable by the append-only journal, with its snapshots and
+  compaction (see journal_service).
+
+Calendars are partitioned by year: reads take an optional year and only
+touch that year's days and history (a key range of (user_id, date) in
+SQLite, one CalendarYear in the journal view), so a session holds the year
+it views, not every year of history.
+
+Select the engine with RXCALENDAR_STORE=sqlite|journal.
+"""
+
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Collection
+
+from rxcalendar.services.calendar_year import DayValue, normalize_hours
+from rxcalendar.services.history_entry import HistoryEntry
+from rxcalendar.services.journal_service import CalendarJournal, get_journal
+
+
+# Store selection and location (override with environment variables)
+DEFAULT_STORE_ENGINE = os.environ.get("RXCALENDAR_STORE", "sqlite")
+DEFAULT_DB_PATH = os.environ.get(
+    "RXCALENDAR_DB_PATH",
+    os.path.join("data", "calendar.db"),
+)
+
+# Quota scope used for company-wide quotas (per-user quotas use the user id)
+COMPANY_SCOPE = "*"
+
+
+# (user_id, date_iso, history entry)
+HistoryRecord = tuple[str, str, HistoryEntry]
+
+
+class CalendarStore(ABC):
+    """Storage interface for calendars, history, validation status and quotas.
+
+    Every history entry also defines the current values of its day, so writers
+    only ever append history; stores keep the materialized day values in sync.
+    Day hours are kept rounded to a quarter hour (normalize_hours) by every
+    engine, so a write reads back the same whatever RXCALENDAR_STORE is.
+    """
+
+    # Day values version of this process's store: bumped by every append_history,
+    # so results computed from earlier reads can be told apart
+    version = 0
+
+    def open(self):
+        """Prepare the store (create schema, replay journal). Idempotent."""
+
+    def close(self):
+        """Release store resources."""
+
+    # ----- Day values -----
+
+    @abstractmethod
+    def load_calendar(self, user_id: str, year: int | None = None) -> dict[str, DayValue]:
+        """Get the days with stored values of a user's year (default: all years): {date_iso: DayValue}."""
+
+    @abstractmethod
+    def get_days(self, user_ids: Collection[str], dates: list[str]) -> dict[str, dict[str, DayValue]]:
+        """Get stored day values for several users and dates: {user_id: {date_iso: DayValue}}.
+
+        Users or dates without stored values are omitted.
+        """
+
+    @abstractmethod
+    def calendar_ids(self, prefix: str) -> list[str]:
+        """Ids of the stored calendars whose id starts with prefix (e.g. holiday scopes)."""
+
+    @abstractmethod
+    def calendar_years(self, user_id: str) -> list[int]:
+        """Years with stored values in a user's calendar, ascending."""
+
+    # ----- History -----
+
+    @abstractmethod
+    def append_history(self, records: list[HistoryRecord]):
+        """Append history entries (one batch) and update the day values they define."""
+
+    @abstractmethod
+    def load_history(self, user_id: str, year: int | None = None) -> dict[str, list[HistoryEntry]]:
+        """Get a user's history of a year (default: all years): {date_iso: [entries, oldest first]}."""
+
+    @abstractmethod
+    def get_history(self, user_id: str, date_iso: str) -> list[HistoryEntry]:
+        """Get the history entries of a single date (oldest first)."""
+
+    # ----- Validation status -----
+
+    @abstractmethod
+    def get_status(self, user_id: str) -> str:
+        """Get a calendar's validation status ("" if never set)."""
+
+    @abstractmethod
+    def append_status(self, user_id: str, entry: dict):
+        """Append a status change entry; the calendar status becomes entry["to_status"]."""
+
+    @abstractmethod
+    def get_status_history(self, user_id: str) -> list[dict]:
+        """Get a calendar's status change history (oldest first)."""
+
+    # ----- Quotas -----
+
+    @abstractmethod
+    def get_quota(self, scope: str, quota: str) -> float | None:
+        """Get a quota (in days) for a user id or COMPANY_SCOPE, None if unset."""
+
+    @abstractmethod
+    def set_quota(self, scope: str, quota: str, days: float):
+        """Set a quota (in days) for a user id or COMPANY_SCOPE."""
+
+
+def year_bounds(year: int) -> tuple[str, str]:
+    """First and last ISO dates of a year (inclusive range of its date keys)."""
+    return f"{year:04d}-01-01", f"{year:04d}-12-31"
+
+
+class JournalCalendarStore(CalendarStore):
+    """In-memory calendars kept durable by the append-only journal."""
+
+    def __init__(self, journal: CalendarJournal | None = None):
+        self.journal = journal or get_journal()
+
+    def _users(self) -> dict:
+        """Live materialized view of the journal (replayed on first use)."""
+        return self.journal.load()
+
+    def open(self):
+        self._users()
+
+    def load_calendar(self, user_id: str, year: int | None = None) -> dict[str, DayValue]:
+        user = self._users().get(user_id)
+        if not user:
+            return {}
+        if year is None:
+            years = user["years"].values()
+        else:
+            years = [user["years"][year]] if year in user["years"] else []
+        days = {}
+        for calendar_year in years:
+            days.update(calendar_year.days())
+        return days
+
+    def get_days(self, user_ids: Collection[str], dates: list[str]) -> dict[str, dict[str, DayValue]]:
+        users = self._users()
+        result = {}
+        for user_id in user_ids:
+            user = users.get(user_id)
+            if not user:
+                continue
+            days = {}
+            for date_iso in dates:
+                year = user["years"].get(int(date_iso[:4]))
+                value = year.get_day(date_iso) if year else None
+                if value is not None:
+                    days[date_iso] = value
+            if days:
+                result[user_id] = days
+        return result
+
+    def calendar_ids(self, prefix: str) -> list[str]:
+        return sorted(user_id for user_id in self._users() if user_id.startswith(prefix))
+
+    def calendar_years(self, user_id: str) -> list[int]:
+        user = self._users().get(user_id)
+        return sorted(user["years"]) if user else []
+
+    def append_history(self, records: list[HistoryRecord]):
+        if records:
+            self._users()  # Make sure the live view exists before writing
+            self.journal.append_history_batch(records)
+            self.version += 1
+
+    def load_history(self, user_id: str, year: int | None = None) -> dict[str, list[HistoryEntry]]:
+        self.journal.wait_history(year)  # Archived history is read after the start / on first use
+        user = self._users().get(user_id)
+        if not user:
+            return {}
+        if year is None:
+            return {date_iso: list(entries) for date_iso, entries in user["history"].items()}
+        first_date, last_date = year_bounds(year)
+        return {
+            date_iso: list(entries)
+            for date_iso, entries in user["history"].items()
+            if first_date <= date_iso <= last_date
+        }
+
+    def get_history(self, user_id: str, date_iso: str) -> list[HistoryEntry]:
+        self.journal.wait_history(int(date_iso[:4]))
+        user = self._users().get(user_id)
+        if not user:
+            return []
+        return list(user["history"].get(date_iso, []))
+
+    def get_status(self, user_id: str) -> str:
+        user = self._users().get(user_id)
+        return user["calendar_status"] if user else ""
+
+    def append_status(self, user_id: str, entry: dict):
+        self._users()
+        self.journal.append_status(user_id, entry)
+
+    def get_status_history(self, user_id: str) -> list[dict]:
+        user = self._users().get(user_id)
+        return list(user["status_history"]) if user else []
+
+    def get_quota(self, scope: str, quota: str) -> float | None:
+        user = self._users().get(scope)
+        return user["quotas"].get(quota) if user else None
+
+    def set_quota(self, scope: str, quota: str, days: float):
+        self._users()
+        self.journal.append_quota(scope, quota, days)
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS day_values (
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    comment TEXT NOT NULL DEFAULT '',
+    flag TEXT NOT NULL DEFAULT '',
+    hours REAL NOT NULL DEFAULT 0,
+    updated INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS day_values_date ON day_values (date);
+
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    comment TEXT NOT NULL DEFAULT '',
+    flag TEXT NOT NULL DEFAULT '',
+    hours REAL NOT NULL DEFAULT 0,
+    user_name TEXT NOT NULL DEFAULT '',
+    user_role TEXT NOT NULL DEFAULT '',
+    propagated_by TEXT
+);
+CREATE INDEX IF NOT EXISTS history_user_date ON history (user_id, date, id);
+
+CREATE TABLE IF NOT EXISTS calendar_status (
+    user_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS status_history (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    from_status TEXT NOT NULL,
+    to_status TEXT NOT NULL,
+    actor TEXT NOT NULL DEFAULT '',
+    actor_role TEXT NOT NULL DEFAULT '',
+    changes_summary TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS status_history_user ON status_history (user_id, id);
+
+CREATE TABLE IF NOT EXISTS quotas (
+    scope TEXT NOT NULL,
+    quota TEXT NOT NULL,
+    days REAL NOT NULL,
+    PRIMARY KEY (scope, quota)
+) WITHOUT ROWID;
+"""
+
+
+def _migrate_schema(conn: sqlite3.Connection):
+    """Upgrade databases created by earlier versions of the schema."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(day_values)")}
+    if "updated" not in columns:
+        with conn:
+            conn.execute("ALTER TABLE day_values ADD COLUMN updated INTEGER NOT NULL DEFAULT 0")
+
+
+def _history_entry_from_row(row: tuple) -> HistoryEntry:
+    """Rebuild a history entry from a (timestamp..propagated_by) row."""
+    return HistoryEntry(*row)
+
+
+class SQLiteCalendarStore(CalendarStore):
+    """Calendars stored on disk in a SQLite database (WAL mode)."""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use."""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SQLITE_SCHEMA)
+            _migrate_schema(conn)
+            self._conn = conn
+        return self._conn
+
+    def open(self):
+        with self._lock:
+            self._connection()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def load_calendar(self, user_id: str, year: int | None = None) -> dict[str, DayValue]:
+        with self._lock:
+            if year is None:
+                rows = self._connection().execute(
+                    "SELECT date, comment, flag, hours, updated FROM day_values WHERE user_id = ?",
+                    (user_id,),
+                ).fetchall()
+            else:
+                # Key range of the year in the (user_id, date) primary key
+                rows = self._connection().execute(
+                    "SELECT date, comment, flag, hours, updated FROM day_values "
+                    "WHERE user_id = ? AND date BETWEEN ? AND ?",
+                    (user_id, *year_bounds(year)),
+                ).fetchall()
+        return {date_iso: {"comment": comment, "flag": flag, "hours": hours, "updated": updated}
+                for date_iso, comment, flag, hours, updated in rows}
+
+    def get_days(self, user_ids: Collection[str], dates: list[str]) -> dict[str, dict[str, DayValue]]:
+        if not user_ids or not dates:
+            return {}
+        wanted_dates = set(dates)
+        first_date, last_date = min(dates), max(dates)
+        result: dict[str, dict[str, DayValue]] = {}
+        with self._lock:
+            conn = self._connection()
+            for user_id in user_ids:
+                rows = conn.execute(
+                    "SELECT date, comment, flag, hours, updated FROM day_values "
+                    "WHERE user_id = ? AND date BETWEEN ? AND ?",
+                    (user_id, first_date, last_date),
+                ).fetchall()
+                days = {date_iso: {"comment": comment, "flag": flag, "hours": hours, "updated": updated}
+                        for date_iso, comment, flag, hours, updated in rows
+                        if date_iso in wanted_dates}
+                if days:
+                    result[user_id] = days
+        return result
+
+    def calendar_ids(self, prefix: str) -> list[str]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT DISTINCT user_id FROM day_values WHERE user_id >= ? AND user_id < ? ORDER BY user_id",
+                (prefix, prefix + "\U0010ffff"),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def calendar_years(self, user_id: str) -> list[int]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT DISTINCT substr(date, 1, 4) FROM day_values WHERE user_id = ?",
+                (user_id,),
+            ).fetchall()
+        return sorted(int(row[0]) for row in rows)
+
+    def append_history(self, records: list[HistoryRecord]):
+        if not records:
+            return
+        history_rows = []
+        day_rows = {}
+        for user_id, date_iso, entry in records:
+            history_rows.append((
+                user_id,
+                date_iso,
+                entry.timestamp,
+                entry.action,
+                entry.comment,
+                entry.flag,
+                entry.hours,
+                entry.user,
+                entry.user_role,
+                entry.propagated_by,
+            ))
+            # Latest entry holds the current values for the date
+            day_rows[(user_id, date_iso)] = (
+                user_id, date_iso, entry.comment, entry.flag, normalize_hours(entry.hours), entry.timestamp
+            )
+
+        with self._lock:
+            conn = self._connection()
+            with conn:  # One transaction for the whole batch
+                conn.executemany(
+                    "INSERT INTO history (user_id, date, timestamp, action, comment, flag, hours, "
+                    "user_name, user_role, propagated_by) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    history_rows,
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO day_values (user_id, date, comment, flag, hours, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    list(day_rows.values()),
+                )
+            self.version += 1
+
+    def load_history(self, user_id: str, year: int | None = None) -> dict[str, list[HistoryEntry]]:
+        first_date, last_date = year_bounds(year) if year is not None else ("", "\U0010ffff")
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT date, timestamp, action, comment, flag, hours, user_name, user_role, propagated_by "
+                "FROM history WHERE user_id = ? AND date BETWEEN ? AND ? ORDER BY date, id",
+                (user_id, first_date, last_date),
+            ).fetchall()
+        history: dict[str, list[HistoryEntry]] = {}
+        for row in rows:
+            date_iso = row[0]
+            if date_iso not in history:
+                history[date_iso] = []
+            history[date_iso].append(_history_entry_from_row(row[1:]))
+        return history
+
+    def get_history(self, user_id: str, date_iso: str) -> list[HistoryEntry]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT timestamp, action, comment, flag, hours, user_name, user_role, propagated_by "
+                "FROM history WHERE user_id = ? AND date = ? ORDER BY id",
+                (user_id, date_iso),
+            ).fetchall()
+        return [_history_entry_from_row(row) for row in rows]
+
+    def get_status(self, user_id: str) -> str:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT status FROM calendar_status WHERE user_id = ?",
+                (user_id,),
+            ).fetchone()
+        return row[0] if row else ""
+
+    def append_status(self, user_id: str, entry: dict):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT INTO status_history (user_id, timestamp, from_status, to_status, "
+                    "actor, actor_role, changes_summary) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        user_id,
+                        entry.get("timestamp", ""),
+                        entry.get("from_status", ""),
+                        entry.get("to_status", ""),
+                        entry.get("actor", ""),
+                        entry.get("actor_role", ""),
+                        entry.get("changes_summary", ""),
+                    ),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO calendar_status (user_id, status) VALUES (?, ?)",
+                    (user_id, entry.get("to_status", "")),
+                )
+
+    def get_status_history(self, user_id: str) -> list[dict]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT timestamp, from_status, to_status, actor, actor_role, changes_summary "
+                "FROM status_history WHERE user_id = ? ORDER BY id",
+                (user_id,),
+            ).fetchall()
+        return [
+            {
+                "timestamp": timestamp,
+                "from_status": from_status,
+                "to_status": to_status,
+                "actor": actor,
+                "actor_role": actor_role,
+                "changes_summary": changes_summary,
+            }
+            for timestamp, from_status, to_status, actor, actor_role, changes_summary in rows
+        ]
+
+    def get_quota(self, scope: str, quota: str) -> float | None:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT days FROM quotas WHERE scope = ? AND quota = ?",
+                (scope, quota),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_quota(self, scope: str, quota: str, days: float):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO quotas (scope, quota, days) VALUES (?, ?, ?)",
+                    (scope, quota, days),
+                )
+
+
+_store: CalendarStore | None = None
+
+
+def create_calendar_store(engine: str = DEFAULT_STORE_ENGINE) -> CalendarStore:
+    """Create a calendar store for an engine name ("sqlite" or "journal")."""
+    if engine == "sqlite":
+        return SQLiteCalendarStore()
+    if engine == "journal":
+        return JournalCalendarStore()
+    raise ValueError(f"Unknown calendar store engine: {engine!r}")
+
+
+def get_calendar_store() -> CalendarStore:
+    """Get the process-wide calendar store."""
+    global _store
+    if _store is None:
+        _store = create_calendar_store()
+    return _store
+
+
+def set_calendar_store(store: CalendarStore | None):
+    """Replace the process-wide calendar store (e.g. to plug in another engine)."""
+    global _store
+    _store = store
@@ -0,0 +1,198 @@
+"""Compact array-backed representation of one user's calendar year.
+
+Days are indexed by their ordinal within the year (0 = January 1st):
+
+- hours: ``array("H")`` of quarter hours (7.75h is stored as 31)
+- flags: ``bytearray`` of interned flag codes, 0 meaning "no value stored"
+  and ``1 + index`` in FLAG_CHOICES otherwise (so a blank flag is code 1)
+- updated: ``array("I")`` of the epoch of the write that set each day, so
+  holiday precedence does not need the day's history
+- comments: sparse {day index: comment}, only non-empty comments are kept
+
+A year weighs about 2.5 KB plus its comments, instead of tens of KB for
+four dicts keyed by "YYYY-MM-DD" strings, and summing hours or counting
+flags are plain passes over the arrays.
+"""
+
+import sys
+from array import array
+from datetime import date
+from typing import Iterator, NotRequired, TypedDict
+
+from rxcalendar.services.date_table import year_dates
+
+
+# Flag values (and labels) offered in the day dialog. The order defines the
+# compact flag codes: do not reorder, only append.
+FLAG_CHOICES = [
+    ("", "(blank)"),
+    ("offered vacation client closed", "offered vacation client closed"),
+    ("national day off", "national day off"),
+    ("Akkodis offered day off", "Akkodis offered day off"),
+    ("on vacation", "on vacation"),
+    ("on vacation client closed", "on vacation client closed"),
+    ("regional day off", "regional day off"),
+    ("extra day off", "extra day off"),
+    ("project_special_worktime", "project_special_worktime")
+]
+
+NO_VALUE_CODE = 0
+BLANK_FLAG_CODE = 1
+# Flags outside FLAG_CHOICES (e.g. from imported files) are kept sparse
+OTHER_FLAG_CODE = 255
+
+FLAG_CODES = {flag: code for code, (flag, _label) in enumerate(FLAG_CHOICES, start=BLANK_FLAG_CODE)}
+FLAGS_BY_CODE = {code: flag for flag, code in FLAG_CODES.items()}
+
+
+# Largest storable hours value (quarter hours in an array("H"))
+MAX_HOURS = 0xFFFF / 4
+
+
+def normalize_hours(hours: float | None) -> float:
+    """Hours as every calendar store keeps them: rounded to a quarter hour, within 0..MAX_HOURS."""
+    return max(0, min(0xFFFF, round(float(hours or 0.0) * 4))) / 4
+
+
+class DayValue(TypedDict):
+    """Current values of a calendar day."""
+    comment: str
+    flag: str
+    hours: float
+    updated: NotRequired[int]  # Epoch of the write that set the values (filled by the calendar stores)
+
+
+class CalendarYear:
+    """Current values (comment, flag, hours) of one user's calendar year."""
+
+    __slots__ = ("year", "first_ordinal", "hours", "flags", "updated", "comments", "other_flags")
+
+    def __init__(self, year: int):
+        self.year = year
+        self.first_ordinal = date(year, 1, 1).toordinal()
+        day_count = date(year + 1, 1, 1).toordinal() - self.first_ordinal
+        self.hours = array("H", bytes(2 * day_count))
+        self.flags = bytearray(day_count)
+        # Epoch of the write that set each day (DayValue "updated")
+        self.updated = array("I", bytes(4 * day_count))
+        self.comments: dict[int, str] = {}
+        self.other_flags: dict[int, str] = {}
+
+    def copy(self) -> "CalendarYear":
+        """Independent copy of the year (buffers and dicts are copied)."""
+        year = CalendarYear.__new__(CalendarYear)
+        year.year = self.year
+        year.first_ordinal = self.first_ordinal
+        year.hours = array("H", self.hours)
+        year.flags = bytearray(self.flags)
+        year.updated = array("I", self.updated)
+        year.comments = dict(self.comments)
+        year.other_flags = dict(self.other_flags)
+        return year
+
+    # ----- Day access -----
+
+    def day_index(self, date_iso: str) -> int:
+        """Day ordinal within the year for a YYYY-MM-DD date."""
+        index = year_dates(self.year).index_by_iso.get(date_iso)
+        if index is None:
+            # Not a date of this year (or not canonical): same arithmetic as before
+            return date.fromisoformat(date_iso).toordinal() - self.first_ordinal
+        return index
+
+    def date_iso(self, index: int) -> str:
+        """YYYY-MM-DD date of a day ordinal within the year."""
+        return year_dates(self.year).iso[index]
+
+    def set_day(self, date_iso: str, comment: str, flag: str, hours: float, updated: int = 0):
+        """Store the current values of a day (set at epoch updated)."""
+        index = self.day_index(date_iso)
+        self.hours[index] = int(normalize_hours(hours) * 4)
+        self.updated[index] = max(0, min(0xFFFFFFFF, int(updated)))
+
+        code = FLAG_CODES.get(flag or "", OTHER_FLAG_CODE)
+        self.flags[index] = code
+        if code == OTHER_FLAG_CODE:
+            self.other_flags[index] = flag
+        else:
+            self.other_flags.pop(index, None)
+
+        if comment:
+            self.comments[index] = comment
+        else:
+            self.comments.pop(index, None)
+
+    def _day_value(self, index: int) -> DayValue:
+        """Current values of a stored day."""
+        code = self.flags[index]
+        return {
+            "comment": self.comments.get(index, ""),
+            "flag": self.other_flags[index] if code == OTHER_FLAG_CODE else FLAGS_BY_CODE[code],
+            "hours": self.hours[index] / 4,
+            "updated": self.updated[index],
+        }
+
+    def get_day(self, date_iso: str) -> DayValue | None:
+        """Current values of a day, None if nothing is stored for it."""
+        index = self.day_index(date_iso)
+        if self.flags[index] == NO_VALUE_CODE:
+            return None
+        return self._day_value(index)
+
+    def days(self) -> Iterator[tuple[str, DayValue]]:
+        """Iterate (date_iso, DayValue) over the days with stored values."""
+        isos = year_dates(self.year).iso
+        for index, code in enumerate(self.flags):
+            if code != NO_VALUE_CODE:
+                yield isos[index], self._day_value(index)
+
+    # ----- Aggregates (array passes) -----
+
+    def total_hours(self) -> float:
+        """Total hours of the days without a flag."""
+        return sum(h for h, code in zip(self.hours, self.flags) if code == BLANK_FLAG_CODE) / 4
+
+    def flag_counts(self) -> dict[str, int]:
+        """Number of days per (non-blank) flag."""
+        counts = {
+            flag: self.flags.count(code)
+            for flag, code in FLAG_CODES.items()
+            if code != BLANK_FLAG_CODE
+        }
+        for flag in self.other_flags.values():
+            counts[flag] = counts.get(flag, 0) + 1
+        return {flag: count for flag, count in counts.items() if count}
+
+    # ----- Serialization (snapshots) -----
+
+    def to_dict(self) -> dict:
+        """JSON-serializable form of the year (hours and updated as little-endian hex)."""
+        hours = array("H", self.hours)
+        updated = array("I", self.updated)
+        if sys.byteorder == "big":
+            hours.byteswap()
+            updated.byteswap()
+        return {
+            "year": self.year,
+            "hours": hours.tobytes().hex(),
+            "flags": self.flags.hex(),
+            "updated": updated.tobytes().hex(),
+            "comments": {str(index): comment for index, comment in self.comments.items()},
+            "other_flags": {str(index): flag for index, flag in self.other_flags.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CalendarYear":
+        """Rebuild a year from to_dict() output."""
+        year = cls(data["year"])
+        year.hours = array("H")
+        year.hours.frombytes(bytes.fromhex(data["hours"]))
+        year.updated = array("I")
+        year.updated.frombytes(bytes.fromhex(data["updated"]))
+        if sys.byteorder == "big":
+            year.hours.byteswap()
+            year.updated.byteswap()
+        year.flags = bytearray.fromhex(data["flags"])
+        year.comments = {int(index): comment for index, comment in data["comments"].items()}
+        year.other_flags = {int(index): flag for index, flag in data["other_flags"].items()}
+        return year
@@ -0,0 +1,165 @@
+"""Precomputed per-year date table.
+
+Every date-driven path (month grids, range selection, bulk hours, exports,
+image renderers) works on the same 365 days, so instead of parsing and
+formatting them again with strptime/strftime on every event, each year is
+computed once into parallel per-day columns indexed by the day's ordinal
+within the year (0 = January 1st, the same index as CalendarYear):
+
+- iso: ``"2026-03-05"``, display: ``"Thu Mar 05 2026"`` (the day cells' format),
+  day_name: ``"Thursday"``, long: ``"March 05, 2026"``
+- weekday (0 = Monday), month, day, iso_week
+- weekday prefix sums: ``weekdays_before[i]`` is the number of Monday-Friday
+  days before day i, so counting or listing the weekdays of a range or month
+  is index arithmetic and a slice of ``weekday_isos``
+"""
+
+from array import array
+from datetime import date
+from functools import lru_cache
+
+
+# Year shown when no other year is selected
+DEFAULT_YEAR = 2026
+
+
+class YearDates:
+    """Date table of one year (read-only, shared by all sessions)."""
+
+    __slots__ = (
+        "year",
+        "first_ordinal",
+        "iso",
+        "display",
+        "day_name",
+        "long",
+        "weekday",
+        "month",
+        "day",
+        "iso_week",
+        "month_starts",
+        "weekdays_before",
+        "weekday_isos",
+        "weekday_numbers",
+        "index_by_iso",
+        "index_by_display",
+    )
+
+    def __init__(self, year: int):
+        self.year = year
+        self.first_ordinal = date(year, 1, 1).toordinal()
+        day_count = date(year + 1, 1, 1).toordinal() - self.first_ordinal
+
+        self.iso: list[str] = []
+        self.display: list[str] = []
+        self.day_name: list[str] = []
+        self.long: list[str] = []
+        self.weekday = bytearray(day_count)
+        self.month = bytearray(day_count)
+        self.day = bytearray(day_count)
+        self.iso_week = bytearray(day_count)
+        # month_starts[m - 1] is the index of the 1st of month m, month_starts[12] the day count
+        self.month_starts = array("H", [0] * 13)
+        self.weekdays_before = array("H", [0] * (day_count + 1))
+        self.weekday_isos: list[str] = []
+        self.weekday_numbers = bytearray()
+
+        for index in range(day_count):
+            current = date.fromordinal(self.first_ordinal + index)
+            weekday = current.weekday()
+            iso = current.isoformat()
+            self.iso.append(iso)
+            self.display.append(current.strftime("%a %b %d %Y"))
+            self.day_name.append(current.strftime("%A"))
+            self.long.append(current.strftime("%B %d, %Y"))
+            self.weekday[index] = weekday
+            self.month[index] = current.month
+            self.day[index] = current.day
+            self.iso_week[index] = current.isocalendar()[1]
+            if current.day == 1:
+                self.month_starts[current.month - 1] = index
+            self.weekdays_before[index + 1] = self.weekdays_before[index] + (weekday < 5)
+            if weekday < 5:
+                self.weekday_isos.append(iso)
+                self.weekday_numbers.append(weekday)
+        self.month_starts[12] = day_count
+
+        self.index_by_iso = {iso: index for index, iso in enumerate(self.iso)}
+        self.index_by_display = {display: index for index, display in enumerate(self.display)}
+
+    def __len__(self) -> int:
+        return len(self.iso)
+
+    # ----- Ranges (index arithmetic) -----
+
+    def month_range(self, month: int) -> range:
+        """Day indexes of a month (1-12)."""
+        return range(self.month_starts[month - 1], self.month_starts[month])
+
+    def weekday_count(self, first: int, last: int) -> int:
+        """Number of Monday-Friday days between two day indexes (inclusive)."""
+        return self.weekdays_before[last + 1] - self.weekdays_before[first]
+
+    def weekdays_between(self, first: int, last: int) -> list[str]:
+        """ISO dates of the Monday-Friday days between two day indexes (inclusive)."""
+        return self.weekday_isos[self.weekdays_before[first]:self.weekdays_before[last + 1]]
+
+    def month_weekdays(self, month: int) -> list[tuple[str, int]]:
+        """(date_iso, weekday) of the Monday-Friday days of a month."""
+        start = self.weekdays_before[self.month_starts[month - 1]]
+        end = self.weekdays_before[self.month_starts[month]]
+        return list(zip(self.weekday_isos[start:end], self.weekday_numbers[start:end]))
+
+    def month_weeks(self, month: int) -> list[list[int | None]]:
+        """Monday-first weeks of a month as day indexes (None outside the month)."""
+        days = self.month_range(month)
+        cells: list[int | None] = [None] * self.weekday[days.start] + list(days)
+        cells += [None] * (-len(cells) % 7)
+        return [cells[i:i + 7] for i in range(0, len(cells), 7)]
+
+
+@lru_cache(maxsize=16)
+def year_dates(year: int) -> YearDates:
+    """Date table of a year (computed once per process)."""
+    return YearDates(year)
+
+
+def iso_index(date_iso: str) -> tuple[YearDates, int]:
+    """Table and day index of a YYYY-MM-DD date (ValueError if invalid)."""
+    try:
+        table = year_dates(int(date_iso[:4]))
+        return table, table.index_by_iso[date_iso]
+    except (KeyError, ValueError):
+        raise ValueError(f"Invalid date: {date_iso!r}") from None
+
+
+def display_index(date_str: str) -> tuple[YearDates, int]:
+    """Table and day index of a day cell date ("Thu Mar 05 2026", ValueError if invalid)."""
+    try:
+        table = year_dates(int(date_str[-4:]))
+        return table, table.index_by_display[date_str]
+    except (KeyError, ValueError):
+        raise ValueError(f"Invalid date: {date_str!r}") from None
+
+
+def weekdays_in_range(start_iso: str, end_iso: str) -> list[str]:
+    """ISO dates of the Monday-Friday days from start to end (inclusive), across years."""
+    start_table, start = iso_index(start_iso)
+    end_table, end = iso_index(end_iso)
+    if start_table.year == end_table.year:
+        return start_table.weekdays_between(start, end) if start <= end else []
+
+    weekdays = []
+    for year in range(start_table.year, end_table.year + 1):
+        table = year_dates(year)
+        first = start if year == start_table.year else 0
+        last = end if year == end_table.year else len(table) - 1
+        weekdays += table.weekdays_between(first, last)
+    return weekdays
+
+
+def month_shape(year: int, month: int) -> tuple[int, int]:
+    """(weekday of the 1st, number of days) of a month, like calendar.monthrange."""
+    table = year_dates(year)
+    days = table.month_range(month)
+    return table.weekday[days.start], len(days)
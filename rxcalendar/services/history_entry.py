@@ -0,0 +1,99 @@
+"""Compact history entry records.
+
+History is append-only and a propagation or bulk-hours run writes the same
+actor, action and flag for every user and date, so entries are slotted
+objects holding interned string references and an integer epoch timestamp.
+The timestamp is only formatted when an entry is rendered or exported.
+"""
+
+from datetime import datetime
+from sys import intern
+
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def now_timestamp() -> int:
+    """Current time as an integer epoch (seconds)."""
+    return int(datetime.now().timestamp())
+
+
+def format_timestamp(timestamp: int) -> str:
+    """Format an epoch timestamp for display (local time)."""
+    return datetime.fromtimestamp(timestamp).strftime(TIMESTAMP_FORMAT)
+
+
+def parse_timestamp(value: int | str) -> int:
+    """Epoch timestamp from an int or a formatted timestamp string."""
+    if isinstance(value, str):
+        return int(datetime.strptime(value, TIMESTAMP_FORMAT).timestamp())
+    return int(value)
+
+
+class HistoryEntry:
+    """One change of a calendar date (append-only)."""
+
+    __slots__ = ("timestamp", "action", "comment", "flag", "hours", "user", "user_role", "propagated_by")
+
+    def __init__(
+        self,
+        timestamp: int,
+        action: str,
+        comment: str,
+        flag: str,
+        hours: float,
+        user: str,
+        user_role: str,
+        propagated_by: str | None = None,
+    ):
+        self.timestamp = timestamp
+        self.action = intern(action)
+        self.comment = intern(comment or "")
+        self.flag = intern(flag or "")
+        self.hours = hours
+        self.user = intern(user)
+        self.user_role = intern(user_role)
+        self.propagated_by = intern(propagated_by) if propagated_by is not None else None
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, HistoryEntry):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"HistoryEntry({self.to_dict()!r})"
+
+    def to_record(self) -> dict:
+        """Serializable form with the raw epoch timestamp (journal storage)."""
+        record = {
+            "timestamp": self.timestamp,
+            "action": self.action,
+            "comment": self.comment,
+            "flag": self.flag,
+            "hours": self.hours,
+            "user": self.user,
+            "user_role": self.user_role,
+        }
+        if self.propagated_by is not None:
+            record["propagated_by"] = self.propagated_by
+        return record
+
+    def to_dict(self) -> dict:
+        """Display/export form with a formatted timestamp."""
+        record = self.to_record()
+        record["timestamp"] = format_timestamp(self.timestamp)
+        return record
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HistoryEntry":
+        """Build an entry from to_record()/to_dict() output (epoch or formatted timestamp)."""
+        return cls(
+            parse_timestamp(data.get("timestamp", 0)),
+            data.get("action", ""),
+            data.get("comment", ""),
+            data.get("flag", ""),
+            data.get("hours", 0.0),
+            data.get("user", ""),
+            data.get("user_role", ""),
+            data.get("propagated_by"),
+        )
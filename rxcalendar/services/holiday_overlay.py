@@ -0,0 +1,122 @@
+"""Scoped holiday overlay (company, region and project holidays).
+
+Propagated day offs are stored once per scope and date instead of being
+copied into every calendar of the scope. Each scope is kept as a calendar of
+its own in the calendar store (history plus current day values), under an id
+that cannot clash with a user id::
+
+    holidays:*                              company-wide
+    holidays:region:<region>                one region
+    holidays:project:<project_id>           one project
+    holidays:project:<project_id>:region:<region>
+
+A user's day is resolved lazily when it is read: among the user's own value
+and the holidays of the scopes the user belongs to, the most recent write
+wins (the user's own value on a tie). Editing a holiday in a user's calendar
+therefore only writes that user's value (an override), and a later holiday
+supersedes it again.
+"""
+
+from typing import Iterable
+
+from rxcalendar.services.calendar_store import CalendarStore
+from rxcalendar.services.calendar_year import DayValue
+from rxcalendar.services.history_entry import HistoryEntry
+
+
+HOLIDAY_SCOPE_PREFIX = "holidays:"
+COMPANY_HOLIDAYS = HOLIDAY_SCOPE_PREFIX + "*"
+
+
+def region_scope(region: str) -> str:
+    """Holiday scope of a region."""
+    return f"{HOLIDAY_SCOPE_PREFIX}region:{region}"
+
+
+def project_scope(project_id: str, region: str = "") -> str:
+    """Holiday scope of a project (optionally restricted to one region)."""
+    scope = f"{HOLIDAY_SCOPE_PREFIX}project:{project_id}"
+    return f"{scope}:region:{region}" if region else scope
+
+
+def user_scopes(user: dict | None) -> tuple[str, ...]:
+    """Holiday scopes a user belongs to, from the broadest to the most specific."""
+    if not user:
+        return ()
+    region = user.get("region", "")
+    project_id = user.get("project_id", "")
+    scopes = [COMPANY_HOLIDAYS]
+    if region:
+        scopes.append(region_scope(region))
+    if project_id:
+        scopes.append(project_scope(project_id))
+        if region:
+            scopes.append(project_scope(project_id, region))
+    return tuple(scopes)
+
+
+def overlay_days(days: dict[str, DayValue], holidays: Iterable[dict[str, DayValue]]) -> dict[str, DayValue]:
+    """Resolve a user's days against the holidays of their scopes.
+
+    holidays are given from the broadest to the most specific scope. The
+    most recent value wins. Timestamps have a one-second resolution, so on
+    equal timestamps the user's own value wins (an override saved in the
+    same second as a holiday is kept), then specific scopes over broad ones.
+    """
+    resolved = dict(days)
+    for scope_days in holidays:
+        for date_iso, value in scope_days.items():
+            current = resolved.get(date_iso)
+            if current is None:
+                resolved[date_iso] = value
+                continue
+            updated, current_updated = value.get("updated", 0), current.get("updated", 0)
+            if updated > current_updated or (updated == current_updated and current is not days.get(date_iso)):
+                resolved[date_iso] = value
+    return resolved
+
+
+def load_calendar(store: CalendarStore, user: dict, year: int | None = None) -> dict[str, DayValue]:
+    """Days of a user's calendar year (default: all years), holidays included."""
+    holidays = [store.load_calendar(scope, year) for scope in user_scopes(user)]
+    return overlay_days(store.load_calendar(user["id"], year), holidays)
+
+
+def get_days(store: CalendarStore, users: Iterable[dict], dates: list[str]) -> dict[str, dict[str, DayValue]]:
+    """Day values of several users and dates, holidays included: {user_id: {date_iso: DayValue}}."""
+    users = list(users)
+    scopes_by_user = {user["id"]: user_scopes(user) for user in users}
+    all_scopes = {scope for scopes in scopes_by_user.values() for scope in scopes}
+    # Holidays are read once per scope, not once per user
+    holidays = store.get_days(all_scopes, dates)
+    days = store.get_days(scopes_by_user.keys(), dates)
+
+    result = {}
+    for user_id, scopes in scopes_by_user.items():
+        resolved = overlay_days(days.get(user_id, {}), [holidays.get(scope, {}) for scope in scopes])
+        if resolved:
+            result[user_id] = resolved
+    return result
+
+
+def load_history(store: CalendarStore, user: dict, year: int | None = None) -> dict[str, list[HistoryEntry]]:
+    """A user's history of a year (default: all years) with the holidays of their scopes merged in (by timestamp)."""
+    history = store.load_history(user["id"], year)
+    for scope in user_scopes(user):
+        for date_iso, entries in store.load_history(scope, year).items():
+            merged = history.get(date_iso, []) + entries
+            # Stable: on equal timestamps the user's entries stay first
+            merged.sort(key=lambda entry: entry.timestamp)
+            history[date_iso] = merged
+    return history
+
+
+def load_holidays(
+    store: CalendarStore,
+    scopes: Iterable[str] | None = None,
+    year: int | None = None,
+) -> dict[str, DayValue]:
+    """Current holidays {date_iso: DayValue} of the given (default: all) scopes and year, most recent per date."""
+    if scopes is None:
+        scopes = store.calendar_ids(HOLIDAY_SCOPE_PREFIX)
+    return overlay_days({}, [store.load_calendar(scope, year) for scope in scopes])
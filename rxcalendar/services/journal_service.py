@@ -0,0 +1,745 @@
+"""Append-only journal service for durable calendar history.
+
+Every history entry, calendar status change and quota change is written as one
+line to a local journal file. On startup the journal is replayed to rebuild the current
+values (comments, flags, hours) and the validation status of every
+calendar, so a restart no longer wipes the organization's timesheets.
+
+This backs JournalCalendarStore, the alternative calendar store engine
+(RXCALENDAR_STORE=journal); the default engine is SQLite (calendar_store.py).
+
+Journal line format::
+
+    <user_id>\\t<json record>\\n
+
+The user id prefix lets the replay route raw lines to per-user buckets without
+parsing them, so JSON decoding and the rebuild can be spread across CPU cores.
+
+Compaction: every ``snapshot_interval`` appended records the journal is
+rotated (renamed to a segment, ``<journal>.<snapshot id>``) and the current
+values, statuses and quotas of every calendar are written to a snapshot file
+by a background thread. The rotation only freezes the user map; a user
+written while the snapshot is being serialized is copied first (copy on
+write). A cold start loads the snapshot and replays only the journal tail, so
+its cost is bounded by the number of calendars, not by all the history ever
+written.
+
+History is not part of the snapshot. Once a snapshot is durable, the history
+records of its segments are appended to per-year archives
+(``<journal>.history.<year>``, sizes and merged segments in
+``<journal>.history.json``) and the segments are deleted. At startup only the
+last ``history_years`` years of archives are read, in a background thread;
+older years are read when their history is first asked for (wait_history).
+
+The journal starts with a marker line naming the snapshot it follows, the
+last snapshot known to be on disk and the segments archived since then::
+
+    \\t{"snapshot": "<id>", "previous": "<id or null>", "pending": ["<segment>", ...]}\\n
+
+If the process stops before the snapshot is written, the start falls back to
+the previous snapshot and replays the pending segments. A marker naming a
+snapshot that is neither on disk nor the previous one (deleted, moved with
+RXCALENDAR_SNAPSHOT_PATH, unreadable) raises JournalSnapshotError instead of
+starting with the compacted records missing.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import TypedDict
+
+from rxcalendar.services.calendar_year import CalendarYear
+from rxcalendar.services.date_table import iso_index
+from rxcalendar.services.history_entry import HistoryEntry
+
+
+# Journal location (override with RXCALENDAR_JOURNAL_PATH)
+DEFAULT_JOURNAL_PATH = os.environ.get(
+    "RXCALENDAR_JOURNAL_PATH",
+    os.path.join("data", "calendar_journal.jsonl"),
+)
+
+# Snapshot location (override with RXCALENDAR_SNAPSHOT_PATH)
+DEFAULT_SNAPSHOT_PATH = os.environ.get(
+    "RXCALENDAR_SNAPSHOT_PATH",
+    os.path.join("data", "calendar_snapshot.json"),
+)
+
+# Records appended between two snapshots (override with RXCALENDAR_SNAPSHOT_INTERVAL, 0 disables)
+DEFAULT_SNAPSHOT_INTERVAL = int(os.environ.get("RXCALENDAR_SNAPSHOT_INTERVAL", "50000"))
+
+# Years of archived history loaded at startup, older years on first read
+# (override with RXCALENDAR_HISTORY_YEARS)
+DEFAULT_HISTORY_YEARS = int(os.environ.get("RXCALENDAR_HISTORY_YEARS", "2"))
+
+# Below this number of users the replay runs in-process (pool startup costs more)
+PARALLEL_REPLAY_MIN_USERS = 2000
+
+RECORD_HISTORY = "history"
+RECORD_STATUS = "status"
+RECORD_QUOTA = "quota"
+
+
+class JournalSnapshotError(RuntimeError):
+    """The journal follows a snapshot that cannot be loaded."""
+
+
+class UserReplay(TypedDict):
+    """Materialized calendar of a single user rebuilt from the journal."""
+    history: dict[str, list[HistoryEntry]]
+    years: dict[int, CalendarYear]  # Current day values, one compact record per year
+    calendar_status: str
+    status_history: list[dict]
+    quotas: dict[str, float]
+
+
+class SnapshotInfo(TypedDict):
+    """Metadata of the latest snapshot (written or loaded)."""
+    id: str
+    path: str
+    written_at: str
+    write_seconds: float
+    size_bytes: int
+    user_count: int
+    compacted_records: int
+
+
+class JournalReplay(TypedDict):
+    """Result of a journal replay (all users) with timing information."""
+    users: dict[str, UserReplay]
+    record_count: int
+    user_count: int
+    elapsed_seconds: float
+    parallel: bool
+    snapshot: SnapshotInfo | None
+    segments: list[str]  # Archived segments whose history is not in users
+    pending: list[str]  # Segments replayed because the last snapshot was not written
+
+
+def _empty_user_replay() -> UserReplay:
+    """Create an empty per-user replay structure."""
+    return {
+        "history": {},
+        "years": {},
+        "calendar_status": "",
+        "status_history": [],
+        "quotas": {},
+    }
+
+
+def _apply_record(user: UserReplay, record: dict):
+    """Fold one journal record into a user's materialized calendar."""
+    entry = record["entry"]
+    if record["type"] == RECORD_HISTORY:
+        date_iso = record["date"]
+        year = iso_index(date_iso)[0].year  # ValueError for an invalid date, before any change
+        if not isinstance(entry, HistoryEntry):
+            entry = HistoryEntry.from_dict(entry)
+        if date_iso not in user["history"]:
+            user["history"][date_iso] = []
+        user["history"][date_iso].append(entry)
+
+        # Latest entry holds the current values for the date
+        if year not in user["years"]:
+            user["years"][year] = CalendarYear(year)
+        user["years"][year].set_day(date_iso, entry.comment, entry.flag, entry.hours, entry.timestamp)
+    elif record["type"] == RECORD_STATUS:
+        user["status_history"].append(entry)
+        user["calendar_status"] = entry.get("to_status", "")
+    elif record["type"] == RECORD_QUOTA:
+        user["quotas"][entry["quota"]] = entry["days"]
+
+
+def _copy_user(user: UserReplay) -> UserReplay:
+    """Copy of a user's snapshot content (values, statuses, quotas); history is shared."""
+    return {
+        "history": user["history"],
+        "years": {year: calendar_year.copy() for year, calendar_year in user["years"].items()},
+        "calendar_status": user["calendar_status"],
+        "status_history": list(user["status_history"]),
+        "quotas": dict(user["quotas"]),
+    }
+
+
+def _user_to_json(user: UserReplay) -> dict:
+    """JSON-serializable snapshot content of a user (no history)."""
+    return {
+        "years": [calendar_year.to_dict() for calendar_year in user["years"].values()],
+        "calendar_status": user["calendar_status"],
+        "status_history": user["status_history"],
+        "quotas": user["quotas"],
+    }
+
+
+def _user_from_json(data: dict) -> UserReplay:
+    """Rebuild a materialized user (without history) from _user_to_json() output."""
+    years = [CalendarYear.from_dict(year) for year in data["years"]]
+    return {**data, "history": {}, "years": {year.year: year for year in years}}
+
+
+def _materialize_users(
+    buckets: list[tuple[str, UserReplay | None, list[str]]],
+) -> list[tuple[str, UserReplay]]:
+    """Decode and fold the raw journal lines of a partition of users.
+
+    Each bucket is (user_id, snapshot state or None, raw journal records).
+    Module-level so it can be shipped to worker processes.
+    """
+    result = []
+    for user_id, base, raw_records in buckets:
+        user = base if base is not None else _empty_user_replay()
+        for raw in raw_records:
+            try:
+                _apply_record(user, json.loads(raw))
+            except (ValueError, KeyError, TypeError, IndexError) as e:
+                # One bad record (e.g. an invalid date written by an older version) must not block the start
+                print(f"Journal replay: skipped invalid record of {user_id!r} ({e}): {raw[:200]}")
+        result.append((user_id, user))
+    return result
+
+
+class CalendarJournal:
+    """Append-only journal of calendar history and status changes."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_JOURNAL_PATH,
+        snapshot_path: str = DEFAULT_SNAPSHOT_PATH,
+        snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL,
+        history_years: int = DEFAULT_HISTORY_YEARS,
+    ):
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.history_years = history_years
+        self._lock = threading.Lock()
+        # Live materialized view (populated by load(), kept current by appends)
+        self._view: dict[str, UserReplay] | None = None
+        # Records in the journal file (i.e. appended since the last rotation)
+        self._journal_records = 0
+        # Snapshot known to be on disk, its segments not merged into the
+        # history archives yet, and the segments archived since then
+        self._durable_id: str | None = None
+        self._segments: list[str] = []
+        self._pending: list[str] = []
+        self._snapshot_thread: threading.Thread | None = None
+        # Users of the snapshot being written; a user still in it is copied on its next write
+        self._frozen: dict[str, UserReplay] | None = None
+        # Held while merging segments into the history archives or reading them
+        self._archive_lock = threading.Lock()
+        # Archive sizes at startup (later bytes are already in the view) and years loaded
+        self._archive_sizes: dict[int, int] = {}
+        self._history_years: set[int] = set()
+        # Set once the segments are merged and the recent years of history loaded
+        self._history_loaded = threading.Event()
+        self._history_error: BaseException | None = None
+        self.last_replay: JournalReplay | None = None
+        self.last_snapshot: SnapshotInfo | None = None
+
+    def segment_path(self, snapshot_id: str) -> str:
+        """Path of the journal segment archived when snapshot_id was taken."""
+        return f"{self.path}.{snapshot_id}"
+
+    def archive_path(self, year: int) -> str:
+        """Path of the history archive of a year."""
+        return f"{self.path}.history.{year}"
+
+    # ----- Writing -----
+
+    def _append(self, records: list[tuple[str, dict]]):
+        """Write records to the journal (one file write) and fold them into the live view.
+
+        Raises ValueError, before anything is written, for an invalid user id or date.
+        """
+        lines = []
+        for user_id, record in records:
+            if "\t" in user_id or "\n" in user_id:
+                raise ValueError(f"Invalid user id for journal: {user_id!r}")
+            if record["type"] == RECORD_HISTORY:
+                iso_index(record["date"])  # ValueError before anything is written
+            entry = record["entry"]
+            if isinstance(entry, HistoryEntry):
+                record = {**record, "entry": entry.to_record()}
+            lines.append(f"{user_id}\t{json.dumps(record, ensure_ascii=False)}\n")
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as journal_file:
+                journal_file.write("".join(lines))
+            self._journal_records += len(records)
+            if self._view is not None:
+                for user_id, record in records:
+                    user = self._view.get(user_id)
+                    if user is None:
+                        user = self._view[user_id] = _empty_user_replay()
+                    elif self._frozen is not None and self._frozen.get(user_id) is user:
+                        # Being written to the snapshot: copy on write
+                        user = self._view[user_id] = _copy_user(user)
+                    _apply_record(user, record)
+                if (
+                    self.snapshot_interval
+                    and self._journal_records >= self.snapshot_interval
+                    and not self._snapshot_running()
+                ):
+                    # Rotate now, write the snapshot off the request path
+                    self._snapshot_thread = threading.Thread(
+                        target=self._write_snapshot,
+                        args=self._rotate(),
+                        name="journal-snapshot",
+                        daemon=True,
+                    )
+                    self._snapshot_thread.start()
+
+    def append_history(self, user_id: str, date_iso: str, entry: HistoryEntry):
+        """Record a history entry appended to a user's calendar date."""
+        self.append_history_batch([(user_id, date_iso, entry)])
+
+    def append_history_batch(self, records: list[tuple[str, str, HistoryEntry]]):
+        """Record many (user_id, date_iso, entry) history entries in one write."""
+        self._append([
+            (user_id, {"type": RECORD_HISTORY, "date": date_iso, "entry": entry})
+            for user_id, date_iso, entry in records
+        ])
+
+    def append_status(self, user_id: str, entry: dict):
+        """Record a calendar validation status change."""
+        self._append([(user_id, {"type": RECORD_STATUS, "entry": entry})])
+
+    def append_quota(self, scope: str, quota: str, days: float):
+        """Record a quota change for a user (or the company scope)."""
+        self._append([(scope, {"type": RECORD_QUOTA, "entry": {"quota": quota, "days": days}})])
+
+    # ----- Snapshots -----
+
+    def _snapshot_running(self) -> bool:
+        return self._snapshot_thread is not None and self._snapshot_thread.is_alive()
+
+    def _rotate(self) -> tuple:
+        """Archive the journal as a segment and freeze the view for a new snapshot. Lock must be held.
+
+        Only the user map is copied here; users are copied when they are next
+        written (see _append). Returns the arguments of _write_snapshot.
+        """
+        started = time.perf_counter()
+        snapshot_id = uuid.uuid4().hex
+        written_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._frozen = dict(self._view)
+        compacted_records = self._journal_records
+        pending = self._pending + [snapshot_id]
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        next_path = f"{self.path}.next"
+        with open(next_path, "w", encoding="utf-8") as journal_file:
+            marker = {"snapshot": snapshot_id, "previous": self._durable_id, "pending": pending}
+            journal_file.write(f"\t{json.dumps(marker)}\n")
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+        if os.path.exists(self.path):
+            os.replace(self.path, self.segment_path(snapshot_id))
+        else:
+            open(self.segment_path(snapshot_id), "w").close()
+        os.replace(next_path, self.path)
+
+        self._journal_records = 0
+        self._pending = pending
+        return snapshot_id, written_at, self._frozen, self._segments + pending, compacted_records, started
+
+    def _write_snapshot(
+        self,
+        snapshot_id: str,
+        written_at: str,
+        users: dict[str, UserReplay],
+        segments: list[str],
+        compacted_records: int,
+        started: float,
+    ) -> SnapshotInfo | None:
+        """Write the frozen users to the snapshot file, then merge its segments (runs without the lock)."""
+        try:
+            directory = os.path.dirname(self.snapshot_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.snapshot_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as snapshot_file:
+                json.dump(
+                    {
+                        "id": snapshot_id,
+                        "written_at": written_at,
+                        "compacted_records": compacted_records,
+                        "segments": segments,
+                        "users": {user_id: _user_to_json(user) for user_id, user in users.items()},
+                    },
+                    snapshot_file,
+                    ensure_ascii=False,
+                    separators=(",", ":"),
+                )
+                snapshot_file.flush()
+                os.fsync(snapshot_file.fileno())
+            os.replace(temp_path, self.snapshot_path)
+        except Exception as e:
+            # The journal marker still points at the previous snapshot and the pending segments
+            print(f"Journal snapshot {snapshot_id} failed: {e}")
+            with self._lock:
+                self._frozen = None
+            return None
+
+        info: SnapshotInfo = {
+            "id": snapshot_id,
+            "path": self.snapshot_path,
+            "written_at": written_at,
+            "write_seconds": time.perf_counter() - started,
+            "size_bytes": os.path.getsize(self.snapshot_path),
+            "user_count": len(users),
+            "compacted_records": compacted_records,
+        }
+        with self._lock:
+            self._frozen = None
+            self._durable_id = snapshot_id
+            self._pending = []
+            self.last_snapshot = info
+        print(
+            f"Journal snapshot: {info['user_count']} user(s), {info['compacted_records']} record(s) "
+            f"compacted into {info['size_bytes']} bytes in {info['write_seconds']:.3f}s"
+        )
+
+        # The snapshot is durable: its segments are only needed for their history now
+        try:
+            with self._archive_lock:
+                self._merge_segments(segments)
+        except Exception as e:
+            print(f"Journal segments could not be merged (retried after the next snapshot): {e}")
+        return info
+
+    def snapshot(self) -> SnapshotInfo | None:
+        """Rotate the journal and write a snapshot now, in the calling thread.
+
+        Returns None if the snapshot could not be written.
+        """
+        self.load()
+        thread = self._snapshot_thread
+        if thread is not None:
+            thread.join()
+        with self._lock:
+            args = self._rotate()
+        return self._write_snapshot(*args)
+
+    def _read_snapshot(self) -> tuple[dict | None, SnapshotInfo | None]:
+        """Read the snapshot file, if any."""
+        if not os.path.exists(self.snapshot_path):
+            return None, None
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as snapshot_file:
+                snapshot = json.load(snapshot_file)
+        except (OSError, ValueError) as e:
+            raise JournalSnapshotError(f"Cannot read journal snapshot {self.snapshot_path}: {e}") from e
+        info: SnapshotInfo = {
+            "id": snapshot["id"],
+            "path": self.snapshot_path,
+            "written_at": snapshot["written_at"],
+            "write_seconds": 0.0,
+            "size_bytes": os.path.getsize(self.snapshot_path),
+            "user_count": len(snapshot["users"]),
+            "compacted_records": snapshot["compacted_records"],
+        }
+        return snapshot, info
+
+    # ----- Replay -----
+
+    def _finish_rotation(self):
+        """Complete or discard a rotation interrupted by a crash."""
+        next_path = f"{self.path}.next"
+        if not os.path.exists(next_path):
+            return
+        if os.path.exists(self.path):
+            os.remove(next_path)  # Crashed before the journal was archived
+        else:
+            os.replace(next_path, self.path)  # Crashed between the two renames
+
+    def _read_marker(self) -> dict | None:
+        """Snapshot marker on the first line of the journal, if any."""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r", encoding="utf-8") as journal_file:
+            first_line = journal_file.readline()
+        return json.loads(first_line) if first_line.startswith("\t") else None
+
+    @staticmethod
+    def _read_buckets(path: str, buckets: dict[str, list[str]]) -> int:
+        """Route the raw lines of a journal file to per-user buckets (no JSON decoding)."""
+        record_count = 0
+        with open(path, "r", encoding="utf-8") as journal_file:
+            for line in journal_file:
+                user_id, sep, raw = line.rstrip("\n").partition("\t")
+                if not user_id or not sep or not raw:
+                    continue  # Marker, torn or empty line (e.g. crash during write)
+                if user_id not in buckets:
+                    buckets[user_id] = []
+                buckets[user_id].append(raw)
+                record_count += 1
+        return record_count
+
+    def replay(self, workers: int | None = None) -> JournalReplay:
+        """Load the latest snapshot and replay the journal tail to rebuild every user's calendar.
+
+        History entries of the segments archived before the snapshot are not
+        loaded (see load()).
+
+        Args:
+            workers: Number of worker processes. Defaults to the CPU count;
+                small journals are always replayed in-process.
+
+        Returns:
+            JournalReplay with the rebuilt users and replay timing.
+
+        Raises:
+            JournalSnapshotError: The journal follows a snapshot that is
+                missing or is not the one on disk.
+        """
+        started = time.perf_counter()
+        self._finish_rotation()
+        marker = self._read_marker()
+        snapshot, snapshot_info = self._read_snapshot()
+        snapshot_id = snapshot["id"] if snapshot else None
+
+        # Segments archived after the snapshot on disk (replayed in full)
+        replay_segments: list[str] = []
+        if marker is None:
+            if snapshot is not None:
+                raise JournalSnapshotError(
+                    f"Snapshot {self.snapshot_path} exists but the journal {self.path} does not follow it"
+                )
+        elif marker["snapshot"] != snapshot_id:
+            if snapshot_id != marker.get("previous"):
+                raise JournalSnapshotError(
+                    f"Journal {self.path} follows snapshot {marker['snapshot']}, "
+                    f"found {snapshot_id or 'none'} at {self.snapshot_path}"
+                )
+            # Stopped before the last snapshot was written: use the previous one
+            replay_segments = marker.get("pending", [])
+
+        buckets: dict[str, list[str]] = {}
+        record_count = 0
+        for segment in replay_segments:
+            segment_path = self.segment_path(segment)
+            if not os.path.exists(segment_path):
+                raise JournalSnapshotError(f"Journal segment {segment_path} is missing")
+            record_count += self._read_buckets(segment_path, buckets)
+        if os.path.exists(self.path):
+            record_count += self._read_buckets(self.path, buckets)
+
+        users: dict[str, UserReplay] = {}
+        if snapshot:
+            users = {user_id: _user_from_json(user) for user_id, user in snapshot["users"].items()}
+
+        workers = workers or os.cpu_count() or 1
+        parallel = workers > 1 and len(buckets) >= PARALLEL_REPLAY_MIN_USERS
+
+        items = [(user_id, users.get(user_id), raw_records) for user_id, raw_records in buckets.items()]
+        if parallel:
+            # Partition by user: each worker rebuilds complete calendars
+            partition_count = workers * 4
+            partitions = [items[i::partition_count] for i in range(partition_count)]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for rebuilt in executor.map(_materialize_users, partitions):
+                    users.update(rebuilt)
+        else:
+            users.update(_materialize_users(items))
+
+        result: JournalReplay = {
+            "users": users,
+            "record_count": record_count,
+            "user_count": len(users),
+            "elapsed_seconds": time.perf_counter() - started,
+            "parallel": parallel,
+            "snapshot": snapshot_info,
+            "segments": snapshot["segments"] if snapshot else [],
+            "pending": replay_segments,
+        }
+        self.last_replay = result
+        return result
+
+    def load(self) -> dict[str, UserReplay]:
+        """Return the live materialized view, replaying the journal once if needed.
+
+        The archived history of the recent years is merged into the view by
+        a background thread; use wait_history() before reading history.
+        """
+        with self._lock:
+            if self._view is None:
+                replay = self.replay()
+                self._view = replay["users"]
+                self._journal_records = replay["record_count"]
+                self._segments = replay["segments"]
+                self._pending = replay["pending"]
+                if replay["snapshot"]:
+                    self._durable_id = replay["snapshot"]["id"]
+                    self.last_snapshot = replay["snapshot"]
+                print(
+                    f"Journal replay: {replay['record_count']} record(s) for "
+                    f"{replay['user_count']} user(s) in {replay['elapsed_seconds']:.3f}s"
+                    f"{' (parallel)' if replay['parallel'] else ''}"
+                    f"{' from snapshot ' + replay['snapshot']['written_at'] if replay['snapshot'] else ''}"
+                )
+                threading.Thread(
+                    target=self._load_history,
+                    args=(replay["segments"],),
+                    name="journal-history",
+                    daemon=True,
+                ).start()
+            return self._view
+
+    # ----- History archives -----
+
+    def _read_manifest(self) -> dict:
+        """Segments merged into the history archives and the archive sizes ({"merged", "sizes"})."""
+        try:
+            with open(f"{self.path}.history.json", "r", encoding="utf-8") as manifest_file:
+                return json.load(manifest_file)
+        except FileNotFoundError:
+            return {"merged": [], "sizes": {}}
+
+    def _write_manifest(self, manifest: dict):
+        path = f"{self.path}.history.json"
+        with open(f"{path}.tmp", "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file)
+            manifest_file.flush()
+            os.fsync(manifest_file.fileno())
+        os.replace(f"{path}.tmp", path)
+
+    def _merge_segments(self, segments: list[str]):
+        """Append the history of segments covered by a durable snapshot to the
+        per-year archives, then delete them. Archive lock must be held.
+
+        The manifest records the archive sizes after each segment, so a merge
+        interrupted by a crash is truncated and redone, never duplicated.
+        """
+        manifest = self._read_manifest()
+        # Only the segments of the durable snapshot can still be named at startup
+        merged = [segment for segment in manifest["merged"] if segment in segments]
+        sizes = manifest["sizes"]
+        for segment in segments:
+            path = self.segment_path(segment)
+            if segment not in merged:
+                if not os.path.exists(path):
+                    raise JournalSnapshotError(f"Journal segment {path} is missing")
+                self._archive_segment(path, sizes)
+                merged.append(segment)
+                self._write_manifest({"merged": merged, "sizes": sizes})
+            if os.path.exists(path):
+                os.remove(path)
+        with self._lock:
+            self._segments = [segment for segment in self._segments if segment not in segments]
+
+    def _archive_segment(self, path: str, sizes: dict[str, int]):
+        """Append the history records of a segment to the archives of their years."""
+        lines_by_year: dict[int, list[str]] = {}
+        with open(path, "r", encoding="utf-8") as segment_file:
+            for line in segment_file:
+                user_id, sep, raw = line.rstrip("\n").partition("\t")
+                if not user_id or not sep or not raw:
+                    continue  # Marker, torn or empty line
+                try:
+                    record = json.loads(raw)
+                    if record["type"] != RECORD_HISTORY:
+                        continue  # Statuses and quotas live in the snapshot
+                    year = iso_index(record["date"])[0].year
+                except (ValueError, KeyError, TypeError) as e:
+                    print(f"Journal archive: skipped invalid record of {user_id!r} ({e}): {raw[:200]}")
+                    continue
+                lines_by_year.setdefault(year, []).append(f"{user_id}\t{raw}\n")
+
+        for year, lines in lines_by_year.items():
+            with open(self.archive_path(year), "ab") as archive_file:
+                archive_file.truncate(sizes.get(str(year), 0))  # Drop a crashed merge's partial append
+                archive_file.write("".join(lines).encode("utf-8"))
+                archive_file.flush()
+                os.fsync(archive_file.fileno())
+                sizes[str(year)] = archive_file.tell()
+
+    def _load_history_year(self, year: int) -> int:
+        """Merge a year's archived history into the view, once. Archive lock must be held.
+
+        Returns the number of entries loaded.
+        """
+        if year in self._history_years:
+            return 0
+        history: dict[str, dict[str, list[HistoryEntry]]] = {}
+        entry_count = 0
+        size = self._archive_sizes.get(year, 0)
+        if size:
+            # Only what was archived before the start (the rest was replayed or appended since)
+            with open(self.archive_path(year), "rb") as archive_file:
+                data = archive_file.read(size).decode("utf-8")
+            for line in data.splitlines():
+                user_id, _, raw = line.partition("\t")
+                record = json.loads(raw)
+                dates = history.setdefault(user_id, {})
+                dates.setdefault(record["date"], []).append(HistoryEntry.from_dict(record["entry"]))
+                entry_count += 1
+
+        with self._lock:
+            for user_id, dates in history.items():
+                if user_id not in self._view:
+                    self._view[user_id] = _empty_user_replay()
+                user_history = self._view[user_id]["history"]
+                for date_iso, entries in dates.items():
+                    # Archived entries come before the ones replayed or appended since
+                    user_history[date_iso] = entries + user_history.get(date_iso, [])
+            self._history_years.add(year)
+        return entry_count
+
+    def _load_history(self, segments: list[str]):
+        """Merge the snapshot's segments and load the recent years of history (background thread)."""
+        started = time.perf_counter()
+        try:
+            with self._archive_lock:
+                self._merge_segments(segments)
+                self._archive_sizes = {int(year): size for year, size in self._read_manifest()["sizes"].items()}
+                first_year = datetime.now().year - self.history_years + 1
+                years = [year for year in sorted(self._archive_sizes) if year >= first_year]
+                entry_count = sum(self._load_history_year(year) for year in years)
+            print(
+                f"Journal history: {entry_count} archived entr(ies) of {len(years)} year(s) "
+                f"loaded in {time.perf_counter() - started:.3f}s"
+            )
+        except Exception as e:
+            self._history_error = e
+            print(f"Journal history could not be loaded: {e}")
+        finally:
+            self._history_loaded.set()
+
+    def wait_history(self, year: int | None = None):
+        """Make sure the archived history of a year (default: all years) is in the view.
+
+        Recent years are loaded in the background at startup (this waits for
+        them); older years are read from their archive on first use.
+
+        Raises:
+            JournalSnapshotError: A segment or archive could not be read.
+        """
+        self.load()
+        self._history_loaded.wait()
+        if self._history_error is not None:
+            raise JournalSnapshotError(f"Journal history could not be loaded: {self._history_error}")
+        if year is not None and year in self._history_years:
+            return
+        with self._archive_lock:
+            for archived_year in sorted(self._archive_sizes) if year is None else [year]:
+                self._load_history_year(archived_year)
+
+
+_journal: CalendarJournal | None = None
+
+
+def get_journal() -> CalendarJournal:
+    """Get the process-wide calendar journal."""
+    global _journal
+    if _journal is None:
+        _journal = CalendarJournal()
+    return _journal
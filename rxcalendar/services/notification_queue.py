@@ -0,0 +1,189 @@
+"""Bounded notification queues with one digest record per propagation.
+
+A propagation (holiday over a date range, project special worktime, ...)
+publishes a single Notification describing the whole batch (scope, date
+range, actor) to one or more audiences instead of one formatted string per
+user and date. An audience is a group of users::
+
+    *                                   everyone
+    region:<region>
+    project:<project_id>
+    project:<project_id>:region:<region>
+    project:<project_id>:role:<role>
+    user:<user_id>
+
+Each audience keeps a bounded log of its latest notifications (older ones are
+evicted) and a count of everything ever published to it. Users only hold a
+read cursor per audience, so a user's unread count is a few subtractions (plus
+a pass over the unread ids when a notification may have reached them through
+several audiences) and dismissing is moving the cursors to the heads,
+whatever the number of users.
+"""
+
+import os
+import threading
+from collections import deque
+from itertools import islice
+from typing import Iterable, TypedDict
+
+from rxcalendar.services.history_entry import now_timestamp
+
+
+# Notifications kept per audience (override with RXCALENDAR_NOTIFICATION_QUEUE_SIZE)
+DEFAULT_QUEUE_SIZE = int(os.environ.get("RXCALENDAR_NOTIFICATION_QUEUE_SIZE", "50"))
+
+EVERYONE = "*"
+
+
+class Notification(TypedDict):
+    """One digest notification (a whole propagation batch)."""
+    id: int
+    timestamp: int
+    kind: str
+    scope: str  # Human readable, e.g. "company-wide" or "region Madrid"
+    date_from: str
+    date_to: str
+    date_count: int
+    actor: str
+    actor_role: str
+    message: str
+
+
+def region_audience(region: str) -> str:
+    """Audience of a region."""
+    return f"region:{region}"
+
+
+def project_audience(project_id: str, region: str = "", role: str = "") -> str:
+    """Audience of a project, optionally restricted to a region or a role."""
+    audience = f"project:{project_id}"
+    if region:
+        audience += f":region:{region}"
+    if role:
+        audience += f":role:{role}"
+    return audience
+
+
+def user_audience(user_id: str) -> str:
+    """Audience of a single user."""
+    return f"user:{user_id}"
+
+
+def user_audiences(user: dict | None) -> tuple[str, ...]:
+    """Audiences a user belongs to."""
+    if not user:
+        return ()
+    region = user.get("region", "")
+    project_id = user.get("project_id", "")
+    audiences = [EVERYONE, user_audience(user["id"])]
+    if region:
+        audiences.append(region_audience(region))
+    if project_id:
+        audiences.append(project_audience(project_id))
+        audiences.append(project_audience(project_id, role=user.get("role", "")))
+        if region:
+            audiences.append(project_audience(project_id, region=region))
+    return tuple(audiences)
+
+
+def format_date_range(dates: list[str]) -> str:
+    """'on 2026-05-01' for one date, 'from 2026-05-01 to 2026-05-12 (8 dates)' otherwise."""
+    if len(dates) == 1:
+        return f"on {dates[0]}"
+    return f"from {min(dates)} to {max(dates)} ({len(dates)} dates)"
+
+
+class NotificationQueues:
+    """Process-wide audience logs and per-user read cursors."""
+
+    def __init__(self, capacity: int = DEFAULT_QUEUE_SIZE):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._logs: dict[str, deque[Notification]] = {}
+        self._heads: dict[str, int] = {}  # Notifications ever published per audience
+        self._cursors: dict[str, dict[str, int]] = {}  # {user_id: {audience: head when last read}}
+
+    def publish(
+        self,
+        audiences: Iterable[str],
+        kind: str,
+        scope: str,
+        dates: list[str],
+        actor: str,
+        actor_role: str,
+        message: str,
+    ) -> Notification:
+        """Publish one digest notification to audiences."""
+        with self._lock:
+            notification: Notification = {
+                "id": self._next_id,
+                "timestamp": now_timestamp(),
+                "kind": kind,
+                "scope": scope,
+                "date_from": min(dates) if dates else "",
+                "date_to": max(dates) if dates else "",
+                "date_count": len(dates),
+                "actor": actor,
+                "actor_role": actor_role,
+                "message": message,
+            }
+            self._next_id += 1
+            for audience in set(audiences):
+                log = self._logs.get(audience)
+                if log is None:
+                    log = self._logs[audience] = deque(maxlen=self.capacity)
+                log.append(notification)  # Evicts the oldest when full
+                self._heads[audience] = self._heads.get(audience, 0) + 1
+            return notification
+
+    def _unread_in(self, user_id: str, audience: str) -> int:
+        """Unread notifications of one audience (evicted ones are not counted)."""
+        unread = self._heads.get(audience, 0) - self._cursors.get(user_id, {}).get(audience, 0)
+        return min(unread, len(self._logs.get(audience, ())))
+
+    def unread_count(self, user_id: str, audiences: Iterable[str]) -> int:
+        """Number of unread notifications of a user, each counted once like unread().
+
+        A subtraction when only one audience has unread notifications; ids
+        are only collected when several do (a notification may be in more
+        than one of them).
+        """
+        with self._lock:
+            counts = [(audience, self._unread_in(user_id, audience)) for audience in audiences]
+            counts = [(audience, count) for audience, count in counts if count]
+            if len(counts) <= 1:
+                return counts[0][1] if counts else 0
+            ids = set()
+            for audience, count in counts:
+                ids.update(notification["id"] for notification in islice(reversed(self._logs[audience]), count))
+            return len(ids)
+
+    def unread(self, user_id: str, audiences: Iterable[str]) -> list[Notification]:
+        """Unread notifications of a user, oldest first."""
+        with self._lock:
+            notifications = {}
+            for audience in audiences:
+                count = self._unread_in(user_id, audience)
+                if count:
+                    for notification in list(self._logs[audience])[-count:]:
+                        notifications[notification["id"]] = notification
+            return [notifications[key] for key in sorted(notifications)]
+
+    def mark_read(self, user_id: str, audiences: Iterable[str]):
+        """Move a user's cursors to the heads of their audiences."""
+        with self._lock:
+            cursors = self._cursors.setdefault(user_id, {})
+            for audience in audiences:
+                cursors[audience] = self._heads.get(audience, 0)
+
+
+_queues: NotificationQueues | None = None
+
+
+def get_notification_queues() -> NotificationQueues:
+    """Get the process-wide notification queues."""
+    global _queues
+    if _queues is None:
+        _queues = NotificationQueues()
+    return _queues
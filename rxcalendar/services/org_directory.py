@@ -0,0 +1,216 @@
+"""Indexed view of the organization (divisions, projects, regions, users).
+
+The org data is kept as the plain lists the UI iterates over; the directory
+indexes them once so lookups by id and the usual selections (members of a
+project, users of a region, HR users, ...) are dict accesses instead of
+scans over every user.
+
+A directory is an immutable snapshot: adding users, projects or regions
+builds a new one (see ``OrgDirectory.extended``) with a new ``version``,
+so anything memoized against the directory can tell it changed. Versions
+are unique tokens rather than counters: copies of a directory (one per
+session) share their version and therefore their memoized results.
+"""
+
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Iterable
+
+
+# Division -> Project -> Region -> Users tree, as rendered by the user selectors
+Hierarchy = list[tuple[str, list[tuple[str, list[tuple[str, list[dict]]]]]]]
+
+# Per-scope results (visible users, their ids, hierarchy), keyed by
+# (directory version, kind, viewer scope), LRU evicted
+SCOPE_CACHE_SIZE = 256
+_scope_cache: OrderedDict[tuple, Any] = OrderedDict()
+
+
+class OrgDirectory:
+    """O(1) lookups by id plus secondary indexes over the org lists."""
+
+    def __init__(
+        self,
+        divisions: list[dict],
+        projects: list[dict],
+        regions: list[str],
+        users: list[dict],
+    ):
+        self.version = uuid.uuid4().hex
+        self.divisions = divisions
+        self.projects = projects
+        self.regions = regions
+        self.users = users
+
+        self.divisions_by_id = {division["id"]: division for division in divisions}
+        self.projects_by_id = {project["id"]: project for project in projects}
+        self.users_by_id: dict[str, dict] = {}
+        self._user_positions: dict[str, int] = {}
+        self.users_by_project: dict[str, list[dict]] = {}
+        self.users_by_division: dict[str, list[dict]] = {}
+        self.users_by_region: dict[str, list[dict]] = {}
+        self.users_by_role: dict[str, list[dict]] = {}
+
+        for position, user in enumerate(users):
+            self.users_by_id[user["id"]] = user
+            self._user_positions[user["id"]] = position
+            self.users_by_project.setdefault(user.get("project_id", ""), []).append(user)
+            self.users_by_division.setdefault(user.get("division_id", ""), []).append(user)
+            self.users_by_region.setdefault(user.get("region", ""), []).append(user)
+            self.users_by_role.setdefault(user.get("role", ""), []).append(user)
+
+    def extended(
+        self,
+        projects: Iterable[dict] = (),
+        regions: Iterable[str] = (),
+        users: Iterable[dict] = (),
+    ) -> "OrgDirectory":
+        """New directory (new version) with added projects, regions and users.
+        
+        The directory itself is never mutated, so a directory (or anything
+        memoized against its version) stays consistent with what it indexed.
+        """
+        return OrgDirectory(
+            self.divisions,
+            [*self.projects, *projects],
+            [*self.regions, *(region for region in regions if region not in self.regions)],
+            [*self.users, *users],
+        )
+
+    # ----- Lookups by id -----
+
+    def user(self, user_id: str) -> dict | None:
+        """User with the given id, None if unknown."""
+        return self.users_by_id.get(user_id)
+
+    def project(self, project_id: str) -> dict | None:
+        """Project with the given id, None if unknown."""
+        return self.projects_by_id.get(project_id)
+
+    def division(self, division_id: str) -> dict | None:
+        """Division with the given id, None if unknown."""
+        return self.divisions_by_id.get(division_id)
+
+    def has_region(self, region: str) -> bool:
+        """Whether the region is known."""
+        return region in self.regions
+
+    # ----- Secondary indexes -----
+
+    def users_in_project(self, project_id: str) -> list[dict]:
+        """Users whose (primary) project is project_id."""
+        return self.users_by_project.get(project_id, [])
+
+    def users_in_projects(self, project_ids: Iterable[str]) -> list[dict]:
+        """Users whose project is one of project_ids, in directory order."""
+        users = [user for project_id in set(project_ids) for user in self.users_by_project.get(project_id, [])]
+        users.sort(key=lambda user: self._user_positions[user["id"]])
+        return users
+
+    def users_in_division(self, division_id: str) -> list[dict]:
+        """Users of a division."""
+        return self.users_by_division.get(division_id, [])
+
+    def users_in_region(self, region: str) -> list[dict]:
+        """Users of a region."""
+        return self.users_by_region.get(region, [])
+
+    def users_with_role(self, role: str) -> list[dict]:
+        """Users with a role ("employee", "manager", "hr")."""
+        return self.users_by_role.get(role, [])
+
+    # ----- Derived lookups -----
+
+    def user_project(self, user: dict) -> dict | None:
+        """Project of a user: its project_id, else the first known of its project_ids."""
+        project_id = user.get("project_id", "")
+        if project_id:
+            return self.projects_by_id.get(project_id)
+        project_ids = set(user.get("project_ids", []))
+        # Same precedence as before: first matching project in PROJECTS order
+        return next((p for p in self.projects if p["id"] in project_ids), None)
+
+    def project_names(self, project_ids: Iterable[str]) -> list[str]:
+        """Names of the known projects among project_ids, in PROJECTS order."""
+        project_ids = set(project_ids)
+        return [p["name"] for p in self.projects if p["id"] in project_ids]
+
+    def division_name(self, division_id: str, default: str = "Unknown") -> str:
+        """Name of a division, default if unknown."""
+        division = self.divisions_by_id.get(division_id)
+        return division["name"] if division else default
+
+    def project_name(self, project_id: str, default: str = "Unknown") -> str:
+        """Name of a project, default if unknown."""
+        project = self.projects_by_id.get(project_id)
+        return project["name"] if project else default
+
+    # ----- Viewer scope -----
+
+    def viewer_scope(self, viewer: dict) -> tuple:
+        """Hashable key of the users a viewer can see.
+        
+        HR see everyone, managers the members of their projects (project_ids
+        plus project_id), employees only themselves.
+        """
+        role = viewer.get("role", "")
+        if role == "hr":
+            return ("hr",)
+        if role == "manager":
+            return ("manager", frozenset([*viewer.get("project_ids", []), viewer.get("project_id", "")]))
+        return ("employee", viewer["id"])
+
+    def _memoized(self, kind: str, scope: tuple, build: Callable[[], Any]) -> Any:
+        """Result of build() memoized per (directory version, kind, scope)."""
+        key = (self.version, kind, scope)
+        if key in _scope_cache:
+            _scope_cache.move_to_end(key)
+            return _scope_cache[key]
+
+        result = _scope_cache[key] = build()
+        if len(_scope_cache) > SCOPE_CACHE_SIZE:
+            _scope_cache.popitem(last=False)
+        return result
+
+    def users_in_scope(self, scope: tuple) -> list[dict]:
+        """Users visible for a viewer scope (see viewer_scope), memoized."""
+        if scope[0] == "hr":
+            return self.users
+        if scope[0] == "manager":
+            return self._memoized("users", scope, lambda: self.users_in_projects(scope[1]))
+        user = self.users_by_id.get(scope[1])
+        return [user] if user else []
+
+    def user_ids_in_scope(self, scope: tuple) -> frozenset[str]:
+        """Ids of the users visible for a viewer scope, memoized (permission checks)."""
+        return self._memoized("ids", scope, lambda: frozenset(u["id"] for u in self.users_in_scope(scope)))
+
+    def hierarchy(self, scope: tuple) -> Hierarchy:
+        """Division -> Project -> Region -> Users tree of the users in a scope.
+        
+        All levels are sorted alphabetically. The tree is memoized per
+        (directory version, scope); callers must not mutate it.
+        """
+        return self._memoized("hierarchy", scope, lambda: self._build_hierarchy(self.users_in_scope(scope)))
+
+    def _build_hierarchy(self, users: list[dict]) -> Hierarchy:
+        """Group users by division name, project name and region (one pass), then sort."""
+        tree: dict[str, dict[str, dict[str, list[dict]]]] = {}
+        for user in users:
+            division_name = self.division_name(user.get("division_id", ""))
+            # Multi-project managers are listed under their first project
+            project = self.user_project(user)
+            project_name = project["name"] if project else ""
+            region = user.get("region", "Unknown")
+            tree.setdefault(division_name, {}).setdefault(project_name, {}).setdefault(region, []).append(user)
+
+        return [
+            (division_name, [
+                (project_name, [
+                    (region, sorted(region_users, key=lambda u: u.get("name", "")))
+                    for region, region_users in sorted(regions.items())
+                ])
+                for project_name, regions in sorted(projects.items())
+            ])
+            for division_name, projects in sorted(tree.items())
+        ]
@@ -1,13 +1,14 @@
 """PDF calendar export service using reportlab."""
 
 import asyncio
-from datetime import datetime
 from io import BytesIO
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.units import inch, mm
 from reportlab.pdfgen import canvas
 from reportlab.lib.colors import HexColor
 
+from rxcalendar.services.date_table import DEFAULT_YEAR, month_shape
+
 
 async def generate_calendar_pdf(calendar_data: dict) -> bytes:
     """
@@ -54,7 +55,7 @@ def _generate_pdf_sync(calendar_data: dict) -> bytes:
     # Title
     c.setFont("Helvetica-Bold", 18)
     c.setFillColor(HexColor("#1a202c"))
-    title = f"2026 Calendar - {calendar_data['user_name']}"
+    title = f"{calendar_data.get('year', DEFAULT_YEAR)} Calendar - {calendar_data['user_name']}"
     c.drawString(margin, y, title)
     y -= 25
     
@@ -107,6 +108,7 @@ def _generate_pdf_sync(calendar_data: dict) -> bytes:
             month_width - 10,
             month_height - 10,
             month_idx + 1,
+            calendar_data.get('year', DEFAULT_YEAR),
             months[month_idx],
             calendar_data.get('monthly_data', {}).get(month_idx + 1, []),
             calendar_data.get('flag_colors', {})
@@ -164,6 +166,7 @@ def _draw_month_mini_calendar_pdf(
     width: float,
     height: float,
     month: int,
+    year: int,
     month_name: str,
     entries: list[dict],
     flag_colors: dict[str, str]
@@ -187,19 +190,8 @@ def _draw_month_mini_calendar_pdf(
         header_x = x + i * cell_width + cell_width / 2 - 3
         c.drawString(header_x, header_y, day_name)
     
-    # Get first day of month and number of days
-    first_day = datetime(2026, month, 1)
-    first_weekday = first_day.weekday()  # 0=Monday, 6=Sunday
-    
-    # Number of days in month
-    if month == 12:
-        days_in_month = 31
-    else:
-        try:
-            next_month = datetime(2026, month + 1, 1)
-            days_in_month = (next_month - first_day).days
-        except:
-            days_in_month = 31
+    # Weekday of the 1st (0=Monday, 6=Sunday) and number of days in month
+    first_weekday, days_in_month = month_shape(year, month)
     
     # Create entries lookup dict
     entries_by_day = {}
@@ -1,10 +1,11 @@
 """PNG calendar export service using Pillow."""
 
 import asyncio
-from datetime import datetime
 from io import BytesIO
 from PIL import Image, ImageDraw, ImageFont
 
+from rxcalendar.services.date_table import DEFAULT_YEAR, month_shape
+
 
 async def generate_calendar_png(calendar_data: dict) -> bytes:
     """
@@ -68,7 +69,7 @@ def _generate_png_sync(calendar_data: dict) -> bytes:
     
     # ===== HEADER SECTION =====
     # Title
-    title = f"2026 Calendar - {calendar_data['user_name']}"
+    title = f"{calendar_data.get('year', DEFAULT_YEAR)} Calendar - {calendar_data['user_name']}"
     draw.text((margin, y), title, fill='#1a202c', font=font_title)
     y += 60
     
@@ -113,6 +114,7 @@ def _generate_png_sync(calendar_data: dict) -> bytes:
             month_width - 20,
             month_height - 20,
             month_idx + 1,
+            calendar_data.get('year', DEFAULT_YEAR),
             months[month_idx],
             calendar_data.get('monthly_data', {}).get(month_idx + 1, []),
             calendar_data.get('flag_colors', {}),
@@ -172,6 +174,7 @@ def _draw_month_mini_calendar(
     width: int,
     height: int,
     month: int,
+    year: int,
     month_name: str,
     entries: list[dict],
     flag_colors: dict[str, str],
@@ -197,19 +200,8 @@ def _draw_month_mini_calendar(
     
     y += 30
     
-    # Get first day of month and number of days
-    first_day = datetime(2026, month, 1)
-    first_weekday = first_day.weekday()  # 0=Monday, 6=Sunday
-    
-    # Number of days in month
-    if month == 12:
-        days_in_month = 31
-    else:
-        try:
-            next_month = datetime(2026, month + 1, 1)
-            days_in_month = (next_month - first_day).days
-        except:
-            days_in_month = 31
+    # Weekday of the 1st (0=Monday, 6=Sunday) and number of days in month
+    first_weekday, days_in_month = month_shape(year, month)
     
     # Create entries lookup dict
     entries_by_day = {}
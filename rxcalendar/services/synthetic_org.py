@@ -0,0 +1,314 @@
+"""Synthetic org and calendar history for load tests.
+
+Builds an org shaped like CalendarState's (divisions, projects with a
+division_id, regions, users following the USERS schema, managers with
+``project_ids``, some of them over several projects of their division) and
+years of calendar history for its users, drawn from a SyntheticProfile:
+
+- the share of weekdays a user filled in
+- flag weights, hours weights (Monday-Thursday, Friday, special worktime)
+- comment rate and comment pool
+- calendar status weights (draft ... validated)
+
+Calendars are generated one (user, year) at a time in the export format,
+which is what ``_validate_and_preview_import`` accepts::
+
+    {"export_metadata": {...}, "calendar_owner": {"id", "name", "role"},
+     "project": {...}, "region": "...", "year": 2026,
+     "calendar_status": "validated", "days": [{"date", "flag", "comment", "hours"}]}
+
+and written as they are generated, either one import file per calendar or a
+single bulk export in the app's NDJSON layout (calendar_export.py: a first
+line ``{"export_metadata": {..., "export_count"}}``, then one import document
+per line), so only one calendar is ever held in memory.
+
+Every calendar has its own random generator seeded from (seed, user, year):
+the same seed gives the same files, whatever years or users are written.
+"""
+
+import json
+import os
+import random
+from datetime import datetime
+from typing import Iterable, Iterator
+
+from rxcalendar.services.calendar_export import write_lines
+from rxcalendar.services.date_table import year_dates
+
+
+# The app's regions first, then the other autonomous communities
+REGION_NAMES = [
+    "Andalousia", "Valencia", "Baleares", "Madrid", "Asturias", "Cantabria",
+    "Aragon", "Canarias", "Castilla-La Mancha", "Castilla y Leon", "Cataluna",
+    "Extremadura", "Galicia", "La Rioja", "Murcia", "Navarra", "Pais Vasco",
+]
+
+FIRST_NAMES = [
+    "Alice", "Bob", "Carmen", "Daniel", "Elena", "Felix", "Gloria", "Hugo",
+    "Irene", "Javier", "Karen", "Luis", "Marta", "Nicolas", "Olga", "Pablo",
+    "Quinn", "Rosa", "Sergio", "Teresa", "Ulises", "Victoria", "Walter", "Ximena",
+]
+
+LAST_NAMES = [
+    "Garcia", "Johnson", "Lopez", "Smith", "Martinez", "Brown", "Sanchez",
+    "Wilson", "Perez", "Taylor", "Gomez", "Anderson", "Diaz", "Thomas",
+    "Romero", "Moore", "Navarro", "White", "Torres", "Harris",
+]
+
+EXPORTER = {"id": "synthetic", "name": "Synthetic data generator"}
+
+
+class SyntheticProfile:
+    """Org shape and history distributions of a synthetic dataset.
+
+    Weights are relative (they need not sum to 1). ``from_dict`` overrides
+    the defaults with the keys of a JSON profile.
+    """
+
+    __slots__ = (
+        "users_per_project",
+        "projects_per_division",
+        "region_count",
+        "hr_every",
+        "multi_project_manager_share",
+        "fill_rate",
+        "flag_weights",
+        "hours_mon_thu",
+        "hours_fri",
+        "hours_special_worktime",
+        "comment_rate",
+        "comments",
+        "status_weights",
+    )
+
+    def __init__(self):
+        self.users_per_project = 50
+        self.projects_per_division = 10
+        self.region_count = len(REGION_NAMES)
+        # One HR user every hr_every users
+        self.hr_every = 500
+        # Managers who also manage the next project of their division
+        self.multi_project_manager_share = 0.25
+        # Share of weekdays holding a value (the rest were never filled in)
+        self.fill_rate = 0.9
+        self.flag_weights = {
+            "": 88.0,
+            "on vacation": 6.0,
+            "national day off": 1.5,
+            "regional day off": 1.0,
+            "extra day off": 1.0,
+            "project_special_worktime": 1.0,
+            "Akkodis offered day off": 0.5,
+            "on vacation client closed": 0.5,
+            "offered vacation client closed": 0.5,
+        }
+        self.hours_mon_thu = {8.0: 70.0, 8.5: 15.0, 7.5: 10.0, 9.0: 5.0}
+        self.hours_fri = {7.0: 60.0, 6.0: 20.0, 8.0: 20.0}
+        self.hours_special_worktime = {10.0: 50.0, 12.0: 30.0, 14.0: 20.0}
+        self.comment_rate = 0.05
+        self.comments = [
+            "Client meeting",
+            "Remote day",
+            "Training",
+            "On site",
+            "Doctor appointment",
+            "Release support",
+            "Team workshop",
+        ]
+        self.status_weights = {
+            "draft": 15.0,
+            "pending_manager_validation": 10.0,
+            "validated_by_manager": 15.0,
+            "validated": 60.0,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SyntheticProfile":
+        """Default profile with the given keys overridden."""
+        profile = cls()
+        for key, value in data.items():
+            if key not in cls.__slots__:
+                raise ValueError(f"Unknown profile key: {key!r}")
+            if key.startswith("hours_"):
+                # JSON object keys are strings
+                value = {float(hours): weight for hours, weight in value.items()}
+            setattr(profile, key, value)
+        return profile
+
+
+# ----- Org -----
+
+def generate_org(user_count: int, profile: SyntheticProfile | None = None) -> tuple[list[dict], list[dict], list[str], list[dict]]:
+    """(divisions, projects, regions, users) of an org of user_count users.
+
+    The second user of each project is its manager, and one user in
+    profile.hr_every is HR (the first user always is).
+    """
+    profile = profile or SyntheticProfile()
+    project_count = max(1, user_count // profile.users_per_project)
+    division_count = max(1, -(-project_count // profile.projects_per_division))
+    regions = [
+        REGION_NAMES[r] if r < len(REGION_NAMES) else f"Region {r}"
+        for r in range(profile.region_count)
+    ]
+    divisions = [
+        {"id": f"div{d:04d}", "name": f"Division {d}", "description": f"Synthetic division {d}"}
+        for d in range(division_count)
+    ]
+    projects = [
+        {
+            "id": f"proj{p:05d}",
+            "name": f"Project {p}",
+            "description": f"Synthetic project {p}",
+            "division_id": f"div{p // profile.projects_per_division:04d}",
+        }
+        for p in range(project_count)
+    ]
+
+    # Deterministic share of multi-project managers (every n-th manager)
+    multi_every = round(1 / profile.multi_project_manager_share) if profile.multi_project_manager_share else 0
+    users = []
+    for u in range(user_count):
+        project = projects[u % project_count]
+        name = f"{FIRST_NAMES[u % len(FIRST_NAMES)]} {LAST_NAMES[u // len(FIRST_NAMES) % len(LAST_NAMES)]}"
+        user = {
+            "id": f"usr{u:06d}",
+            "name": name,
+            "role": "employee",
+            "project_id": project["id"],
+            "division_id": project["division_id"],
+            "region": regions[u % len(regions)],
+        }
+        if u % profile.hr_every == 0:
+            user["role"] = "hr"
+            user["name"] = f"{name} (HR)"
+        elif u // project_count == 1:
+            p = u % project_count
+            user["role"] = "manager"
+            user["name"] = f"{name} (Manager)"
+            user["project_ids"] = [project["id"]]
+            # Second project of the same division, if there is one
+            if multi_every and p % multi_every == 0 and p + 1 < project_count:
+                next_project = projects[p + 1]
+                if next_project["division_id"] == project["division_id"]:
+                    user["project_ids"].append(next_project["id"])
+        users.append(user)
+    return divisions, projects, regions, users
+
+
+# ----- History -----
+
+def _weighted(weights: dict) -> tuple[list, list[float]]:
+    """(population, cumulative weights) for random.choices."""
+    population = list(weights)
+    cumulative = []
+    total = 0.0
+    for value in population:
+        total += weights[value]
+        cumulative.append(total)
+    return population, cumulative
+
+
+def iter_calendars(
+    users: Iterable[dict],
+    projects: list[dict],
+    years: Iterable[int],
+    profile: SyntheticProfile | None = None,
+    seed: int = 0,
+    export_date: str = "",
+) -> Iterator[dict]:
+    """Calendars (export format) of every user for every year, user by user."""
+    profile = profile or SyntheticProfile()
+    years = list(years)
+    projects_by_id = {project["id"]: project for project in projects}
+    flags = _weighted(profile.flag_weights)
+    hours_mon_thu = _weighted(profile.hours_mon_thu)
+    hours_fri = _weighted(profile.hours_fri)
+    hours_special = _weighted(profile.hours_special_worktime)
+    statuses = _weighted(profile.status_weights)
+    metadata = {
+        "export_date": export_date or datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+        "exporter": EXPORTER["id"],
+        "exporter_name": EXPORTER["name"],
+    }
+
+    for user in users:
+        project = projects_by_id.get(user.get("project_id"))
+        owner = {"id": user["id"], "name": user["name"], "role": user["role"]}
+        for year in years:
+            rng = random.Random(f"{seed}:{user['id']}:{year}")
+            dates = year_dates(year)
+            count = len(dates.weekday_isos)
+            day_flags = rng.choices(flags[0], cum_weights=flags[1], k=count)
+            days = []
+            for date_iso, weekday, flag in zip(dates.weekday_isos, dates.weekday_numbers, day_flags):
+                if rng.random() >= profile.fill_rate:
+                    continue
+                if flag == "project_special_worktime":
+                    hours = rng.choices(hours_special[0], cum_weights=hours_special[1])[0]
+                elif flag:
+                    hours = 0.0
+                elif weekday == 4:
+                    hours = rng.choices(hours_fri[0], cum_weights=hours_fri[1])[0]
+                else:
+                    hours = rng.choices(hours_mon_thu[0], cum_weights=hours_mon_thu[1])[0]
+                comment = rng.choice(profile.comments) if profile.comments and rng.random() < profile.comment_rate else ""
+                days.append({"date": date_iso, "flag": flag, "comment": comment, "hours": hours})
+
+            yield {
+                "export_metadata": metadata,
+                "calendar_owner": owner,
+                "project": project if project else {"id": "", "name": "", "description": ""},
+                "region": user.get("region", ""),
+                "year": year,
+                "calendar_status": rng.choices(statuses[0], cum_weights=statuses[1])[0],
+                "days": days,
+            }
+
+
+# ----- Writers -----
+
+def write_org(path: str, divisions: list[dict], projects: list[dict], regions: list[str], users: list[dict]):
+    """Write the org lists as {"divisions", "projects", "regions", "users"}."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"divisions": divisions, "projects": projects, "regions": regions, "users": users}, f, ensure_ascii=False)
+
+
+def write_calendar_files(directory: str, calendars: Iterable[dict]) -> int:
+    """Write each calendar as its own (uncompressed) import file; returns the number of files."""
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    for calendar in calendars:
+        filename = f"calendar_{calendar['calendar_owner']['id']}_{calendar['year']}.json"
+        with open(os.path.join(directory, filename), "w", encoding="utf-8") as f:
+            json.dump(calendar, f, ensure_ascii=False)
+        count += 1
+    return count
+
+
+def write_bulk_export(
+    path: str,
+    calendars: Iterable[dict],
+    export_count: int,
+    export_date: str = "",
+    compress: bool = False,
+) -> int:
+    """Write the calendars as one NDJSON bulk export, one calendar at a time.
+
+    export_count goes in the metadata line written before the calendars, so
+    it is given up front (users x years); returns the number of calendars
+    written, for the caller to compare.
+    """
+    metadata = {
+        "export_date": export_date or datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+        "exporter": EXPORTER["id"],
+        "exporter_name": EXPORTER["name"],
+    }
+
+    def lines() -> Iterator[str]:
+        yield json.dumps({"export_metadata": {**metadata, "export_count": export_count}}, ensure_ascii=False) + "\n"
+        for calendar in calendars:
+            yield json.dumps(calendar, ensure_ascii=False) + "\n"
+
+    # Minus the metadata line
+    return write_lines(path, lines(), compress=compress) - 1
@@ -1,20 +1,26 @@
 """State management for the calendar application."""
 
+import asyncio
 import json
 from datetime import datetime
 from typing import Any, TypedDict
 import reflex as rx
+from rxcalendar.backend_api import artifact_url
+from rxcalendar.computed_vars import TRACK_HANDLERS, cached_var, instrument_handlers
+from rxcalendar.custom_calendar import get_month_data
 from rxcalendar.services.png_export_service import generate_calendar_png
 from rxcalendar.services.pdf_export_service import generate_calendar_pdf
-
-
-class HistoryEntry(TypedDict):
-    """Type definition for a history entry."""
-    timestamp: str
-    action: str
-    comment: str
-    flag: str
-    hours: float
+from rxcalendar.services.calendar_store import COMPANY_SCOPE, get_calendar_store
+from rxcalendar.services.artifact_store import get_artifact_store
+from rxcalendar.services.calendar_export import calendar_export, iter_bulk_export_lines, write_lines
+from rxcalendar.services.bulk_hours_plan import BulkHoursPlan, month_weekdays
+from rxcalendar.services.date_table import DEFAULT_YEAR, display_index, iso_index, weekdays_in_range, year_dates
+from rxcalendar.services.calendar_year import FLAG_CHOICES as CALENDAR_FLAG_CHOICES, DayValue
+from rxcalendar.services import holiday_overlay
+from rxcalendar.services.history_entry import HistoryEntry, now_timestamp
+from rxcalendar.services.org_directory import OrgDirectory
+from rxcalendar.services import notification_queue
+from rxcalendar.services.notification_queue import get_notification_queues
 
 
 class Project(TypedDict):
@@ -32,12 +38,55 @@ class User(TypedDict):
     project_id: str  # Link to project
 
 
+class DayCell(TypedDict):
+    """One cell of a month grid (see custom_calendar.get_month_data)."""
+    day: int  # Day of month, 0 for the padding cells outside the month
+    is_current_month: bool
+    date_str: str  # Day cell format sent back by clicks ("Thu Mar 05 2026")
+    date_iso: str
+    is_weekday: bool
+
+
+def _month_weeks_var(month: int):
+    """Create a computed var holding the week matrix of a month of the viewed year.
+    
+    The month grid is one component rendered with rx.foreach over this
+    matrix instead of a component per day. It only depends on the viewed
+    year: day values come from the month shards, looked up by date_iso on
+    the client, so a save still only retransmits the edited month's shards.
+    """
+    def weeks(self) -> list[list[DayCell]]:
+        return get_month_data(self.viewed_year, month)
+    
+    weeks.__name__ = f"month_{month:02d}_weeks"
+    weeks.__doc__ = f"Week matrix of month {month} of the viewed year."
+    return cached_var("viewed_year")(weeks)
+
+
+def _month_shard_var(cache_name: str, month: int, kind: str, value_type: type):
+    """Create a computed var holding one month of a viewed-calendar cache.
+    
+    The var only depends on its month's revision counter, so a save invalidates
+    and retransmits the edited month instead of the whole year.
+    """
+    prefix = f"-{month:02d}-"
+    
+    def shard(self) -> dict[str, value_type]:
+        values = getattr(self, cache_name).get(self.viewed_user_id, {})
+        return {date_iso: value for date_iso, value in values.items() if date_iso[4:8] == prefix}
+    
+    shard.__name__ = f"month_{month:02d}_{kind}"
+    shard.__doc__ = f"Viewed user's {kind.replace('_', ' ')} for month {month}."
+    return cached_var(f"_month_{month:02d}_revision", "viewed_user_id")(shard)
+
+
 class CalendarState(rx.State):
     """State for managing calendar comments and interactions."""
     
     # User management
     current_user_id: str = "hr001"  # Default user (who is logged in)
     viewed_user_id: str = "hr001"  # Which user's calendar is being viewed
+    viewed_year: int = DEFAULT_YEAR  # Which year of that calendar is loaded (one year in memory)
     show_user_selector: bool = False
     
     # Divisions data (business focus grouping)
@@ -101,6 +150,10 @@ class CalendarState(rx.State):
         {"id": "hr005", "name": "Quincy Adams (HR)", "role": "hr", "project_id": "proj003", "division_id": "div003", "region": "Madrid"},
     ]
     
+    # Indexes over DIVISIONS/PROJECTS/REGIONS/USERS (backend only).
+    # Replaced by an extended directory (new version) whenever import adds to the lists.
+    _org: OrgDirectory = OrgDirectory(DIVISIONS, PROJECTS, REGIONS, USERS)
+    
     # Role-based flag permissions
     # HR_ONLY_FLAGS are now empty - all previously HR-only flags moved to shared
     HR_ONLY_FLAGS = []
@@ -127,13 +180,16 @@ class CalendarState(rx.State):
     
     # History tracking: {user_id: {date: [entries]}} - per-user calendars
     # Each user has their own calendar linked to their project
-    history: dict[str, dict[str, list[dict]]] = {}
+    # Backend-only: the client gets the selected date's history page
+    _history: dict[str, dict[str, list[HistoryEntry]]] = {}
+    
+    # History dialog pagination (newest entries first)
+    HISTORY_PAGE_SIZE = 20
+    history_page: int = 0
     
     # Range selection for multiple days
     range_start_date: str = ""
     range_end_date: str = ""
-    is_selecting_range: bool = False
-    hovered_date: str = ""
     
     # Currently selected date (or range)
     selected_date: str = ""
@@ -159,10 +215,13 @@ class CalendarState(rx.State):
     bulk_overwrite_count: int = 0  # Days that already have hours
     bulk_apply_to_all_months: bool = False  # Apply to all 12 months
     bulk_skip_conflicts: bool = False  # Skip conflicting days vs overwrite
+    _bulk_hours_plan: BulkHoursPlan | None = None  # Built by the preview, executed by apply
 
-    # Company-wide holidays (set by HR) and per-user notifications
-    company_holidays: dict[str, str] = {}  # {date_iso: flag}
-    notifications: dict[str, list[str]] = {}  # {user_id: [messages]}
+    # Company-wide holidays of the viewed year (set by HR) (backend-only)
+    _company_holidays: dict[str, str] = {}  # {date_iso: flag}
+    # Notifications live in the process-wide queues (services/notification_queue);
+    # bumped whenever this session publishes, dismisses or switches calendar
+    _notification_revision: int = 0
     
     # Summary panel settings
     hours_to_days_ratio: float = 8.0  # Custom conversion ratio (hours per day)
@@ -193,12 +252,12 @@ class CalendarState(rx.State):
     STATUS_VALIDATED_BY_MANAGER = "validated_by_manager"
     STATUS_VALIDATED = "validated"
     
-    # Calendar status per user: {user_id: status}
-    calendar_status: dict[str, str] = {}
+    # Calendar status per user: {user_id: status} (backend-only)
+    _calendar_status: dict[str, str] = {}
     
-    # Status change history per user: {user_id: [history_entries]}
+    # Status change history per user: {user_id: [history_entries]} (backend-only)
     # Each entry: {timestamp, from_status, to_status, actor, actor_role, changes_summary}
-    status_history: dict[str, list[dict]] = {}
+    _status_history: dict[str, list[dict]] = {}
     
     # Dialog states for validation
     show_status_history_dialog: bool = False
@@ -212,16 +271,24 @@ class CalendarState(rx.State):
     show_import_confirmation_dialog: bool = False
     export_target: str = "viewed"  # "viewed", "self", or "bulk"
     export_bulk_user_ids: list[str] = []  # For bulk export
+    export_gzip: bool = False  # Gzip the bulk export file
     import_file_content: str = ""  # Uploaded JSON content
     import_preview_data: dict = {}  # Parsed import data for preview
     import_validation_errors: list[str] = []  # Validation errors to show user
     
     # Cached current values for performance (computed from history)
     # Structure: {user_id: {date: value}}
+    # Only the viewed calendar is held in memory; all calendars live in the calendar store.
     _comments_cache: dict[str, dict[str, str]] = {}
     _flags_cache: dict[str, dict[str, str]] = {}
     _hours_cache: dict[str, dict[str, float]] = {}
     _flag_colors_cache: dict[str, dict[str, str]] = {}
+    
+    # Summary aggregates of the cached calendars, maintained by every write
+    # (see _update_aggregates) so summary vars never rescan the caches.
+    _monthly_hours_totals: dict[str, dict[int, float]] = {}  # {user_id: {month: hours without flag}}
+    _flag_totals: dict[str, dict[str, int]] = {}  # {user_id: {flag: days}}
+    _comment_totals: dict[str, int] = {}  # {user_id: dates with a comment entry}
 
     # collapsibale monthly breakdown in summary panel
     show_monthly_breakdown: bool = True  # Default: expanded
@@ -231,17 +298,8 @@ class CalendarState(rx.State):
 
     hr_or_manager_role:bool = False
     
-    FLAG_CHOICES = [
-        ("", "(blank)"),
-        ("offered vacation client closed", "offered vacation client closed"),
-        ("national day off", "national day off"),
-        ("Akkodis offered day off", "Akkodis offered day off"),
-        ("on vacation", "on vacation"),
-        ("on vacation client closed", "on vacation client closed"),
-        ("regional day off", "regional day off"),
-        ("extra day off", "extra day off"),
-        ("project_special_worktime", "project_special_worktime")
-    ]
+    # Shared with the compact calendar encoding (flag codes follow this order)
+    FLAG_CHOICES = list(CALENDAR_FLAG_CHOICES)
     
     FLAG_COLORS = {
         "offered vacation client closed": "#e53e3e",    # Red
@@ -255,69 +313,63 @@ class CalendarState(rx.State):
         "": "var(--white)",
     }
     
-    @rx.var
-    def comments(self) -> dict[str, str]:
-        """Computed property: viewed user's comments from history."""
-        user_id = self.viewed_user_id
-        if user_id in self._comments_cache:
-            return self._comments_cache[user_id]
-        return {}
-    
-    @rx.var
-    def flags(self) -> dict[str, str]:
-        """Computed property: viewed user's flags from history."""
-        user_id = self.viewed_user_id
-        if user_id in self._flags_cache:
-            return self._flags_cache[user_id]
-        return {}
-    
-    @rx.var
-    def hours(self) -> dict[str, float]:
-        """Computed property: viewed user's hours from history."""
+    # Month-sharded views of the caches: month_MM_comments, month_MM_flags,
+    # month_MM_hours and month_MM_flag_colors (MM = 01..12), plus the
+    # month_MM_weeks matrix the month grid renders. Writes bump the
+    # _month_MM_revision of the edited months so only those shards recompute.
+    for _month in range(1, 13):
+        __annotations__[f"_month_{_month:02d}_revision"] = int
+        locals()[f"_month_{_month:02d}_revision"] = 0
+        locals()[f"month_{_month:02d}_comments"] = _month_shard_var("_comments_cache", _month, "comments", str)
+        locals()[f"month_{_month:02d}_flags"] = _month_shard_var("_flags_cache", _month, "flags", str)
+        locals()[f"month_{_month:02d}_hours"] = _month_shard_var("_hours_cache", _month, "hours", float)
+        locals()[f"month_{_month:02d}_flag_colors"] = _month_shard_var("_flag_colors_cache", _month, "flag_colors", str)
+        locals()[f"month_{_month:02d}_weeks"] = _month_weeks_var(_month)
+    del _month
+    
+    @cached_var("_history", "viewed_user_id", "selected_date", "history_page")
+    def history_entries_for_selected(self) -> list[dict]:
+        """Get the current page of history entries (newest first) for the selected date."""
         user_id = self.viewed_user_id
-        if user_id in self._hours_cache:
-            return self._hours_cache[user_id]
-        return {}
+        if user_id in self._history and self.selected_date in self._history[user_id]:
+            entries = self._history[user_id][self.selected_date]
+            # Newest first: page 0 ends at the last entry
+            end = len(entries) - self.history_page * self.HISTORY_PAGE_SIZE
+            start = max(0, end - self.HISTORY_PAGE_SIZE)
+            # Timestamps are formatted only for the rendered page
+            return [entry.to_dict() for entry in entries[start:max(0, end)][::-1]]
+        return []
     
-    @rx.var
-    def flag_colors_by_date(self) -> dict[str, str]:
-        """Computed property: viewed user's flag colors from history."""
+    @cached_var("_history", "viewed_user_id", "selected_date")
+    def history_count_for_selected(self) -> int:
+        """Get the number of history entries for the selected date."""
         user_id = self.viewed_user_id
-        if user_id in self._flag_colors_cache:
-            return self._flag_colors_cache[user_id]
-        return {}
+        if user_id in self._history:
+            return len(self._history[user_id].get(self.selected_date, []))
+        return 0
     
-    @rx.var
-    def history_entries_for_selected(self) -> list[dict]:
-        """Get history entries for currently selected date from viewed user's calendar."""
-        user_id = self.viewed_user_id
-        if user_id in self.history and self.selected_date in self.history[user_id]:
-            return self.history[user_id][self.selected_date][::-1]
-        return []
+    @cached_var("history_count_for_selected")
+    def history_page_count(self) -> int:
+        """Get the number of history pages for the selected date."""
+        return max(1, -(-self.history_count_for_selected // self.HISTORY_PAGE_SIZE))
     
-    @rx.var
+    @cached_var("_comment_totals", "viewed_user_id")
     def comment_count(self) -> int:
         """Get the number of comments for viewed user."""
-        user_id = self.viewed_user_id
-        if user_id in self._comments_cache:
-            return len(self._comments_cache[user_id])
-        return 0
+        return self._comment_totals.get(self.viewed_user_id, 0)
     
-    @rx.var
+    @cached_var("_calendar_status", "viewed_user_id")
     def viewed_calendar_status(self) -> str:
         """Get the validation status of the currently viewed calendar."""
-        user_id = self.viewed_user_id
-        # Initialize if not exists
-        if user_id not in self.calendar_status:
-            self.calendar_status[user_id] = self.STATUS_DRAFT
-        return self.calendar_status[user_id]
+        # Loaded with the viewed calendar; never set means draft
+        return self._calendar_status.get(self.viewed_user_id, self.STATUS_DRAFT)
     
-    @rx.var
+    @cached_var("viewed_calendar_status")
     def viewed_calendar_is_validated(self) -> bool:
         """Check if viewed calendar is in validated (live) status."""
         return self.viewed_calendar_status == self.STATUS_VALIDATED
     
-    @rx.var
+    @cached_var("current_user_role", "current_user_id", "viewed_user_id", "viewed_calendar_is_validated")
     def can_employee_view_own_calendar(self) -> bool:
         """Check if employee can view their own calendar (only if validated)."""
         if self.current_user_role != "employee":
@@ -326,56 +378,41 @@ class CalendarState(rx.State):
             return False  # Employees can't view others
         return self.viewed_calendar_is_validated  # Can only see own if validated
     
-    @rx.var
+    @cached_var("_status_history", "viewed_user_id")
     def status_history_for_viewed(self) -> list[dict]:
         """Get status change history for viewed user's calendar."""
         user_id = self.viewed_user_id
-        if user_id in self.status_history:
-            return self.status_history[user_id][::-1]  # Newest first
+        if user_id in self._status_history:
+            return self._status_history[user_id][::-1]  # Newest first
         return []
     
-    @rx.var
+    @cached_var("_monthly_hours_totals", "viewed_user_id")
     def monthly_hours_summary(self) -> dict[int, float]:
         """Get total hours for each month (1-12) for viewed user's calendar.
         Only counts hours from blank flag entries (no flag set)."""
-        user_id = self.viewed_user_id
-        monthly_totals = {month: 0.0 for month in range(1, 13)}
-        
-        if user_id in self._hours_cache:
-            for date_iso, hours in self._hours_cache[user_id].items():
-                # Only count if no flag is set (blank flag)
-                flag = self._flags_cache.get(user_id, {}).get(date_iso, "")
-                if not flag and hours > 0:
-                    try:
-                        # Extract month from date_iso (YYYY-MM-DD)
-                        month = int(date_iso.split("-")[1])
-                        monthly_totals[month] += hours
-                    except (IndexError, ValueError):
-                        pass
-        
-        return monthly_totals
+        totals = self._monthly_hours_totals.get(self.viewed_user_id, {})
+        return {month: totals.get(month, 0.0) for month in range(1, 13)}
     
-    @rx.var
+    @cached_var("monthly_hours_summary")
     def yearly_hours_total(self) -> float:
         """Get total hours for the year for viewed user's calendar."""
         return sum(self.monthly_hours_summary.values())
     
-    @rx.var
+    @cached_var("monthly_hours_summary", "hours_to_days_ratio")
     def monthly_days_summary(self) -> dict[int, float]:
         """Get total days for each month using custom conversion ratio."""
         return {month: hours / self.hours_to_days_ratio 
                 for month, hours in self.monthly_hours_summary.items()}
     
-    @rx.var
+    @cached_var("yearly_hours_total", "hours_to_days_ratio")
     def yearly_days_total(self) -> float:
         """Get total days for the year using custom conversion ratio."""
         return self.yearly_hours_total / self.hours_to_days_ratio
     
-    @rx.var
+    @cached_var("_flag_totals", "viewed_user_id")
     def flag_counts(self) -> dict[str, int]:
         """Count occurrences of specific flags for viewed user's calendar.
         Tracks: national day off, Akkodis offered day off, regional day off, extra day off, on vacation."""
-        user_id = self.viewed_user_id
         flags_to_count = [
             "national day off",
             "Akkodis offered day off", 
@@ -384,23 +421,17 @@ class CalendarState(rx.State):
             "on vacation"
         ]
         
-        counts = {flag: 0 for flag in flags_to_count}
-        
-        if user_id in self._flags_cache:
-            for date_iso, flag in self._flags_cache[user_id].items():
-                if flag in flags_to_count:
-                    counts[flag] += 1
-        
-        return counts
+        totals = self._flag_totals.get(self.viewed_user_id, {})
+        return {flag: totals.get(flag, 0) for flag in flags_to_count}
     
-    @rx.var
+    @cached_var("_calendar_status", "viewed_user_id", "vacation_quota_global", "flag_counts")
     def vacation_remaining(self) -> float:
         """Remaining vacation days for viewed user (company-wide quota).
         Returns 0 if calendar is LIVE (validated)."""
         user_id = self.viewed_user_id
         
         # If calendar is LIVE, quotas don't apply
-        if self.calendar_status.get(user_id, self.STATUS_DRAFT) == self.STATUS_VALIDATED:
+        if self._calendar_status.get(user_id, self.STATUS_DRAFT) == self.STATUS_VALIDATED:
             return 0.0
         
         # Company-wide quota
@@ -408,14 +439,14 @@ class CalendarState(rx.State):
         used = self.flag_counts.get("on vacation", 0)
         return max(0, max_days - used)
     
-    @rx.var
+    @cached_var("_calendar_status", "viewed_user_id", "extra_days_quota", "flag_counts")
     def extra_days_remaining(self) -> float:
         """Remaining extra days off for viewed user (per-user quota).
         Returns 0 if calendar is LIVE (validated)."""
         user_id = self.viewed_user_id
         
         # If calendar is LIVE, quotas don't apply
-        if self.calendar_status.get(user_id, self.STATUS_DRAFT) == self.STATUS_VALIDATED:
+        if self._calendar_status.get(user_id, self.STATUS_DRAFT) == self.STATUS_VALIDATED:
             return 0.0
         
         # Per-user quota with default of 5.0
@@ -423,7 +454,7 @@ class CalendarState(rx.State):
         used = self.flag_counts.get("extra day off", 0)
         return max(0, max_days - used)
     
-    @rx.var
+    @cached_var("current_user_role", "vacation_remaining")
     def can_use_vacation_flag(self) -> bool:
         """Check if current user can still use 'on vacation' flag (quota available or is manager/HR)."""
         # Managers and HR can always override
@@ -432,7 +463,7 @@ class CalendarState(rx.State):
         # Employees need quota remaining
         return self.vacation_remaining > 0
     
-    @rx.var
+    @cached_var("current_user_role", "extra_days_remaining")
     def can_use_extra_day_flag(self) -> bool:
         """Check if current user can still use 'extra day off' flag (quota available or is manager/HR)."""
         # Managers and HR can always override
@@ -441,49 +472,39 @@ class CalendarState(rx.State):
         # Employees need quota remaining
         return self.extra_days_remaining > 0
     
-    @rx.var
+    @cached_var("_org", "current_user_id")
     def current_user(self) -> dict:
         """Get current user object."""
-        for user in self.USERS:
-            if user["id"] == self.current_user_id:
-                return user
-        return self.USERS[0]  # Default to first employee
+        user = self._org.user(self.current_user_id)
+        if user is None:
+            return self._org.users[0]  # Default to first employee
+        return user
     
-    @rx.var
+    @cached_var("current_user")
     def current_user_role(self) -> str:
         """Get current user's role."""
         return self.current_user["role"]
     
-    @rx.var
+    @cached_var("current_user")
     def current_user_name(self) -> str:
         """Get current user's name."""
         return self.current_user["name"]
     
-    @rx.var
+    @cached_var("_org", "current_user")
     def current_user_project(self) -> dict:
         """Get current user's project object."""
-        project_id = self.current_user.get("project_id", "")
-
-        if not project_id:
-            project_ids = self.current_user.get("project_ids", [])
-            if project_ids:
-                print("Current user project IDs:", project_ids)
-                for proj in self.PROJECTS:
-                    if proj["id"] in project_ids:
-                        print("Returning project for current user:", proj)
-                        return proj  # czo - return first matching project - BUG WITH MULTI-PROJECT MANAGERS
-
-        for project in self.PROJECTS:
-            if project["id"] == project_id:
-                return project
-        return self.PROJECTS[0]  # Default to first project
+        # czo - first matching project for multi-project managers - BUG WITH MULTI-PROJECT MANAGERS
+        project = self._org.user_project(self.current_user)
+        if project is None:
+            return self._org.projects[0]  # Default to first project
+        return project
     
-    @rx.var
+    @cached_var("current_user_project")
     def current_project_name(self) -> str:
         """Get current user's project name."""
         return self.current_user_project["name"]
     
-    @rx.var
+    @cached_var("vacation_remaining", "can_use_vacation_flag", "extra_days_remaining", "can_use_extra_day_flag")
     def flag_choices_with_quota(self) -> list[tuple[str, str]]:
         """Get flag choices with remaining quota info and grayed out if exhausted."""
         # Start with base choices
@@ -521,7 +542,7 @@ class CalendarState(rx.State):
         
         return choices
     
-    @rx.var
+    @cached_var("_org", "current_user")
     def visible_users(self) -> list[dict]:
         """Get users whose calendars are visible to current user.
         
@@ -529,110 +550,35 @@ class CalendarState(rx.State):
         - Employees: see only themselves (if calendar is validated)
         - Managers: see all users in their assigned projects (can be multiple within same division)
         - HR: see all users (cross-project, cross-division)
-        
-        Also initializes calendar status to draft if not exists.
         """
-        role = self.current_user_role
-        
-        # Initialize all user calendar statuses to draft if not exists
-        for user in self.USERS:
-            uid = user["id"]
-            if uid not in self.calendar_status:
-                self.calendar_status[uid] = self.STATUS_DRAFT
-            if uid not in self.status_history:
-                self.status_history[uid] = []
-        
-        if role == "hr":
-            # HR sees everyone across all divisions and projects
-            return self.USERS
-        elif role == "manager":
-            # Managers see all users in their assigned projects (project_ids array)
-            manager_project_ids = self.current_user.get("project_ids", [])
-            manager_project_id = self.current_user.get("project_id", "") # czo
-            return [u for u in self.USERS if u.get("project_id") in manager_project_ids or u.get("project_id") == manager_project_id]
-        else:
-            # Employees see only themselves
+        scope = self._viewer_scope()
+        if scope[0] == "employee":
+            # current_user defaults to the first user for an unknown or unset id
             return [self.current_user]
+        # Memoized per (directory version, viewer scope)
+        return self._org.users_in_scope(scope)
+    
+    def _viewer_scope(self) -> tuple:
+        """Org directory scope of the current user (what they can see)."""
+        return self._org.viewer_scope(self.current_user)
+    
+    def _visible_user_ids(self) -> frozenset[str]:
+        """Ids of the users visible to the current user (memoized set)."""
+        scope = self._viewer_scope()
+        if scope[0] == "employee":
+            return frozenset([self.current_user["id"]])
+        return self._org.user_ids_in_scope(scope)
     
-    @rx.var
+    @cached_var("_org", "current_user")
     def users_grouped_by_project(self) -> list[tuple[str, list[tuple[str, list[tuple[str, list[dict]]]]]]]:
         """Get visible users grouped by division, then project, then region.
         Returns list of (division_name, [(project_name, [(region_name, [users])])]) tuples.
         Structure: Division → Project → Region → Users (all sorted alphabetically).
         """
-        visible = self.visible_users
-        # print("Visible users for grouping:", visible)
-        
-        # Group by division first
-        divisions_dict = {}
-        for user in visible:
-            division_id = user.get("division_id", "")
-            # Find division name
-            division_name = "Unknown"
-            for div in self.DIVISIONS:
-                if div["id"] == division_id:
-                    division_name = div["name"]
-                    break
-            
-            if division_name not in divisions_dict:
-                divisions_dict[division_name] = {}
-            
-            # Group by project within division
-            project_id = user.get("project_id", "")
-            project_name = "" # czo "Unknown"
-            for proj in self.PROJECTS:
-                if proj["id"] == project_id:
-                    project_name = proj["name"]
-                    break
-            
-            # czo start
-            if not project_id:
-                project_ids = user.get("project_ids", [])
-                if project_ids:
-                    for proj in self.PROJECTS:
-                        if proj["id"] in project_ids:
-                            project_name = proj["name"]
-                            break
-                            # project_name += ' / ' + proj["name"] if len(project_name) > 0 else proj["name"]
-            # print("User:", user["name"], "Project Name:", project_name)
-                            
-            # czo end
-
-            if project_name not in divisions_dict[division_name]:
-                divisions_dict[division_name][project_name] = []
-            divisions_dict[division_name][project_name].append(user)
-        
-        # print("Divisions dict after grouping:", divisions_dict)
-        # Now organize into final structure with regions
-        result = []
-        for division_name in sorted(divisions_dict.keys()):
-            projects_dict = divisions_dict[division_name]
-            projects_list = []
-            
-            for project_name in sorted(projects_dict.keys()):
-                users_in_project = projects_dict[project_name]
-                
-                # Group by region within project
-                regions_dict = {}
-                for user in users_in_project:
-                    region = user.get("region", "Unknown")
-                    if region not in regions_dict:
-                        regions_dict[region] = []
-                    regions_dict[region].append(user)
-                
-                # Sort users within each region by name
-                for region in regions_dict:
-                    regions_dict[region].sort(key=lambda u: u.get("name", ""))
-                
-                # Convert to sorted list of (region, users) tuples
-                regions_list = sorted(regions_dict.items())
-                projects_list.append((project_name, regions_list))
-            
-            result.append((division_name, projects_list))
-        # print("Users grouped by project:", result)
-        return result
+        # Memoized per (directory version, viewer scope), shared across sessions
+        return self._org.hierarchy(self._viewer_scope())
     
-    @rx.var
+    @cached_var("current_user_id", "current_user_role", "current_project_name", "viewed_user_id", "viewed_user_role", "viewed_user_project_name")
     def can_edit_viewed_calendar(self) -> bool:
         """Check if current user can edit the calendar they're viewing.
         
@@ -652,47 +598,27 @@ class CalendarState(rx.State):
         
         return False  # Employees cannot edit others' calendars
     
-    @rx.var
+    @cached_var("_org", "viewed_user_id")
     def viewed_user_role(self) -> str:
         """Get the role of the user whose calendar is being viewed."""
-        for user in self.USERS:
-            if user["id"] == self.viewed_user_id:
-                return user["role"]
-        return "employee"
+        user = self._org.user(self.viewed_user_id)
+        return user["role"] if user else "employee"
     
-    @rx.var
+    @cached_var("_org", "viewed_user_id")
     def viewed_user_project_name(self) -> str:
         """Get the project name of the user whose calendar is being viewed."""
-        for user in self.USERS:
-            print("Checking user:", user)
-            if user["id"] == self.viewed_user_id:
-                project_id = user.get("project_id", "")
-                print("Viewed user project_id:", project_id)
-
-                if not project_id:
-                    print("User has no single project_id, checking project_ids array")
-                    project_ids = user.get("project_ids", [])
-                    if project_ids:
-                        names = []
-                        for proj in self.PROJECTS:
-                            if proj["id"] in project_ids:
-                                return proj["name"]
-                        #         names.append(proj["name"])
-                        # return " / ".join(names)
-                    
-                for proj in self.PROJECTS:
-                    if proj["id"] == project_id:
-                        return proj["name"]
-                
-        return "Unknown"
+        user = self._org.user(self.viewed_user_id)
+        if user is None:
+            return "Unknown"
+        # Multi-project managers: first of their project_ids
+        project = self._org.user_project(user)
+        return project["name"] if project else "Unknown"
 
-    @rx.var
+    @cached_var("_org", "viewed_user_id")
     def viewed_user_name(self) -> str:
         """Get the name of the user whose calendar is being viewed."""
-        for user in self.USERS:
-            if user["id"] == self.viewed_user_id:
-                return user["name"]
-        return "Unknown"
+        user = self._org.user(self.viewed_user_id)
+        return user["name"] if user else "Unknown"
     
     # @rx.var
     # def viewed_user_project_name(self) -> str:
@@ -705,7 +631,7 @@ class CalendarState(rx.State):
     #                     return proj["name"]
     #     return "Unknown"
     
-    @rx.var
+    @cached_var("current_user_role")
     def allowed_flags(self) -> list[tuple[str, str]]:
         """Get flags allowed for current user role."""
         role = self.current_user_role
@@ -730,36 +656,30 @@ class CalendarState(rx.State):
         
         return allowed
     
-    @rx.var
+    @cached_var("range_start_date", "range_end_date")
     def range_display_text(self) -> str:
         """Get display text for range selection."""
         if self.range_start_date and self.range_end_date:
             if self.range_start_date == self.range_end_date:
                 return self.range_start_date
             return f"{self.range_start_date} to {self.range_end_date}"
-        elif self.range_start_date:
-            return f"Start: {self.range_start_date} (click end date)"
         return "No date selected"
     
-    @rx.var
-    def is_range_selection(self) -> bool:
-        """Check if currently selecting a range."""
-        return self.range_start_date != "" and self.range_end_date == ""
-    
     def is_weekday(self, date_str: str) -> bool:
         """Check if a date is a weekday (Monday-Friday)."""
         try:
-            date_obj = datetime.strptime(date_str, "%a %b %d %Y")
-            # Monday is 0, Sunday is 6
-            return date_obj.weekday() < 5
+            dates, index = display_index(date_str)
         except ValueError:
             return False
+        # Monday is 0, Sunday is 6
+        return dates.weekday[index] < 5
     
     def switch_user(self, user_id: str):
         """Switch to a different user (changes who is logged in)."""
         self.current_user_id = user_id
         self.viewed_user_id = user_id  # Also view their calendar by default
         self.show_user_selector = False
+        self._load_viewed_calendar()
         return rx.toast.success(
             f"Switched to {self.current_user_name}",
             position="top-center"
@@ -768,8 +688,7 @@ class CalendarState(rx.State):
     def view_user_calendar(self, user_id: str):
         """View a specific user's calendar (Manager/HR viewing team calendars)."""
         # Check if current user has permission to view this calendar
-        visible_user_ids = [u["id"] for u in self.visible_users]
-        if user_id not in visible_user_ids:
+        if user_id not in self._visible_user_ids():
             return rx.toast.error(
                 "Access Denied: You don't have permission to view this calendar",
                 position="top-center",
@@ -777,13 +696,11 @@ class CalendarState(rx.State):
             )
         
         self.viewed_user_id = user_id
+        self._load_viewed_calendar()
         
         # Get viewed user name
-        viewed_user_name = "Unknown"
-        for user in self.USERS:
-            if user["id"] == user_id:
-                viewed_user_name = user["name"]
-                break
+        viewed_user = self._org.user(user_id)
+        viewed_user_name = viewed_user["name"] if viewed_user else "Unknown"
         
         # Different message if viewing own vs other's calendar
         if user_id == self.current_user_id:
@@ -840,22 +757,16 @@ class CalendarState(rx.State):
     
     def get_weekdays_in_range(self, start_date: str, end_date: str) -> list[str]:
         """Get all weekdays between start and end date (inclusive)."""
-        from datetime import timedelta
-        
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        end = datetime.strptime(end_date, "%Y-%m-%d")
-        
-        weekdays = []
-        current = start
-        while current <= end:
-            if current.weekday() < 5:  # Monday to Friday
-                weekdays.append(current.strftime("%Y-%m-%d"))
-            current += timedelta(days=1)
-        
-        return weekdays
+        # Slice of the year's weekdays (prefix sums), no per-day parsing
+        return weekdays_in_range(start_date, end_date)
     
-    def handle_day_click(self, day_str: str):
-        """Handle when a day is clicked on the calendar (supports range selection)."""
+    def select_date_range(self, start_iso: str, end_iso: str):
+        """Open the comment dialog for a range selected on the calendar.
+        
+        The hover preview and the click/drag selection live in the browser,
+        which sends this single event once both ends are known (the same day
+        twice for a single date). The ends may come in any order.
+        """
         # Check if current user can edit the viewed calendar
         if not self.can_edit_viewed_calendar:
             return rx.toast.error(
@@ -864,95 +775,55 @@ class CalendarState(rx.State):
                 duration=5000
             )
         
-        # Check if it's a weekday
-        if not self.is_weekday(day_str):
+        # Both ends must be weekdays
+        try:
+            start_dates, start = iso_index(start_iso)
+            end_dates, end = iso_index(end_iso)
+        except ValueError:
+            return rx.toast.error("Invalid date selection", position="top-center")
+        if start_dates.weekday[start] >= 5 or end_dates.weekday[end] >= 5:
             return rx.toast.error(
                 "Comments can only be added to weekdays (Monday-Friday)",
                 position="top-center"
             )
         
-        # Convert to YYYY-MM-DD format for storage
-        date_obj = datetime.strptime(day_str, "%a %b %d %Y")
-        formatted_date = date_obj.strftime("%Y-%m-%d")
+        # Dragging backwards selects the same range (ISO dates compare in date order)
+        if end_iso < start_iso:
+            start_iso, end_iso = end_iso, start_iso
         
-        # Range selection logic
+        # Check if the start date has HR-only protection
         user_id = self.viewed_user_id  # Write to viewed user's calendar (with permission check above)
-        
-        if not self.range_start_date:
-            # First click: set start date
-            # Check if this single date has HR-only protection
-            if not self.can_edit_date(formatted_date):
-                existing_flag = ""
-                if user_id in self._flags_cache and formatted_date in self._flags_cache[user_id]:
-                    existing_flag = self._flags_cache[user_id][formatted_date]
-                return rx.toast.error(
-                    f"Access Denied: Only HR can modify days with '{existing_flag}' flag",
-                    position="top-center",
-                    duration=5000
-                )
-            
-            self.range_start_date = formatted_date
-            self.is_selecting_range = True
-            return rx.toast.info(
-                f"Range Start: {date_obj.strftime('%B %d, %Y')} - Click another day to complete range",
-                position="top-center"
-            )
-        else:
-            # Second click: set end date
-            # Validate end date is not before start date
-            start_dt = datetime.strptime(self.range_start_date, "%Y-%m-%d")
-            end_dt = date_obj
-            
-            if end_dt < start_dt:
-                return rx.toast.error(
-                    "End date cannot be before start date. Click again to select a valid end date.",
-                    position="top-center",
-                    duration=5000
-                )
-            
-            self.range_end_date = formatted_date
-            self.selected_date = f"{self.range_start_date} to {self.range_end_date}"
-            self.is_selecting_range = False
-            
-            # Load values from user's calendar (for single day or first day in range)
-            self.current_comment = ""
-            self.current_flag = ""
-            self.current_hours = 0.0
-            
-            if user_id in self._comments_cache:
-                self.current_comment = self._comments_cache[user_id].get(self.range_start_date, "")
-            if user_id in self._flags_cache:
-                self.current_flag = self._flags_cache[user_id].get(self.range_start_date, "")
-            if user_id in self._hours_cache:
-                self.current_hours = float(self._hours_cache[user_id].get(self.range_start_date, 0.0))
-            
-            self.show_comment_dialog = True
-            
-            # Calculate weekdays in range
-            weekdays = self.get_weekdays_in_range(self.range_start_date, self.range_end_date)
-            
-            return rx.toast.info(
-                f"Range Selected: {len(weekdays)} weekday(s)",
-                position="top-center"
+        if not self.can_edit_date(start_iso):
+            existing_flag = self._flags_cache.get(user_id, {}).get(start_iso, "")
+            return rx.toast.error(
+                f"Access Denied: Only HR can modify days with '{existing_flag}' flag",
+                position="top-center",
+                duration=5000
             )
+        
+        self.range_start_date = start_iso
+        self.range_end_date = end_iso
+        self.selected_date = f"{start_iso} to {end_iso}"
+        
+        # Load values from user's calendar (for single day or first day in range)
+        self.current_comment = self._comments_cache.get(user_id, {}).get(start_iso, "")
+        self.current_flag = self._flags_cache.get(user_id, {}).get(start_iso, "")
+        self.current_hours = float(self._hours_cache.get(user_id, {}).get(start_iso, 0.0))
+        
+        self.show_comment_dialog = True
+        
+        # Calculate weekdays in range
+        weekdays = self.get_weekdays_in_range(start_iso, end_iso)
+        
+        return rx.toast.info(
+            f"Range Selected: {len(weekdays)} weekday(s)",
+            position="top-center"
+        )
     
     def reset_range_selection(self):
         """Reset range selection state."""
         self.range_start_date = ""
         self.range_end_date = ""
-        self.is_selecting_range = False
-        self.hovered_date = ""
-    
-    def set_hovered_date(self, date_str: str):
-        """Set the currently hovered date for visual feedback."""
-        if date_str and self.is_selecting_range:
-            try:
-                date_obj = datetime.strptime(date_str, "%a %b %d %Y")
-                self.hovered_date = date_obj.strftime("%Y-%m-%d")
-            except:
-                self.hovered_date = ""
-        else:
-            self.hovered_date = ""
     
     def save_comment(self):
         """Save the current comment/flag/hours to range or single date (append-only)."""
@@ -1036,33 +907,37 @@ class CalendarState(rx.State):
                     duration=5000
                 )
             
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            # Ensure notifications structure
-            for u in self.USERS:
-                if u["id"] not in self.notifications:
-                    self.notifications[u["id"]] = []
+            timestamp = now_timestamp()
             
-            # Determine target users based on flag type and user role
+            # Determine target users, holiday scopes and notification audiences based on flag type and user role
             target_users = []
+            holiday_scopes = []
+            audiences = []
             scope_description = ""
             
             if self.current_user_role == "hr":
                 # HR: company-wide or region-wide propagation
                 if flag == "regional day off":
                     # Only users in the selected region
-                    target_users = [u for u in self.USERS if u.get("region") == self.selected_region]
+                    target_users = self._org.users_in_region(self.selected_region)
+                    holiday_scopes = [holiday_overlay.region_scope(self.selected_region)]
+                    audiences = [notification_queue.region_audience(self.selected_region)]
                     scope_description = f"region {self.selected_region}"
                 else:
                     # National day off or Akkodis offered day off: all users
-                    target_users = self.USERS
+                    target_users = self._org.users
+                    holiday_scopes = [holiday_overlay.COMPANY_HOLIDAYS]
+                    audiences = [notification_queue.EVERYONE]
                     scope_description = "company-wide"
             elif self.current_user_role == "manager":
                 # Manager: only their assigned project teams
                 manager_project_ids = self.current_user.get("project_ids", [])
-                target_users = [u for u in self.USERS if u.get("project_id") in manager_project_ids]
+                target_users = self._org.users_in_projects(manager_project_ids)
+                holiday_scopes = [holiday_overlay.project_scope(pid) for pid in manager_project_ids]
+                audiences = [notification_queue.project_audience(pid) for pid in manager_project_ids]
                 
                 # Build scope description with project names
-                project_names = [p["name"] for p in self.PROJECTS if p["id"] in manager_project_ids]
+                project_names = self._org.project_names(manager_project_ids)
                 scope_description = f"project(s): {', '.join(project_names)}"
                 
                 # For regional day off, managers must select a region (filter further)
@@ -1074,78 +949,50 @@ class CalendarState(rx.State):
                             duration=5000
                         )
                     target_users = [u for u in target_users if u.get("region") == self.selected_region]
+                    holiday_scopes = [holiday_overlay.project_scope(pid, self.selected_region) for pid in manager_project_ids]
+                    audiences = [notification_queue.project_audience(pid, region=self.selected_region) for pid in manager_project_ids]
                     scope_description += f", region: {self.selected_region}"
             
-            total_dates = 0
+            # Build action description
+            if flag == "regional day off":
+                action_desc = f"holiday set ({self.selected_region} region)"
+            else:
+                action_desc = "holiday set (company-wide)"
+            # Comment overwritten scope-wide (Option A), no hours on holidays
+            entry = self._new_history_entry(timestamp, action_desc, comment, flag, 0.0, propagated=True)
+            
+            # The holiday is stored once per scope and date (holiday overlay);
+            # calendars of the scope resolve it when they are read
+            holiday_records = []
+            viewed_records = []
+            viewed_scopes = holiday_overlay.user_scopes(self._org.user(self.viewed_user_id))
+            holiday_dates = []
             for date_iso in allowed_dates:
-                # Only propagate within calendar year 2026
+                # Only propagate within the viewed calendar year
                 try:
-                    if int(date_iso[:4]) != 2026:
+                    if int(date_iso[:4]) != self.viewed_year:
                         continue
                 except Exception:
                     continue
-                self.company_holidays[date_iso] = flag  # Record company holiday
-                for user in target_users:
-                    uid = user["id"]
-                    # Init user structures
-                    if uid not in self.history:
-                        self.history[uid] = {}
-                    if uid not in self._comments_cache:
-                        self._comments_cache[uid] = {}
-                    if uid not in self._flags_cache:
-                        self._flags_cache[uid] = {}
-                    if uid not in self._hours_cache:
-                        self._hours_cache[uid] = {}
-                    if uid not in self._flag_colors_cache:
-                        self._flag_colors_cache[uid] = {}
-                    prev_comment = self._comments_cache[uid].get(date_iso, "")
-                    prev_flag = self._flags_cache[uid].get(date_iso, "")
-                    prev_hours = self._hours_cache[uid].get(date_iso, 0.0)
-                    new_comment = comment  # Overwrite comment company-wide (Option A)
-                    new_flag = flag
-                    new_hours = 0.0
-                    actions = []
-                    if new_comment != prev_comment:
-                        actions.append("comment modified" if prev_comment else "comment added")
-                    if new_flag != prev_flag:
-                        actions.append("flag changed")
-                    if new_hours != prev_hours:
-                        actions.append("hours changed")
-                    if not actions:
-                        actions.append("holiday set")
-                    
-                    # Build action description
-                    action_desc = ", ".join(actions)
-                    if flag == "regional day off":
-                        action_desc += f" ({self.selected_region} region)"
-                    else:
-                        action_desc += " (company-wide)"
-                    
-                    entry = {
-                        "timestamp": timestamp,
-                        "action": action_desc,
-                        "comment": new_comment,
-                        "flag": new_flag,
-                        "hours": new_hours,
-                        "user": self.current_user_name,
-                        "user_role": self.current_user_role,
-                        "propagated_by": self.current_user_name,
-                    }
-                    if date_iso not in self.history[uid]:
-                        self.history[uid][date_iso] = []
-                    self.history[uid][date_iso].append(entry)
-                    self._comments_cache[uid][date_iso] = new_comment
-                    self._flags_cache[uid][date_iso] = new_flag
-                    self._hours_cache[uid][date_iso] = new_hours
-                    self._flag_colors_cache[uid][date_iso] = self.FLAG_COLORS.get(new_flag, "transparent")
-                    
-                    # Notification (memo) for user with region info
-                    if flag == "regional day off":
-                        notif = f"Regional holiday for {self.selected_region} - '{new_flag}' added on {date_iso} by {self.current_user_name} (HR)."
-                    else:
-                        notif = f"Company holiday '{new_flag}' added on {date_iso} by {self.current_user_name} (HR)."
-                    self.notifications[uid].append(notif)
-                total_dates += 1
+                self._company_holidays[date_iso] = flag  # Record company holiday
+                for scope in holiday_scopes:
+                    holiday_records.append((scope, date_iso, entry))
+                if any(scope in viewed_scopes for scope in holiday_scopes):
+                    viewed_records.append((self.viewed_user_id, date_iso, entry))
+                holiday_dates.append(date_iso)
+            total_dates = len(holiday_dates)
+            
+            get_calendar_store().append_history(holiday_records)
+            self._apply_viewed_history(viewed_records)
+            
+            # One digest notification (memo) for the whole batch, with region info
+            if holiday_dates:
+                date_range = notification_queue.format_date_range(holiday_dates)
+                if flag == "regional day off":
+                    notif = f"Regional holiday for {self.selected_region} - '{flag}' added {date_range} by {self.current_user_name} (HR)."
+                else:
+                    notif = f"Company holiday '{flag}' added {date_range} by {self.current_user_name} (HR)."
+                self._publish_notification(audiences, "holiday", scope_description, holiday_dates, notif)
             
             # Close dialog, reset, toast
             self.close_comment_dialog()
@@ -1180,7 +1027,7 @@ class CalendarState(rx.State):
                 hours = max(5.0, min(19.0, round(float(self.current_hours) * 4) / 4.0))  # 0.25 increments
                 
                 # Get the project of the viewed user's calendar
-                viewed_user = next((u for u in self.USERS if u["id"] == self.viewed_user_id), None)
+                viewed_user = self._org.user(self.viewed_user_id)
                 if not viewed_user:
                     return rx.toast.error(
                         "Error: Cannot determine project for propagation",
@@ -1200,50 +1047,39 @@ class CalendarState(rx.State):
                     )
                 
                 # Propagate to all EMPLOYEES in the same project
-                target_users = [u for u in self.USERS 
-                               if u.get("project_id") == viewed_project_id 
-                               and u.get("role") == "employee"]
+                target_users = [u for u in self._org.users_in_project(viewed_project_id)
+                               if u.get("role") == "employee"]
                 
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                timestamp = now_timestamp()
                 total_dates = 0
                 skipped_dates = 0
                 
-                # Ensure notifications structure
-                for u in target_users:
-                    if u["id"] not in self.notifications:
-                        self.notifications[u["id"]] = []
+                # Previous values of all target calendars (holidays included)
+                existing_days = self._get_days(target_users, allowed_dates)
+                history_records = []
                 
+                worktime_dates = []
                 for date_iso in allowed_dates:
-                    # Only propagate within calendar year 2026
+                    # Only propagate within the viewed calendar year
                     try:
-                        if int(date_iso[:4]) != 2026:
+                        if int(date_iso[:4]) != self.viewed_year:
                             continue
                     except Exception:
                         continue
                     
                     for user in target_users:
                         uid = user["id"]
-                        # Init user structures
-                        if uid not in self.history:
-                            self.history[uid] = {}
-                        if uid not in self._comments_cache:
-                            self._comments_cache[uid] = {}
-                        if uid not in self._flags_cache:
-                            self._flags_cache[uid] = {}
-                        if uid not in self._hours_cache:
-                            self._hours_cache[uid] = {}
-                        if uid not in self._flag_colors_cache:
-                            self._flag_colors_cache[uid] = {}
+                        prev = existing_days.get(uid, {}).get(date_iso, {})
                         
                         # Check conflict: only overwrite if blank or already project_special_worktime
-                        existing_flag = self._flags_cache[uid].get(date_iso, "")
+                        existing_flag = prev.get("flag", "")
                         if existing_flag and existing_flag != "project_special_worktime":
                             skipped_dates += 1
                             continue  # Skip this date for this user
                         
-                        prev_comment = self._comments_cache[uid].get(date_iso, "")
-                        prev_flag = self._flags_cache[uid].get(date_iso, "")
-                        prev_hours = self._hours_cache[uid].get(date_iso, 0.0)
+                        prev_comment = prev.get("comment", "")
+                        prev_flag = prev.get("flag", "")
+                        prev_hours = prev.get("hours", 0.0)
                         
                         new_comment = comment
                         new_flag = flag
@@ -1261,33 +1097,28 @@ class CalendarState(rx.State):
                         
                         action_desc = ", ".join(actions) + " (project-wide)"
                         
-                        entry = {
-                            "timestamp": timestamp,
-                            "action": action_desc,
-                            "comment": new_comment,
-                            "flag": new_flag,
-                            "hours": new_hours,
-                            "user": self.current_user_name,
-                            "user_role": self.current_user_role,
-                            "propagated_by": self.current_user_name,
-                        }
-                        
-                        if date_iso not in self.history[uid]:
-                            self.history[uid][date_iso] = []
-                        self.history[uid][date_iso].append(entry)
+                        entry = self._new_history_entry(timestamp, action_desc, new_comment, new_flag, new_hours, propagated=True)
                         
-                        self._comments_cache[uid][date_iso] = new_comment
-                        self._flags_cache[uid][date_iso] = new_flag
-                        self._hours_cache[uid][date_iso] = new_hours
-                        self._flag_colors_cache[uid][date_iso] = self.FLAG_COLORS.get(new_flag, "transparent")
-                        
-                        # Notification for employee
-                        project_name = next((p["name"] for p in self.PROJECTS if p["id"] == viewed_project_id), "Unknown")
-                        notif = f"Project special worktime set for {project_name} - {new_hours}h on {date_iso} by {self.current_user_name} (Manager)."
-                        self.notifications[uid].append(notif)
+                        history_records.append((uid, date_iso, entry))
                     
+                    worktime_dates.append(date_iso)
                     total_dates += 1
                 
+                self._commit_history(history_records)
+                
+                # One digest notification for the project's employees
+                if worktime_dates:
+                    project_name = self._org.project_name(viewed_project_id)
+                    date_range = notification_queue.format_date_range(worktime_dates)
+                    notif = f"Project special worktime set for {project_name} - {hours}h {date_range} by {self.current_user_name} (Manager)."
+                    self._publish_notification(
+                        [notification_queue.project_audience(viewed_project_id, role="employee")],
+                        "project_special_worktime",
+                        f"project {project_name}",
+                        worktime_dates,
+                        notif,
+                    )
+                
                 # Close dialog, reset, toast
                 self.close_comment_dialog()
                 self.reset_range_selection()
@@ -1303,27 +1134,16 @@ class CalendarState(rx.State):
                 )
 
         # Local (non-propagating) update
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = now_timestamp()
         saved_count = 0
         user_id = self.viewed_user_id
-        
-        # Initialize user history and caches if needed
-        if user_id not in self.history:
-            self.history[user_id] = {}
-        if user_id not in self._comments_cache:
-            self._comments_cache[user_id] = {}
-        if user_id not in self._flags_cache:
-            self._flags_cache[user_id] = {}
-        if user_id not in self._hours_cache:
-            self._hours_cache[user_id] = {}
-        if user_id not in self._flag_colors_cache:
-            self._flag_colors_cache[user_id] = {}
+        history_records = []
         
         for date_iso in allowed_dates:
-            # Get previous values to determine action
-            prev_comment = self._comments_cache[user_id].get(date_iso, "")
-            prev_flag = self._flags_cache[user_id].get(date_iso, "")
-            prev_hours = self._hours_cache[user_id].get(date_iso, 0.0)
+            # Get previous values to determine action (viewed calendar is in memory)
+            prev_comment = self._comments_cache.get(user_id, {}).get(date_iso, "")
+            prev_flag = self._flags_cache.get(user_id, {}).get(date_iso, "")
+            prev_hours = self._hours_cache.get(user_id, {}).get(date_iso, 0.0)
             
             # Determine action description
             actions = []
@@ -1337,44 +1157,28 @@ class CalendarState(rx.State):
             action = ", ".join(actions) if actions else "no changes"
             
             # Create history entry with user info
-            entry = {
-                "timestamp": timestamp,
-                "action": action,
-                "comment": comment,
-                "flag": flag,
-                "hours": hours,
-                "user": self.current_user_name,
-                "user_role": self.current_user_role
-            }
+            entry = self._new_history_entry(timestamp, action, comment, flag, hours)
             
             # Append to user's history
-            if date_iso not in self.history[user_id]:
-                self.history[user_id][date_iso] = []
-            self.history[user_id][date_iso].append(entry)
-            
-            # Update user's caches
-            self._comments_cache[user_id][date_iso] = comment
-            self._flags_cache[user_id][date_iso] = flag
-            self._hours_cache[user_id][date_iso] = hours
-            if flag:
-                self._flag_colors_cache[user_id][date_iso] = self.FLAG_COLORS.get(flag, "transparent")
-            elif date_iso in self._flag_colors_cache[user_id]:
-                del self._flag_colors_cache[user_id][date_iso]
+            history_records.append((user_id, date_iso, entry))
             
             saved_count += 1
         
+        # Persist history and update the viewed calendar's caches
+        self._commit_history(history_records)
+        
         # Calendar validation status update: HR modification triggers status change
         if self.current_user_role == "hr" and user_id != self.current_user_id:
             # HR is modifying someone else's calendar
-            viewed_user = next((u for u in self.USERS if u["id"] == user_id), None)
+            viewed_user = self._org.user(user_id)
             if viewed_user:
                 viewed_role = viewed_user.get("role", "")
                 # Only trigger status change for employee/manager calendars (not HR)
                 if viewed_role in ["employee", "manager"]:
-                    old_status = self.calendar_status.get(user_id, self.STATUS_DRAFT)
+                    old_status = self._get_calendar_status(user_id)
                     # Auto-revert to pending_manager_validation
                     if old_status != self.STATUS_PENDING_MANAGER:
-                        self.calendar_status[user_id] = self.STATUS_PENDING_MANAGER
+                        self._calendar_status[user_id] = self.STATUS_PENDING_MANAGER
                         changes_desc = f"HR modified {saved_count} date(s): {action}"
                         self._log_status_change(user_id, old_status, self.STATUS_PENDING_MANAGER, changes_desc)
         
@@ -1402,22 +1206,36 @@ class CalendarState(rx.State):
     def close_company_holidays_dialog(self):
         self.show_company_holidays_dialog = False
 
-    @rx.var
+    @cached_var("_company_holidays")
     def company_holidays_list(self) -> list[tuple[str, str]]:
         """Sorted list of (date, flag) for company holidays."""
-        return sorted(self.company_holidays.items())
+        return sorted(self._company_holidays.items())
 
-    @rx.var
-    def notifications_for_viewed(self) -> list[str]:
-        uid = self.viewed_user_id
-        if uid in self.notifications:
-            return self.notifications[uid]
-        return []
+    def _publish_notification(self, audiences: list[str], kind: str, scope: str, dates: list[str], message: str):
+        """Publish one digest notification for a propagation batch."""
+        get_notification_queues().publish(
+            audiences, kind, scope, dates, self.current_user_name, self.current_user_role, message
+        )
+        self._notification_revision += 1
+
+    def _viewed_audiences(self) -> tuple[str, ...]:
+        """Notification audiences of the viewed user."""
+        return notification_queue.user_audiences(self._org.user(self.viewed_user_id))
+
+    @cached_var("_notification_revision", "_org", "viewed_user_id")
+    def first_notification_for_viewed(self) -> str:
+        """Get the first unread notification message for viewed user."""
+        unread = get_notification_queues().unread(self.viewed_user_id, self._viewed_audiences())
+        return unread[0]["message"] if unread else ""
+
+    @cached_var("_notification_revision", "_org", "viewed_user_id")
+    def unread_notification_count(self) -> int:
+        """Get the number of unread notifications for viewed user (O(1) per audience)."""
+        return get_notification_queues().unread_count(self.viewed_user_id, self._viewed_audiences())
 
     def dismiss_notifications_for_viewed(self):
-        uid = self.viewed_user_id
-        if uid in self.notifications:
-            self.notifications[uid] = []
+        get_notification_queues().mark_read(self.viewed_user_id, self._viewed_audiences())
+        self._notification_revision += 1
     
     def set_current_comment(self, value: str):
         """Set the current comment."""
@@ -1454,8 +1272,19 @@ class CalendarState(rx.State):
     
     def open_history_dialog(self):
         """Open the history dialog for the selected date."""
+        self.history_page = 0
         self.show_history_dialog = True
     
+    def next_history_page(self):
+        """Show older history entries."""
+        if self.history_page + 1 < self.history_page_count:
+            self.history_page += 1
+    
+    def previous_history_page(self):
+        """Show newer history entries."""
+        if self.history_page > 0:
+            self.history_page -= 1
+    
     def close_history_dialog(self):
         """Close the history dialog."""
         self.show_history_dialog = False
@@ -1473,9 +1302,197 @@ class CalendarState(rx.State):
             "changes_summary": changes_summary
         }
         
-        if user_id not in self.status_history:
-            self.status_history[user_id] = []
-        self.status_history[user_id].append(entry)
+        get_calendar_store().append_status(user_id, entry)
+        if user_id not in self._status_history:
+            self._status_history[user_id] = []
+        self._status_history[user_id].append(entry)
+
+    def _get_calendar_status(self, user_id: str) -> str:
+        """Get a calendar's validation status from the calendar store (draft if never set)."""
+        return get_calendar_store().get_status(user_id) or self.STATUS_DRAFT
+
+    def _new_history_entry(
+        self,
+        timestamp: int,
+        action: str,
+        comment: str,
+        flag: str,
+        hours: float,
+        propagated: bool = False,
+    ) -> HistoryEntry:
+        """Create a history entry authored by the current user."""
+        return HistoryEntry(
+            timestamp,
+            action,
+            comment,
+            flag,
+            hours,
+            self.current_user_name,
+            self.current_user_role,
+            self.current_user_name if propagated else None,
+        )
+
+    def _commit_history(self, records: list[tuple[str, str, HistoryEntry]]):
+        """Persist (user_id, date_iso, entry) history records in one batch.
+        
+        The calendar store keeps every calendar; only entries of the viewed
+        calendar are applied to the in-memory history and caches.
+        """
+        if not records:
+            return
+        get_calendar_store().append_history(records)
+        self._apply_viewed_history(records)
+
+    def _apply_viewed_history(self, records: list[tuple[str, str, HistoryEntry]]):
+        """Apply the viewed calendar's entries among records to its history, aggregates and caches."""
+        user_id = self.viewed_user_id
+        year_prefix = f"{self.viewed_year:04d}-"
+        edited_months = set()
+        for uid, date_iso, entry in records:
+            if uid != user_id or not date_iso.startswith(year_prefix):
+                continue  # Other calendars and years are only in the store
+            edited_months.add(int(date_iso[5:7]))
+            self._history.setdefault(uid, {}).setdefault(date_iso, []).append(entry)
+            self._update_aggregates(uid, date_iso, entry)
+            
+            flag = entry.flag
+            self._comments_cache.setdefault(uid, {})[date_iso] = entry.comment
+            self._flags_cache.setdefault(uid, {})[date_iso] = flag
+            self._hours_cache.setdefault(uid, {})[date_iso] = entry.hours
+            colors = self._flag_colors_cache.setdefault(uid, {})
+            if flag:
+                colors[date_iso] = self.FLAG_COLORS.get(flag, "transparent")
+            elif date_iso in colors:
+                del colors[date_iso]
+        self._touch_months(edited_months)
+
+    def _update_aggregates(self, user_id: str, date_iso: str, entry: HistoryEntry):
+        """Apply one day's change to the summary aggregates in O(1).
+        
+        Must run before the caches are updated (reads the day's previous values).
+        """
+        month = int(date_iso[5:7])
+        old_flag = self._flags_cache.get(user_id, {}).get(date_iso, "")
+        old_hours = self._hours_cache.get(user_id, {}).get(date_iso, 0.0)
+        new_flag = entry.flag
+        new_hours = entry.hours
+        
+        # Hours only count on days without a flag
+        monthly = self._monthly_hours_totals.setdefault(user_id, {})
+        delta = (new_hours if not new_flag and new_hours > 0 else 0.0) - (old_hours if not old_flag and old_hours > 0 else 0.0)
+        if delta:
+            monthly[month] = round(monthly.get(month, 0.0) + delta, 6)
+        
+        if old_flag != new_flag:
+            flag_totals = self._flag_totals.setdefault(user_id, {})
+            if old_flag:
+                flag_totals[old_flag] = flag_totals.get(old_flag, 0) - 1
+            if new_flag:
+                flag_totals[new_flag] = flag_totals.get(new_flag, 0) + 1
+        
+        if date_iso not in self._comments_cache.get(user_id, {}):
+            self._comment_totals[user_id] = self._comment_totals.get(user_id, 0) + 1
+
+    def _rebuild_aggregates(self, user_id: str):
+        """Compute the summary aggregates of a freshly loaded calendar."""
+        flags = self._flags_cache.get(user_id, {})
+        monthly = {}
+        flag_totals = {}
+        for date_iso, hours in self._hours_cache.get(user_id, {}).items():
+            if not flags.get(date_iso, "") and hours > 0:
+                month = int(date_iso[5:7])
+                monthly[month] = monthly.get(month, 0.0) + hours
+        for flag in flags.values():
+            if flag:
+                flag_totals[flag] = flag_totals.get(flag, 0) + 1
+        self._monthly_hours_totals = {user_id: {month: round(total, 6) for month, total in monthly.items()}}
+        self._flag_totals = {user_id: flag_totals}
+        self._comment_totals = {user_id: len(self._comments_cache.get(user_id, {}))}
+
+    def _touch_months(self, months):
+        """Bump the revision of edited months so their calendar shards recompute."""
+        for month in months:
+            name = f"_month_{month:02d}_revision"
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _load_viewed_calendar(self):
+        """Load the viewed year of the viewed user's calendar from the calendar store into memory.
+        
+        Calendars of other users and other years are dropped from the session
+        so memory stays bounded by a single calendar year whatever the size of
+        the organization or the length of its history.
+        """
+        store = get_calendar_store()
+        user_id = self.viewed_user_id
+        year = self.viewed_year
+        user = self._org.user(user_id) or {"id": user_id}
+        days = holiday_overlay.load_calendar(store, user, year)
+        
+        self._history = {user_id: holiday_overlay.load_history(store, user, year)}
+        self._comments_cache = {user_id: {d: v["comment"] for d, v in days.items()}}
+        self._flags_cache = {user_id: {d: v["flag"] for d, v in days.items()}}
+        self._hours_cache = {user_id: {d: v["hours"] for d, v in days.items()}}
+        self._flag_colors_cache = {user_id: {
+            d: self.FLAG_COLORS.get(v["flag"], "transparent")
+            for d, v in days.items()
+            if v["flag"]
+        }}
+        self._calendar_status[user_id] = store.get_status(user_id) or self.STATUS_DRAFT
+        self._status_history[user_id] = store.get_status_history(user_id)
+        
+        self._rebuild_aggregates(user_id)
+        self._touch_months(range(1, 13))
+        self._notification_revision += 1
+        
+        extra_days = store.get_quota(user_id, "extra day off")
+        if extra_days is not None:
+            self.extra_days_quota[user_id] = extra_days
+
+    def load_calendar_data(self):
+        """Load company settings and the viewed calendar from the calendar store (on page load)."""
+        store = get_calendar_store()
+        vacation_quota = store.get_quota(COMPANY_SCOPE, "on vacation")
+        if vacation_quota is not None:
+            self.vacation_quota_global = vacation_quota
+        self._load_company_holidays()
+        self._load_viewed_calendar()
+    
+    def _load_company_holidays(self):
+        """Load the company holidays of the viewed year from the calendar store."""
+        holidays = holiday_overlay.load_holidays(get_calendar_store(), year=self.viewed_year)
+        self._company_holidays = {date_iso: day["flag"] for date_iso, day in holidays.items()}
+    
+    def set_viewed_year(self, year: int):
+        """View another year of the viewed calendar (loaded from the store on demand)."""
+        try:
+            year = int(year)
+            year_dates(year)  # Validates the year
+        except (TypeError, ValueError, OverflowError):
+            return rx.toast.error(f"Invalid year: {year}", position="top-center")
+        if year == self.viewed_year:
+            return
+        
+        self.viewed_year = year
+        self.reset_range_selection()
+        self._bulk_hours_plan = None
+        self._load_company_holidays()
+        self._load_viewed_calendar()
+    
+    def previous_year(self):
+        """View the previous year of the viewed calendar."""
+        return self.set_viewed_year(self.viewed_year - 1)
+    
+    def next_year(self):
+        """View the next year of the viewed calendar."""
+        return self.set_viewed_year(self.viewed_year + 1)
+    
+    def _load_calendar(self, user_id: str, year: int | None = None) -> dict[str, DayValue]:
+        """A user's current days (of a year, default: all years) from the calendar store, holidays included."""
+        return holiday_overlay.load_calendar(get_calendar_store(), self._org.user(user_id) or {"id": user_id}, year)
+    
+    def _get_days(self, users: list[dict], dates: list[str]) -> dict[str, dict[str, DayValue]]:
+        """Current values of several users' days, holidays included: {user_id: {date_iso: DayValue}}."""
+        return holiday_overlay.get_days(get_calendar_store(), users, dates)
     
     def open_hr_self_validate_dialog(self):
         """Open confirmation dialog for HR to validate their own calendar."""
@@ -1492,9 +1509,9 @@ class CalendarState(rx.State):
     def hr_self_validate_calendar(self):
         """HR validates their own calendar directly (no manager review needed)."""
         user_id = self.current_user_id
-        old_status = self.calendar_status.get(user_id, self.STATUS_DRAFT)
+        old_status = self._get_calendar_status(user_id)
         
-        self.calendar_status[user_id] = self.STATUS_VALIDATED
+        self._calendar_status[user_id] = self.STATUS_VALIDATED
         self._log_status_change(user_id, old_status, self.STATUS_VALIDATED, "HR self-validated calendar")
         
         self.close_hr_self_validate_dialog()
@@ -1509,7 +1526,7 @@ class CalendarState(rx.State):
         if self.current_user_role != "manager":
             return rx.toast.error("Only managers can validate calendars", position="top-center")
         
-        viewed_user = next((u for u in self.USERS if u["id"] == self.viewed_user_id), None)
+        viewed_user = self._org.user(self.viewed_user_id)
         if not viewed_user:
             return rx.toast.error("User not found", position="top-center")
         
@@ -1526,9 +1543,9 @@ class CalendarState(rx.State):
     def manager_validate_calendar(self):
         """Manager validates a calendar and sends it back to HR with status validated_by_manager."""
         user_id = self.viewed_user_id
-        old_status = self.calendar_status.get(user_id, self.STATUS_DRAFT)
+        old_status = self._get_calendar_status(user_id)
         
-        self.calendar_status[user_id] = self.STATUS_VALIDATED_BY_MANAGER
+        self._calendar_status[user_id] = self.STATUS_VALIDATED_BY_MANAGER
         self._log_status_change(
             user_id, 
             old_status, 
@@ -1549,7 +1566,7 @@ class CalendarState(rx.State):
             return rx.toast.error("Only HR can finalize validation", position="top-center")
         
         # Check if calendar is in validated_by_manager status
-        current_status = self.calendar_status.get(self.viewed_user_id, self.STATUS_DRAFT)
+        current_status = self._get_calendar_status(self.viewed_user_id)
         if current_status != self.STATUS_VALIDATED_BY_MANAGER:
             return rx.toast.error(
                 f"Calendar must be validated by manager first. Current status: {current_status}",
@@ -1566,9 +1583,9 @@ class CalendarState(rx.State):
     def hr_final_validate_calendar(self):
         """HR performs final validation, making the calendar live."""
         user_id = self.viewed_user_id
-        old_status = self.calendar_status.get(user_id, self.STATUS_DRAFT)
+        old_status = self._get_calendar_status(user_id)
         
-        self.calendar_status[user_id] = self.STATUS_VALIDATED
+        self._calendar_status[user_id] = self.STATUS_VALIDATED
         self._log_status_change(
             user_id,
             old_status,
@@ -1614,6 +1631,7 @@ class CalendarState(rx.State):
         self.bulk_affected_days_count = 0
         self.bulk_overwrite_count = 0
         self.bulk_skip_conflicts = False
+        self._bulk_hours_plan = None
     
     def bulk_hours_overwrite(self):
         """User chose to overwrite conflicts - proceed with apply."""
@@ -1676,59 +1694,54 @@ class CalendarState(rx.State):
             return float(self._hours_cache[user_id].get(date_iso, 0.0))
         return 0.0
     
+    def _bulk_hours_plan_key(self) -> tuple:
+        """Inputs a bulk-hours plan depends on (org version, viewer scope, months, hours, year, store version).
+        
+        The store version changes with every write (e.g. a holiday propagated
+        between the preview and the apply), which makes the plan stale.
+        """
+        months = tuple(range(1, 13)) if self.bulk_apply_to_all_months else (self.selected_month,)
+        return (
+            self._org.version,
+            self._viewer_scope(),
+            months,
+            self.bulk_hours_mon_thu,
+            self.bulk_hours_fri,
+            self.viewed_year,
+            get_calendar_store().version,
+        )
+
+    def _get_bulk_hours_plan(self) -> BulkHoursPlan:
+        """The plan computed by the preview if still valid, else a fresh one."""
+        key = self._bulk_hours_plan_key()
+        plan = self._bulk_hours_plan
+        if plan is not None and plan.key == key:
+            return plan
+
+        # Weekdays of the selected month(s) of the viewed year
+        weekdays = month_weekdays(key[5], key[2])
+        users = self.visible_users
+        existing_days = self._get_days(users, [date_iso for date_iso, _ in weekdays])
+        plan = self._bulk_hours_plan = BulkHoursPlan.build(
+            key,
+            [user["id"] for user in users],
+            weekdays,
+            existing_days,
+            self.bulk_hours_mon_thu,
+            self.bulk_hours_fri,
+        )
+        return plan
+
     def preview_bulk_hours(self):
         """Preview how many days will be affected by bulk hours setting."""
-        from datetime import timedelta
-        
-        # Get all weekdays in the selected month(s) for year 2026
-        year = 2026
-        months_to_process = list(range(1, 13)) if self.bulk_apply_to_all_months else [self.selected_month]
-        
-        # Collect all weekdays across selected months
-        weekdays = []
-        for month in months_to_process:
-            # Get first and last day of month
-            first_day = datetime(year, month, 1)
-            if month == 12:
-                last_day = datetime(year + 1, 1, 1) - timedelta(days=1)
-            else:
-                last_day = datetime(year, month + 1, 1) - timedelta(days=1)
-            
-            # Get all weekdays in this month
-            current = first_day
-            while current <= last_day:
-                if current.weekday() < 5:  # Monday to Friday
-                    weekdays.append(current.strftime("%Y-%m-%d"))
-                current += timedelta(days=1)
-        
-        # Get all visible users
-        target_users = self.visible_users
-        
-        # Count affected days and days with existing hours
-        affected_count = 0
-        overwrite_count = 0
-        
-        for user in target_users:
-            uid = user["id"]
-            for date_iso in weekdays:
-                # Check if date has a flag (skip if it does)
-                has_flag = False
-                if uid in self._flags_cache and date_iso in self._flags_cache[uid]:
-                    if self._flags_cache[uid][date_iso]:
-                        has_flag = True
-                
-                if not has_flag:
-                    affected_count += 1
-                    # Check if it already has hours
-                    if uid in self._hours_cache and date_iso in self._hours_cache[uid]:
-                        if self._hours_cache[uid][date_iso] > 0:
-                            overwrite_count += 1
+        # Computed once here, executed as is by apply_bulk_hours
+        plan = self._get_bulk_hours_plan()
         
-        self.bulk_affected_days_count = affected_count
-        self.bulk_overwrite_count = overwrite_count
+        self.bulk_affected_days_count = plan.affected_count
+        self.bulk_overwrite_count = plan.overwrite_count
         
         # Show confirmation dialog if there are days to overwrite
-        if overwrite_count > 0:
+        if plan.overwrite_count > 0:
             self.show_bulk_hours_confirmation = True
         else:
             # No overwrites, proceed directly
@@ -1736,115 +1749,41 @@ class CalendarState(rx.State):
     
     def apply_bulk_hours(self):
         """Apply bulk hours to all visible users for the selected month(s)."""
-        from datetime import timedelta
-        
-        # Get all weekdays in the selected month(s)
-        year = 2026
-        months_to_process = list(range(1, 13)) if self.bulk_apply_to_all_months else [self.selected_month]
-        
-        # Collect all weekdays across selected months
-        weekdays = []
-        for month in months_to_process:
-            first_day = datetime(year, month, 1)
-            if month == 12:
-                last_day = datetime(year + 1, 1, 1) - timedelta(days=1)
-            else:
-                last_day = datetime(year, month + 1, 1) - timedelta(days=1)
-            
-            current = first_day
-            while current <= last_day:
-                if current.weekday() < 5:  # Monday to Friday
-                    weekdays.append((current.strftime("%Y-%m-%d"), current.weekday()))
-                current += timedelta(days=1)
+        plan = self._get_bulk_hours_plan()
         
-        # Get all visible users
-        target_users = self.visible_users
-        
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        total_updated = 0
-        total_skipped = 0
+        # One batch, one timestamp for the whole run
+        timestamp = now_timestamp()
+        history_records, total_skipped = plan.history_records(
+            self.bulk_skip_conflicts,
+            lambda action, prev_comment, hours: self._new_history_entry(timestamp, action, prev_comment, "", hours),
+        )
         
-        for user in target_users:
-            uid = user["id"]
-            
-            # Initialize structures if needed
-            if uid not in self.history:
-                self.history[uid] = {}
-            if uid not in self._hours_cache:
-                self._hours_cache[uid] = {}
-            if uid not in self._flags_cache:
-                self._flags_cache[uid] = {}
-            if uid not in self._comments_cache:
-                self._comments_cache[uid] = {}
-            if uid not in self._flag_colors_cache:
-                self._flag_colors_cache[uid] = {}
-            
-            for date_iso, weekday in weekdays:
-                # Skip if date has a flag
-                existing_flag = self._flags_cache[uid].get(date_iso, "")
-                if existing_flag:
-                    continue  # Skip dates with flags
-                
-                # Determine hours based on day of week
-                # weekday: 0=Monday, 1=Tuesday, 2=Wednesday, 3=Thursday, 4=Friday
-                if weekday < 4:  # Monday to Thursday
-                    hours = self.bulk_hours_mon_thu
-                else:  # Friday
-                    hours = self.bulk_hours_fri
-                
-                # Get previous values
-                prev_comment = self._comments_cache[uid].get(date_iso, "")
-                prev_hours = self._hours_cache[uid].get(date_iso, 0.0)
-                
-                # Skip if no change
-                if prev_hours == hours:
-                    continue
-                
-                # Conflict handling: if bulk_skip_conflicts is True and there are existing hours, skip
-                if self.bulk_skip_conflicts and prev_hours > 0:
-                    total_skipped += 1
+        # Calendar validation status update: HR bulk hours triggers status change
+        if self.current_user_role == "hr":
+            if self.bulk_apply_to_all_months:
+                changes_desc = "HR bulk-set hours for all months"
+            else:
+                changes_desc = f"HR bulk-set hours for month {self.selected_month}"
+            # Only the calendars the run actually writes to
+            changed_ids = {uid for uid, _, _ in history_records}
+            for uid in plan.user_ids:
+                if uid == self.current_user_id or uid not in changed_ids:
                     continue
-                
-                # Create history entry
-                action = "hours changed (bulk set)" if prev_hours > 0 else "hours added (bulk set)"
-                entry = {
-                    "timestamp": timestamp,
-                    "action": action,
-                    "comment": prev_comment,
-                    "flag": "",
-                    "hours": hours,
-                    "user": self.current_user_name,
-                    "user_role": self.current_user_role
-                }
-                
-                # Update history
-                if date_iso not in self.history[uid]:
-                    self.history[uid][date_iso] = []
-                self.history[uid][date_iso].append(entry)
-                
-                # Update cache
-                self._hours_cache[uid][date_iso] = hours
-                total_updated += 1
-            
-            # Calendar validation status update: HR bulk hours triggers status change
-            if self.current_user_role == "hr" and uid != self.current_user_id:
                 # HR is bulk-setting hours for someone else's calendar
-                target_user = next((u for u in self.USERS if u["id"] == uid), None)
-                if target_user:
-                    target_role = target_user.get("role", "")
-                    # Only trigger status change for employee/manager calendars
-                    if target_role in ["employee", "manager"]:
-                        old_status = self.calendar_status.get(uid, self.STATUS_DRAFT)
-                        # Auto-revert to pending_manager_validation
-                        if old_status != self.STATUS_PENDING_MANAGER:
-                            self.calendar_status[uid] = self.STATUS_PENDING_MANAGER
-                            if self.bulk_apply_to_all_months:
-                                changes_desc = "HR bulk-set hours for all months"
-                            else:
-                                changes_desc = f"HR bulk-set hours for month {self.selected_month}"
-                            self._log_status_change(uid, old_status, self.STATUS_PENDING_MANAGER, changes_desc)
-        
-        # Close dialogs
+                target_user = self._org.user(uid)
+                # Only trigger status change for employee/manager calendars
+                if target_user and target_user.get("role", "") in ["employee", "manager"]:
+                    old_status = self._get_calendar_status(uid)
+                    # Auto-revert to pending_manager_validation
+                    if old_status != self.STATUS_PENDING_MANAGER:
+                        self._calendar_status[uid] = self.STATUS_PENDING_MANAGER
+                        self._log_status_change(uid, old_status, self.STATUS_PENDING_MANAGER, changes_desc)
+        
+        # Persist all entries in one batch
+        self._commit_history(history_records)
+        total_updated = len(history_records)
+        
+        # Close dialogs (drops the plan)
         self.close_bulk_hours_dialog()
         
         # Success message
@@ -1861,7 +1800,7 @@ class CalendarState(rx.State):
         if total_skipped > 0:
             msg += f", {total_skipped} day(s) skipped (conflicts preserved)"
         
-        msg += f" across {len(target_users)} user(s)"
+        msg += f" across {len(plan.user_ids)} user(s)"
         
         return rx.toast.success(msg, position="top-center", duration=6000)
     
@@ -1914,49 +1853,57 @@ class CalendarState(rx.State):
         if self.editing_user_id:
             # Save per-user extra days quota
             self.extra_days_quota[self.editing_user_id] = self.temp_extra_days_quota
-            user = next((u for u in self.USERS if u["id"] == self.editing_user_id), None)
+            get_calendar_store().set_quota(self.editing_user_id, "extra day off", self.temp_extra_days_quota)
+            user = self._org.user(self.editing_user_id)
             user_name = user["name"] if user else "User"
             msg = f"Updated extra days quota for {user_name}: {self.temp_extra_days_quota} days"
         else:
             # Save global vacation quota
             self.vacation_quota_global = self.temp_vacation_quota
+            get_calendar_store().set_quota(COMPANY_SCOPE, "on vacation", self.temp_vacation_quota)
             msg = f"Updated company-wide vacation quota: {self.temp_vacation_quota} days"
         
         self.close_quota_manager_dialog()
         return rx.toast.success(msg, position="top-center", duration=4000)
     
-    def export_to_json(self):
+    async def export_to_json(self):
         """Export the current user's calendar with full history to a JSON file."""
         user_id = self.current_user_id
         
         # Prepare data with readable format including full history
+        year = self.viewed_year
         export_data = {
-            "year": 2026,
+            "year": year,
             "user": self.current_user_name,
             "project": self.current_project_name,
             "entries": []
         }
         
+        # Current user's calendar may not be the viewed one: read it from the store
+        user = self._org.user(user_id) or {"id": user_id}
+        history = holiday_overlay.load_history(get_calendar_store(), user, year)
+        days = holiday_overlay.load_calendar(get_calendar_store(), user, year)
+        
         # Check if user has history
-        if user_id not in self.history:
-            return rx.download(data=json.dumps(export_data, indent=2), filename=f"calendar_export_{user_id}.json")
+        if not history:
+            return await self._download_artifact(f"calendar_export_{user_id}.json", json.dumps(export_data, indent=2))
         
         # Sort by date
-        sorted_dates = sorted(self.history[user_id].keys())
+        sorted_dates = sorted(history.keys())
         for date_str in sorted_dates:
-            date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+            dates, index = iso_index(date_str)
             
             # Get current values from cache
             entry = {
                 "date": date_str,
-                "day_name": date_obj.strftime("%A"),
-                "formatted_date": date_obj.strftime("%B %d, %Y"),
+                "day_name": dates.day_name[index],
+                "formatted_date": dates.long[index],
                 "current": {
-                    "comment": self._comments_cache[user_id].get(date_str, ""),
-                    "flag": self._flags_cache[user_id].get(date_str, ""),
-                    "hours": self._hours_cache[user_id].get(date_str, 0.0)
+                    "comment": days.get(date_str, {}).get("comment", ""),
+                    "flag": days.get(date_str, {}).get("flag", ""),
+                    "hours": days.get(date_str, {}).get("hours", 0.0)
                 },
-                "history": self.history[user_id][date_str]
+                "history": [entry.to_dict() for entry in history[date_str]]
             }
             
             export_data["entries"].append(entry)
@@ -1965,14 +1912,19 @@ class CalendarState(rx.State):
         json_str = json.dumps(export_data, indent=2, ensure_ascii=False)
         
         # Return download event
-        return rx.download(
-            data=json_str,
-            filename="calendar_2026_data.json"
-        )
+        return await self._download_artifact(f"calendar_{year}_data.json", json_str)
+    
+    async def _download_artifact(self, filename: str, data: bytes | str) -> rx.event.EventSpec:
+        """Store a generated file in the artifact store and download it over HTTP.
+        
+        Only a short-lived URL goes through the websocket, not the file.
+        """
+        token = await asyncio.to_thread(get_artifact_store().put, filename, data)
+        return rx.download(url=artifact_url(token, filename), filename=filename)
     
     def get_comment_for_date(self, month: int, day: int) -> str:
         """Get comment for a specific date from viewed user's calendar."""
-        date_str = f"2026-{month:02d}-{day:02d}"
+        date_str = f"{self.viewed_year:04d}-{month:02d}-{day:02d}"
         user_id = self.viewed_user_id
         if user_id in self._comments_cache:
             return self._comments_cache[user_id].get(date_str, "")
@@ -1980,7 +1932,7 @@ class CalendarState(rx.State):
     
     def has_comment(self, month: int, day: int) -> bool:
         """Check if a date has a comment in viewed user's calendar."""
-        date_str = f"2026-{month:02d}-{day:02d}"
+        date_str = f"{self.viewed_year:04d}-{month:02d}-{day:02d}"
         user_id = self.viewed_user_id
         if user_id in self._comments_cache:
             return date_str in self._comments_cache[user_id]
@@ -2011,6 +1963,7 @@ class CalendarState(rx.State):
             )
         self.export_target = "viewed"
         self.export_bulk_user_ids = []
+        self.export_gzip = False
         self.show_export_dialog = True
     
     def close_export_dialog(self):
@@ -2026,6 +1979,10 @@ class CalendarState(rx.State):
             # Pre-select all visible users for bulk export
             self.export_bulk_user_ids = [u["id"] for u in self.visible_users]
     
+    def set_export_gzip(self, value: bool):
+        """Gzip the bulk export file."""
+        self.export_gzip = value
+    
     def open_export_image_dialog(self):
         """Open image export dialog (managers and HR only)."""
         if self.current_user_role == "employee":
@@ -2048,7 +2005,7 @@ class CalendarState(rx.State):
         """Export calendar as PNG image (landscape orientation).
         Includes division, project, owner, and summary information in header."""
         # Get viewed user info
-        viewed_user = next((u for u in self.USERS if u["id"] == self.viewed_user_id), None)
+        viewed_user = self._org.user(self.viewed_user_id)
         if not viewed_user:
             return rx.toast.error("Error: User not found", position="top-center", duration=3000)
         
@@ -2056,24 +2013,16 @@ class CalendarState(rx.State):
         division_name = "Unknown Division"
         project_name = "Unknown Project"
         
-        for div in self.DIVISIONS:
-            if div["id"] == viewed_user.get("division_id"):
-                division_name = div["name"]
-                break
-        
-        for proj in self.PROJECTS:
-            if proj["id"] == viewed_user.get("project_id"):
-                project_name = proj["name"]
-                break
+        division_name = self._org.division_name(viewed_user.get("division_id"), division_name)
+        project_name = self._org.project_name(viewed_user.get("project_id"), project_name)
         
         # Prepare monthly data for all 12 months
         monthly_data = {}
         user_id = self.viewed_user_id
         
-        if user_id in self.history:
-            for date_str, entries in self.history[user_id].items():
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-                month = date_obj.month
+        if user_id in self._history:
+            for date_str, entries in self._history[user_id].items():
+                month = int(date_str[5:7])
                 
                 if month not in monthly_data:
                     monthly_data[month] = []
@@ -2088,6 +2037,7 @@ class CalendarState(rx.State):
         
         # Prepare calendar data
         calendar_data = {
+            "year": self.viewed_year,
             "user_name": viewed_user["name"],
             "user_role": viewed_user["role"],
             "division_name": division_name,
@@ -2104,16 +2054,16 @@ class CalendarState(rx.State):
         png_bytes = await generate_calendar_png(calendar_data)
         
         # Generate filename
-        filename = f"calendar_2026_{viewed_user['name'].replace(' ', '_')}.png"
+        filename = f"calendar_{self.viewed_year}_{viewed_user['name'].replace(' ', '_')}.png"
         
         # Return download
-        return rx.download(data=png_bytes, filename=filename)
+        return await self._download_artifact(filename, png_bytes)
     
     async def export_calendar_image_pdf(self):
         """Export calendar as PDF image (landscape orientation).
         Includes division, project, owner, and summary information in header."""
         # Get viewed user info
-        viewed_user = next((u for u in self.USERS if u["id"] == self.viewed_user_id), None)
+        viewed_user = self._org.user(self.viewed_user_id)
         if not viewed_user:
             return rx.toast.error("Error: User not found", position="top-center", duration=3000)
         
@@ -2121,24 +2071,16 @@ class CalendarState(rx.State):
         division_name = "Unknown Division"
         project_name = "Unknown Project"
         
-        for div in self.DIVISIONS:
-            if div["id"] == viewed_user.get("division_id"):
-                division_name = div["name"]
-                break
-        
-        for proj in self.PROJECTS:
-            if proj["id"] == viewed_user.get("project_id"):
-                project_name = proj["name"]
-                break
+        division_name = self._org.division_name(viewed_user.get("division_id"), division_name)
+        project_name = self._org.project_name(viewed_user.get("project_id"), project_name)
         
         # Prepare monthly data for all 12 months
         monthly_data = {}
         user_id = self.viewed_user_id
         
-        if user_id in self.history:
-            for date_str, entries in self.history[user_id].items():
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-                month = date_obj.month
+        if user_id in self._history:
+            for date_str, entries in self._history[user_id].items():
+                month = int(date_str[5:7])
                 
                 if month not in monthly_data:
                     monthly_data[month] = []
@@ -2153,6 +2095,7 @@ class CalendarState(rx.State):
         
         # Prepare calendar data
         calendar_data = {
+            "year": self.viewed_year,
             "user_name": viewed_user["name"],
             "user_role": viewed_user["role"],
             "division_name": division_name,
@@ -2169,10 +2112,10 @@ class CalendarState(rx.State):
         pdf_bytes = await generate_calendar_pdf(calendar_data)
         
         # Generate filename
-        filename = f"calendar_2026_{viewed_user['name'].replace(' ', '_')}.pdf"
+        filename = f"calendar_{self.viewed_year}_{viewed_user['name'].replace(' ', '_')}.pdf"
         
         # Return download
-        return rx.download(data=pdf_bytes, filename=filename)
+        return await self._download_artifact(filename, pdf_bytes)
     
     def toggle_bulk_export_user(self, user_id: str):
         """Toggle user selection for bulk export."""
@@ -2181,7 +2124,7 @@ class CalendarState(rx.State):
         else:
             self.export_bulk_user_ids.append(user_id)
     
-    def export_calendar(self) -> rx.event.EventSpec:
+    async def export_calendar(self):
         """Export calendar(s) to JSON file(s)."""
         # Determine which users to export
         if self.export_target == "viewed":
@@ -2206,79 +2149,52 @@ class CalendarState(rx.State):
             export_data = self._generate_calendar_export(user_ids[0])
             json_str = json.dumps(export_data, indent=2, ensure_ascii=False)
             
-            user = next((u for u in self.USERS if u["id"] == user_ids[0]), None)
+            user = self._org.user(user_ids[0])
             filename = f"calendar_{user['name'].replace(' ', '_')}_{user_ids[0]}.json" if user else "calendar_export.json"
             
             self.close_export_dialog()
-            return rx.download(data=json_str, filename=filename)
+            return await self._download_artifact(filename, json_str)
         else:
-            # Bulk export - create array of calendars
-            export_data = {
-                "export_metadata": {
-                    "export_date": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
-                    "exporter": self.current_user_id,
-                    "exporter_name": self.current_user_name,
-                    "export_count": len(user_ids)
-                },
-                "calendars": [self._generate_calendar_export(uid) for uid in user_ids]
-            }
-            json_str = json.dumps(export_data, indent=2, ensure_ascii=False)
+            # Bulk export - one calendar per line (NDJSON), generated and written
+            # to the artifact store in a worker thread, then downloaded over HTTP
+            filename = f"calendar_bulk_export_{len(user_ids)}_users.ndjson"
+            if self.export_gzip:
+                filename += ".gz"
+            artifacts = get_artifact_store()
+            token, path = artifacts.new_path(filename)
+            
+            lines = iter_bulk_export_lines(
+                get_calendar_store(),
+                self._org,
+                list(user_ids),
+                self.viewed_year,
+                self._export_metadata(),
+            )
+            try:
+                await asyncio.to_thread(write_lines, path, lines, self.export_gzip)
+            except OSError as e:
+                artifacts.discard(token)
+                return rx.toast.error(
+                    f"Export failed: {str(e)}",
+                    position="top-center",
+                    duration=5000
+                )
             
             self.close_export_dialog()
-            return rx.download(data=json_str, filename=f"calendar_bulk_export_{len(user_ids)}_users.json")
+            return rx.download(url=artifact_url(token, filename), filename=filename)
     
-    def _generate_calendar_export(self, user_id: str) -> dict:
-        """Generate export data for a single user's calendar."""
-        user = next((u for u in self.USERS if u["id"] == user_id), None)
-        if not user:
-            return {}
-        
-        # Find project
-        project = next((p for p in self.PROJECTS if p["id"] == user.get("project_id")), None)
-        
-        # Build days array with all calendar data
-        days = []
-        for month in range(1, 13):
-            for day in range(1, 32):
-                try:
-                    date_obj = datetime(2026, month, day)
-                    date_iso = date_obj.strftime("%Y-%m-%d")
-                    
-                    # Get current values from cache
-                    flag = self._flags_cache.get(user_id, {}).get(date_iso, "")
-                    comment = self._comments_cache.get(user_id, {}).get(date_iso, "")
-                    hours = self._hours_cache.get(user_id, {}).get(date_iso, 0.0)
-                    
-                    # Only include days with data
-                    if flag or comment or hours > 0:
-                        days.append({
-                            "date": date_iso,
-                            "flag": flag,
-                            "comment": comment,
-                            "hours": hours
-                        })
-                except ValueError:
-                    # Invalid date (e.g., Feb 30)
-                    continue
-        
+    def _export_metadata(self) -> dict:
+        """Export date and exporter of an export made now."""
         return {
-            "export_metadata": {
-                "export_date": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
-                "exporter": self.current_user_id,
-                "exporter_name": self.current_user_name
-            },
-            "calendar_owner": {
-                "id": user["id"],
-                "name": user["name"],
-                "role": user["role"]
-            },
-            "project": project if project else {"id": "", "name": "", "description": ""},
-            "region": user.get("region", ""),
-            "year": 2026,
-            "calendar_status": self.calendar_status.get(user_id, self.STATUS_DRAFT),
-            "days": days
+            "export_date": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+            "exporter": self.current_user_id,
+            "exporter_name": self.current_user_name
         }
     
+    def _generate_calendar_export(self, user_id: str) -> dict:
+        """Generate export data for a single user's calendar (viewed year)."""
+        return calendar_export(get_calendar_store(), self._org, user_id, self.viewed_year, self._export_metadata())
+    
     def open_import_dialog(self):
         """Open import dialog."""
         # Only HR and managers can import
@@ -2355,7 +2271,7 @@ class CalendarState(rx.State):
             return
         
         # Check if user exists
-        existing_user = next((u for u in self.USERS if u["id"] == user_id), None)
+        existing_user = self._org.user(user_id)
         is_new_user = existing_user is None
         
         # Permission check
@@ -2368,6 +2284,15 @@ class CalendarState(rx.State):
                     )
                     return
         
+        # Days must be real calendar dates (nothing is written otherwise)
+        invalid_dates = self._invalid_import_dates(import_data.get("days", []))
+        if invalid_dates:
+            self.import_validation_errors.append(
+                f"Invalid date(s) in 'days': {', '.join(invalid_dates[:5])}"
+                + (f" (+{len(invalid_dates) - 5} more)" if len(invalid_dates) > 5 else "")
+            )
+            return
+        
         # Get project and region info
         project_data = import_data.get("project", {})
         region = import_data.get("region", "")
@@ -2397,6 +2322,20 @@ class CalendarState(rx.State):
                 if flag not in self.import_preview_data["non_hr_flags_in_import"]:
                     self.import_preview_data["non_hr_flags_in_import"].append(flag)
     
+    @staticmethod
+    def _invalid_import_dates(days: list[dict]) -> list[str]:
+        """Dates of import days that are not YYYY-MM-DD calendar dates (days without a date are skipped)."""
+        invalid = []
+        for day in days:
+            date_iso = day.get("date", "")
+            if not date_iso:
+                continue
+            try:
+                iso_index(str(date_iso))
+            except ValueError:
+                invalid.append(str(date_iso))
+        return invalid
+    
     def confirm_import_calendar(self):
         """Execute the calendar import after confirmation."""
         try:
@@ -2427,6 +2366,14 @@ class CalendarState(rx.State):
     
     def _execute_import(self, import_data: dict) -> dict:
         """Execute the actual import operation."""
+        # Checked again here: nothing (org, store, status) may change for a rejected file
+        invalid_dates = self._invalid_import_dates(import_data.get("days", []))
+        if invalid_dates:
+            return {
+                "success": False,
+                "message": f"Import rejected: invalid date(s) {', '.join(invalid_dates[:5])}",
+            }
+        
         owner = import_data.get("calendar_owner", {})
         user_id = owner.get("id", "")
         user_name = owner.get("name", "")
@@ -2436,16 +2383,16 @@ class CalendarState(rx.State):
         region = import_data.get("region", "")
         
         # Check if user exists
-        existing_user = next((u for u in self.USERS if u["id"] == user_id), None)
+        existing_user = self._org.user(user_id)
         is_new_user = existing_user is None
         
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = now_timestamp()
         
         if is_new_user:
             # NEW EMPLOYEE SCENARIO
             # 1. Add/reuse project
             project_id = project_data.get("id", "")
-            existing_project = next((p for p in self.PROJECTS if p["id"] == project_id), None)
+            existing_project = self._org.project(project_id)
             
             if not existing_project and project_id:
                 # Add new project
@@ -2470,14 +2417,18 @@ class CalendarState(rx.State):
             }
             self.USERS.append(new_user)
             
-            # 4. Initialize user data structures
-            self.history[user_id] = {}
-            self._comments_cache[user_id] = {}
-            self._flags_cache[user_id] = {}
-            self._hours_cache[user_id] = {}
-            self._flag_colors_cache[user_id] = {}
-            self.calendar_status[user_id] = self.STATUS_DRAFT
-            self.status_history[user_id] = []
+            # Re-index the org (new directory version)
+            self._org = self._org.extended(
+                projects=[] if existing_project or not project_id else [new_project],
+                regions=[region] if region else [],
+                users=[new_user],
+            )
+            
+            # 4. Initialize user data structures (calendar data lives in the calendar store)
+            self._calendar_status[user_id] = self.STATUS_DRAFT
+            self._status_history[user_id] = []
+            history_records = []
+            imported_flags = {}
             
             # 5. Import all days from file
             days = import_data.get("days", [])
@@ -2491,82 +2442,49 @@ class CalendarState(rx.State):
                     continue
                 
                 # Create history entry
-                entry = {
-                    "timestamp": timestamp,
-                    "action": "imported",
-                    "comment": comment,
-                    "flag": flag,
-                    "hours": hours,
-                    "user": self.current_user_name,
-                    "user_role": self.current_user_role
-                }
-                
-                if date_iso not in self.history[user_id]:
-                    self.history[user_id][date_iso] = []
-                self.history[user_id][date_iso].append(entry)
+                entry = self._new_history_entry(timestamp, "imported", comment, flag, hours)
                 
-                # Update caches
-                self._comments_cache[user_id][date_iso] = comment
-                self._flags_cache[user_id][date_iso] = flag
-                self._hours_cache[user_id][date_iso] = hours
-                if flag:
-                    self._flag_colors_cache[user_id][date_iso] = self.FLAG_COLORS.get(flag, "transparent")
+                history_records.append((user_id, date_iso, entry))
+                imported_flags[date_iso] = flag
             
             # 6. Merge HR flags from existing project calendars
             if existing_project or project_id:
                 # Find HR users in same project
                 hr_users_in_project = [
-                    u for u in self.USERS 
-                    if u.get("project_id") == project_id 
-                    and u.get("role") == "hr" 
+                    u for u in self._org.users_in_project(project_id)
+                    if u.get("role") == "hr" 
                     and u["id"] != user_id
                 ]
                 
                 # Copy HR flags from any HR user in the project
                 for hr_user in hr_users_in_project:
                     hr_id = hr_user["id"]
-                    if hr_id in self._flags_cache:
-                        for date_iso, flag in self._flags_cache[hr_id].items():
+                    hr_days = self._load_calendar(hr_id)
+                    if hr_days:
+                        for date_iso, hr_day in hr_days.items():
+                            flag = hr_day["flag"]
                             # Copy HR-only flags
                             if flag in self.HR_ONLY_FLAGS:
                                 # Only copy if new user doesn't have this flag yet
-                                if date_iso not in self._flags_cache[user_id] or not self._flags_cache[user_id][date_iso]:
+                                if not imported_flags.get(date_iso):
                                     # Special case: regional day off only if same region
                                     if flag == "regional day off" and hr_user.get("region") != region:
                                         continue
                                     
-                                    # Copy the flag
-                                    self._flags_cache[user_id][date_iso] = flag
-                                    self._flag_colors_cache[user_id][date_iso] = self.FLAG_COLORS.get(flag, "transparent")
-                                    
                                     # Get comment and hours from HR calendar
-                                    hr_comment = self._comments_cache.get(hr_id, {}).get(date_iso, "")
-                                    hr_hours = self._hours_cache.get(hr_id, {}).get(date_iso, 0.0)
-                                    
-                                    # Update caches
-                                    if hr_comment and not self._comments_cache[user_id].get(date_iso):
-                                        self._comments_cache[user_id][date_iso] = hr_comment
-                                    if hr_hours > 0 and not self._hours_cache[user_id].get(date_iso):
-                                        self._hours_cache[user_id][date_iso] = hr_hours
+                                    hr_comment = hr_day["comment"]
+                                    hr_hours = hr_day["hours"]
                                     
                                     # Create history entry for inherited flag
-                                    entry = {
-                                        "timestamp": timestamp,
-                                        "action": "inherited from project HR",
-                                        "comment": hr_comment,
-                                        "flag": flag,
-                                        "hours": hr_hours,
-                                        "user": self.current_user_name,
-                                        "user_role": self.current_user_role
-                                    }
+                                    entry = self._new_history_entry(timestamp, "inherited from project HR", hr_comment, flag, hr_hours)
                                     
-                                    if date_iso not in self.history[user_id]:
-                                        self.history[user_id][date_iso] = []
-                                    self.history[user_id][date_iso].append(entry)
+                                    history_records.append((user_id, date_iso, entry))
                     
                     # Break after first HR user (we only need one source)
                     break
             
+            self._commit_history(history_records)
+            
             return {
                 "success": True,
                 "message": f"Successfully imported calendar for new user: {user_name} ({len(days)} days)"
@@ -2578,18 +2496,7 @@ class CalendarState(rx.State):
             days = import_data.get("days", [])
             imported_count = 0
             skipped_hr_flags = 0
-            
-            # Initialize if needed
-            if user_id not in self.history:
-                self.history[user_id] = {}
-            if user_id not in self._comments_cache:
-                self._comments_cache[user_id] = {}
-            if user_id not in self._flags_cache:
-                self._flags_cache[user_id] = {}
-            if user_id not in self._hours_cache:
-                self._hours_cache[user_id] = {}
-            if user_id not in self._flag_colors_cache:
-                self._flag_colors_cache[user_id] = {}
+            history_records = []
             
             for day in days:
                 date_iso = day.get("date", "")
@@ -2606,35 +2513,18 @@ class CalendarState(rx.State):
                     continue
                 
                 # Create history entry
-                entry = {
-                    "timestamp": timestamp,
-                    "action": "imported (merged)",
-                    "comment": comment,
-                    "flag": flag,
-                    "hours": hours,
-                    "user": self.current_user_name,
-                    "user_role": self.current_user_role
-                }
-                
-                if date_iso not in self.history[user_id]:
-                    self.history[user_id][date_iso] = []
-                self.history[user_id][date_iso].append(entry)
-                
-                # Update caches (overwrite existing)
-                self._comments_cache[user_id][date_iso] = comment
-                self._flags_cache[user_id][date_iso] = flag
-                self._hours_cache[user_id][date_iso] = hours
-                if flag:
-                    self._flag_colors_cache[user_id][date_iso] = self.FLAG_COLORS.get(flag, "transparent")
-                elif date_iso in self._flag_colors_cache[user_id]:
-                    del self._flag_colors_cache[user_id][date_iso]
+                entry = self._new_history_entry(timestamp, "imported (merged)", comment, flag, hours)
                 
+                # Overwrites existing values (latest entry wins)
+                history_records.append((user_id, date_iso, entry))
                 imported_count += 1
             
+            self._commit_history(history_records)
+            
             # Update validation status to PENDING_MANAGER
-            old_status = self.calendar_status.get(user_id, self.STATUS_DRAFT)
+            old_status = self._get_calendar_status(user_id)
             if old_status != self.STATUS_PENDING_MANAGER:
-                self.calendar_status[user_id] = self.STATUS_PENDING_MANAGER
+                self._calendar_status[user_id] = self.STATUS_PENDING_MANAGER
                 self._log_status_change(
                     user_id, 
                     old_status, 
@@ -2651,7 +2541,7 @@ class CalendarState(rx.State):
                 "message": msg
             }
 
-    @rx.var
+    @cached_var("selected_month")
     def get_month_name(self) -> str:
 
         month_names = [
@@ -2673,7 +2563,12 @@ class CalendarState(rx.State):
         """Toggle quickview panel visibility."""
         self.show_quickview_panel = not self.show_quickview_panel
 
-    @rx.var
+    @cached_var("current_user_role")
     def is_hr_or_manager(self) -> bool:
         """Check if current user is HR or manager."""
-        return self.current_user_role in ["hr", "manager"]
\ No newline at end of file
+        return self.current_user_role in ["hr", "manager"]
+
+
+# Var recompute report / handler metrics (computed_vars.py)
+if TRACK_HANDLERS:
+    instrument_handlers(CalendarState)